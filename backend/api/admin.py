@@ -1,6 +1,6 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin
-from .models import User, Plant
+from .models import User, UserProfile, ROLE_PROFILES, Plant, TrackedPlant, PlantReminder, Notification
 
 @admin.register(User)
 class CustomUserAdmin(UserAdmin):
@@ -18,6 +18,45 @@ class PlantAdmin(admin.ModelAdmin):
     search_fields = ('name', 'scientific_name')
     ordering = ('name',)
 
+# One stacked inline per role extension table
+ROLE_PROFILE_INLINES = [
+    type(f'{model.__name__}Inline', (admin.StackedInline,), {'model': model, 'can_delete': False})
+    for model in ROLE_PROFILES.values()
+]
+
+@admin.register(UserProfile)
+class UserProfileAdmin(admin.ModelAdmin):
+    list_display = ('user', 'full_name', 'location', 'climate_zone', 'skill_level')
+    list_select_related = ('user',)  # __str__ reads user.username
+    search_fields = ('user__username', 'full_name', 'location')
+    raw_id_fields = ('user',)
+    inlines = ROLE_PROFILE_INLINES
+
+@admin.register(TrackedPlant)
+class TrackedPlantAdmin(admin.ModelAdmin):
+    list_display = ('name', 'user', 'type', 'health_status', 'growth_stage', 'last_watered')
+    list_filter = ('health_status', 'growth_stage')
+    list_select_related = ('user',)
+    search_fields = ('name', 'type', 'user__username')
+    raw_id_fields = ('user',)
+
+@admin.register(PlantReminder)
+class PlantReminderAdmin(admin.ModelAdmin):
+    list_display = ('type', 'tracked_plant', 'user', 'due_date', 'completed')
+    list_filter = ('type', 'completed')
+    list_select_related = ('tracked_plant__user', 'user')
+    search_fields = ('tracked_plant__name', 'user__username')
+    raw_id_fields = ('user', 'tracked_plant')
+    date_hierarchy = 'due_date'
+
+@admin.register(Notification)
+class NotificationAdmin(admin.ModelAdmin):
+    list_display = ('kind', 'user', 'subject', 'status', 'attempts', 'next_attempt_at', 'sent_at')
+    list_filter = ('kind', 'status')
+    list_select_related = ('user',)
+    search_fields = ('user__username', 'subject')
+    raw_id_fields = ('user',)
+
 admin.site.site_header = "Gardening App Admin"
 admin.site.site_title = "Gardening App Admin Panel"
 admin.site.index_title = "Welcome to the Gardening App Administration"
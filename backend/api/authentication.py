@@ -0,0 +1,107 @@
+import time
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS
+from django.utils.translation import gettext_lazy as _
+from rest_framework_simplejwt import serializers, tokens
+from rest_framework_simplejwt.authentication import JWTAuthentication
+from rest_framework_simplejwt.exceptions import AuthenticationFailed, InvalidToken
+from rest_framework_simplejwt.settings import api_settings
+
+from .models import User
+
+# Copied into every token for clients; a token whose claims no longer match the user is refused
+CLAIM_FIELDS = ['username', 'email', 'role']
+USER_CACHE_TTL = getattr(settings, 'AUTH_USER_CACHE_TTL', 30)
+USER_CACHE_SIZE = 10000
+
+# user id -> (expiry on the monotonic clock, column values). Per process; saves in this process
+# evict an entry, other processes see the change once the TTL runs out
+_user_cache = {}
+
+
+class RefreshToken(tokens.RefreshToken):
+    @classmethod
+    def for_user(cls, user):
+        token = super().for_user(user)
+        for name in CLAIM_FIELDS:
+            token[name] = getattr(user, name)
+        return token
+
+    def access_token_for(self, user):
+        """An access token from this refresh token, with the user's current claims"""
+        access = self.access_token
+        for name in CLAIM_FIELDS:
+            access[name] = getattr(user, name)
+        return access
+
+
+def cached_user_values(user_id):
+    """Column values of a user by attname, from the in-process cache or one query"""
+    now = time.monotonic()
+    entry = _user_cache.get(user_id)
+    if entry is not None and entry[0] > now:
+        return entry[1]
+    values = User.objects.filter(pk=user_id).values(*[field.attname for field in User._meta.concrete_fields]).first()
+    if values is None:
+        raise User.DoesNotExist(f'User {user_id} does not exist')
+    if len(_user_cache) >= USER_CACHE_SIZE:
+        _user_cache.clear()
+    _user_cache[user_id] = (now + USER_CACHE_TTL, values)
+    return values
+
+
+def forget_user(user_id):
+    _user_cache.pop(user_id, None)
+
+
+class ClaimsJWTAuthentication(JWTAuthentication):
+    """
+    JWT authentication without the per-request user query: request.user is built from the user's
+    row in the per-process cache (cached_user_values), so deactivating or deleting a user shuts
+    out their tokens within AUTH_USER_CACHE_TTL seconds.
+
+    A token whose username, email or role claims no longer match the row is refused as invalid;
+    clients then refresh it, and TokenRefreshSerializer issues one with the current claims.
+    """
+
+    def get_user(self, validated_token):
+        try:
+            user_id = int(validated_token[api_settings.USER_ID_CLAIM])
+        except (KeyError, TypeError, ValueError):
+            raise InvalidToken(_('Token contained no recognizable user identification'))
+
+        try:
+            values = cached_user_values(user_id)
+        except User.DoesNotExist:
+            raise AuthenticationFailed(_('User not found'), code='user_not_found')
+        if not values['is_active']:
+            raise AuthenticationFailed(_('User is inactive'), code='user_inactive')
+        # Tokens issued without the claims are checked against the row alone
+        if any(name in validated_token and validated_token[name] != values[name] for name in CLAIM_FIELDS):
+            raise InvalidToken(_('Token claims are out of date'))
+        return User.from_db(DEFAULT_DB_ALIAS, list(values), list(values.values()))
+
+
+class TokenRefreshSerializer(serializers.TokenRefreshSerializer):
+    """
+    Token refresh that copies the user's current username, email and role into the new access
+    token, instead of the claims the refresh token was issued with, and refuses users that are
+    inactive or gone.
+    """
+    token_class = RefreshToken
+
+    def validate(self, attrs):
+        refresh = self.token_class(attrs['refresh'])
+        user = User.objects.filter(
+            **{api_settings.USER_ID_FIELD: refresh.payload.get(api_settings.USER_ID_CLAIM)}).first()
+        if user is None or not api_settings.USER_AUTHENTICATION_RULE(user):
+            raise AuthenticationFailed(self.error_messages['no_active_account'], 'no_active_account')
+
+        data = {'access': str(refresh.access_token_for(user))}
+        if api_settings.ROTATE_REFRESH_TOKENS:
+            if api_settings.BLACKLIST_AFTER_ROTATION:
+                refresh.blacklist()
+            refresh = self.token_class.for_user(user)
+            data['refresh'] = str(refresh)
+        return data
@@ -0,0 +1,67 @@
+import hashlib
+
+from django.core.cache import cache
+from django.db.models import Count, Max
+
+from .models import Plant
+
+VERSION_CACHE_KEY = 'plant_catalogue_version'
+META_CACHE_KEY = 'plant_catalogue_meta:{version}'
+# With the default per-process cache, only the worker that saved a plant sees the invalidation;
+# the others keep serving the old version (and 304s for it) until this expires. Set
+# CACHE_REDIS_URL to share the cache between workers and make invalidation immediate.
+VERSION_TTL = 300
+# Cache-Control of the unversioned /plants/meta/ URL
+META_MAX_AGE = 60
+META_STALE_WHILE_REVALIDATE = 600
+META_TTL = 60 * 60 * 24
+
+FACET_FIELDS = ('category', 'soil_type', 'sunlight', 'watering_schedule')
+
+
+def compute_version():
+    stats = Plant.objects.aggregate(total=Count('id'), last_id=Max('id'), last_update=Max('updated_at'))
+    fingerprint = f"{stats['total']}:{stats['last_id']}:{stats['last_update']}"
+    return hashlib.md5(fingerprint.encode('utf-8')).hexdigest()[:16]
+
+
+def get_catalogue_version():
+    """Version token of the plant catalogue, served from cache so 304s never hit the DB"""
+    version = cache.get(VERSION_CACHE_KEY)
+    if version is None:
+        version = compute_version()
+        cache.set(VERSION_CACHE_KEY, version, VERSION_TTL)
+    return version
+
+
+def invalidate_catalogue_version():
+    cache.delete(VERSION_CACHE_KEY)
+
+
+def build_catalogue_meta(version):
+    # One GROUP BY over every facet combination (at most 3*4*3*3 rows), folded per facet in Python
+    facets = {field: {} for field in FACET_FIELDS}
+    total = 0
+    for row in Plant.objects.order_by().values(*FACET_FIELDS).annotate(count=Count('id')):
+        total += row['count']
+        for field in FACET_FIELDS:
+            facets[field][row[field]] = facets[field].get(row[field], 0) + row['count']
+
+    return {
+        'version': version,
+        'categories': dict(Plant.CATEGORY_CHOICES),
+        'soil_types': dict(Plant.SOIL_TYPES),
+        'sunlight_options': dict(Plant.SUNLIGHT_CHOICES),
+        'watering_options': dict(Plant.WATERING_CHOICES),
+        'facets': facets,
+        'total': total,
+    }
+
+
+def get_catalogue_meta(version):
+    key = META_CACHE_KEY.format(version=version)
+    meta = cache.get(key)
+    if meta is None:
+        meta = build_catalogue_meta(version)
+        cache.set(key, meta, META_TTL)
+    return meta
@@ -0,0 +1,63 @@
+import re
+
+# Numbers in free text such as "20-30°C", "15°C - 25°C", "-5 to 10", "40% - 60%".
+# The lookbehind keeps the dash in "20-30" from being read as a minus sign.
+NUMBER_RE = re.compile(r'(?<![\d.])-?\d+(?:\.\d+)?')
+FAHRENHEIT_RE = re.compile(r'\d\s*°?\s*F\b', re.IGNORECASE)
+INCHES_RE = re.compile(r'\d\s*(in\b|inch|")', re.IGNORECASE)
+CENTIMETRES_RE = re.compile(r'\d\s*cm\b', re.IGNORECASE)
+
+
+def fahrenheit_to_celsius(value):
+    return round((value - 32) * 5 / 9, 1)
+
+
+def parse_range(text):
+    """Parse a free-text range into (low, high) floats, or (None, None) if it has no numbers"""
+    if not text:
+        return None, None
+    numbers = [float(n) for n in NUMBER_RE.findall(str(text))]
+    if not numbers:
+        return None, None
+    low, high = min(numbers[:2]), max(numbers[:2])
+    return low, high
+
+
+def parse_temperature(text):
+    """Temperature range in °C; Fahrenheit input ("68-86°F") is converted"""
+    low, high = parse_range(text)
+    if low is not None and FAHRENHEIT_RE.search(str(text)):
+        low, high = fahrenheit_to_celsius(low), fahrenheit_to_celsius(high)
+    return low, high
+
+
+def parse_humidity(text):
+    """Relative humidity range in %"""
+    return parse_range(text)
+
+
+def parse_rainfall(text):
+    """Annual rainfall range in mm; inches and centimetres are converted"""
+    low, high = parse_range(text)
+    if low is None:
+        return low, high
+    if INCHES_RE.search(str(text)):
+        low, high = round(low * 25.4), round(high * 25.4)
+    elif CENTIMETRES_RE.search(str(text)):
+        low, high = low * 10, high * 10
+    return low, high
+
+
+def overlaps(queryset, prefix, low, high):
+    """Filter rows whose <prefix>_min..<prefix>_max range overlaps [low, high]; open ends are ignored"""
+    if low is not None:
+        queryset = queryset.filter(**{f'{prefix}_max__gte': low})
+    if high is not None:
+        queryset = queryset.filter(**{f'{prefix}_min__lte': high})
+    return queryset
+
+
+def suitable_for_profile(queryset, profile):
+    """Plants whose ideal temperature and humidity ranges overlap the profile's local climate"""
+    queryset = overlaps(queryset, 'temperature', profile.temperature_min, profile.temperature_max)
+    return overlaps(queryset, 'humidity', profile.humidity_min, profile.humidity_max)
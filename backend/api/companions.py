@@ -0,0 +1,179 @@
+import threading
+
+import numpy as np
+from django.db import transaction
+from django.db.models import Q
+
+from .catalogue import get_catalogue_version
+from .models import Plant, PlantCompanion
+from .names import name_variants, normalize_name
+
+SUGGESTION_LIMIT = 10
+
+
+def companion_edges(plant):
+    names = {normalize_name(name) for name in plant.companion_plants or []}
+    names.discard('')
+    names.discard(normalize_name(plant.name))
+    return names
+
+
+def resolve_names(names):
+    """normalized name -> lowest Plant id with that name, for the names that exist"""
+    if not names:
+        return {}
+    resolved = {}
+    condition = Q()
+    for name in names:
+        for variant in name_variants(name):
+            condition |= Q(name__iexact=variant)
+    candidates = Plant.objects.filter(condition)
+    for plant_id, name in candidates.order_by('id').values_list('id', 'name'):
+        resolved.setdefault(normalize_name(name), plant_id)
+    return resolved
+
+
+@transaction.atomic
+def sync_plant(plant):
+    """Incrementally update the graph after a plant is saved"""
+    names = companion_edges(plant)
+    resolved = resolve_names(names)
+
+    # Outgoing edges: replace this plant's companion list
+    PlantCompanion.objects.filter(plant=plant).exclude(companion_name__in=names).delete()
+    existing = set(PlantCompanion.objects.filter(plant=plant).values_list('companion_name', flat=True))
+    PlantCompanion.objects.bulk_create(
+        PlantCompanion(plant=plant, companion_name=name, companion_id=resolved.get(name))
+        for name in names - existing
+    )
+    for name in existing:
+        PlantCompanion.objects.filter(plant=plant, companion_name=name).exclude(
+            companion_id=resolved.get(name)).update(companion_id=resolved.get(name))
+
+    # Incoming edges: detach ones that no longer match a renamed plant, attach dangling ones that now do
+    own_name = normalize_name(plant.name)
+    PlantCompanion.objects.filter(companion=plant).exclude(companion_name=own_name).update(companion=None)
+    PlantCompanion.objects.filter(companion_name=own_name, companion__isnull=True).update(companion=plant)
+
+
+def rebuild_graph(batch_size=2000):
+    """Rebuild every edge from Plant.companion_plants; returns the number of edges written"""
+    names_to_id = {}
+    for plant_id, name in Plant.objects.order_by('id').values_list('id', 'name').iterator(chunk_size=batch_size):
+        names_to_id.setdefault(normalize_name(name), plant_id)
+
+    total = 0
+    with transaction.atomic():
+        PlantCompanion.objects.all().delete()
+        batch = []
+        plants = Plant.objects.order_by('id').only('id', 'name', 'companion_plants')
+        for plant in plants.iterator(chunk_size=batch_size):
+            for name in companion_edges(plant):
+                batch.append(PlantCompanion(plant_id=plant.id, companion_name=name,
+                                            companion_id=names_to_id.get(name)))
+            if len(batch) >= batch_size:
+                PlantCompanion.objects.bulk_create(batch)
+                total += len(batch)
+                batch = []
+        PlantCompanion.objects.bulk_create(batch)
+        total += len(batch)
+    return total
+
+
+class CompanionGraph:
+    """Undirected companion graph over resolved plants, in CSR form (indptr/indices over node positions)"""
+
+    def __init__(self, plants, edges):
+        self.plant_ids = np.array(sorted(plants), dtype=np.int64)
+        self.names = [plants[plant_id] for plant_id in self.plant_ids.tolist()]
+        self.by_name = {}
+        for position, name in enumerate(self.names):
+            self.by_name.setdefault(normalize_name(name), position)
+
+        n = len(self.plant_ids)
+        edges = np.array(edges, dtype=np.int64).reshape(-1, 2)
+        # Drop edges to plants deleted between the two reads
+        edges = edges[np.isin(edges, self.plant_ids).all(axis=1)]
+        if len(edges):
+            pairs = np.searchsorted(self.plant_ids, edges)
+            # Companionship goes both ways: store each edge in both directions, once
+            both = np.unique(np.concatenate([pairs, pairs[:, ::-1]]), axis=0)
+            sources, targets = both[:, 0], both[:, 1]
+        else:
+            sources = targets = np.array([], dtype=np.int64)
+        self.indices = targets
+        self.indptr = np.zeros(n + 1, dtype=np.int64)
+        np.cumsum(np.bincount(sources, minlength=n), out=self.indptr[1:])
+
+    def neighbours(self, position):
+        return self.indices[self.indptr[position]:self.indptr[position + 1]]
+
+    def resolve(self, *names):
+        for name in names:
+            position = self.by_name.get(normalize_name(name))
+            if position is not None:
+                return position
+        return None
+
+    def score_garden(self, tracked_plants, limit=SUGGESTION_LIMIT):
+        """
+        Score a whole garden in one pass: which tracked plants are companions of each other,
+        and which catalogue plants are companions of the most tracked plants.
+        """
+        positions = [self.resolve(tp['type'], tp['name']) for tp in tracked_plants]
+        garden = np.array(sorted({p for p in positions if p is not None}), dtype=np.int64)
+
+        tracked = []
+        position_to_tracked = {}
+        for tp, position in zip(tracked_plants, positions):
+            if position is not None:
+                position_to_tracked.setdefault(position, []).append(tp['id'])
+        for tp, position in zip(tracked_plants, positions):
+            in_garden = []
+            if position is not None:
+                neighbours = self.neighbours(position)
+                for neighbour in neighbours[np.isin(neighbours, garden)]:
+                    in_garden.extend(position_to_tracked[int(neighbour)])
+            tracked.append({
+                'id': tp['id'],
+                'name': tp['name'],
+                'plant_id': int(self.plant_ids[position]) if position is not None else None,
+                'companions_in_garden': in_garden,
+            })
+
+        suggestions = []
+        if len(garden):
+            reached = np.concatenate([self.neighbours(p) for p in garden])
+            counts = np.bincount(reached, minlength=len(self.plant_ids))
+            counts[garden] = 0
+            best = np.argsort(-counts, kind='stable')[:limit]
+            for position in best[counts[best] > 0]:
+                neighbours = self.neighbours(position)
+                partners = neighbours[np.isin(neighbours, garden)]
+                suggestions.append({
+                    'plant_id': int(self.plant_ids[position]),
+                    'name': self.names[position],
+                    'score': int(counts[position]),
+                    'pairs_with': [tp_id for p in partners for tp_id in position_to_tracked[int(p)]],
+                })
+
+        compatible_pairs = sum(len(t['companions_in_garden']) for t in tracked) // 2
+        return {'tracked': tracked, 'suggestions': suggestions, 'compatible_pairs': compatible_pairs}
+
+
+_graph = None
+_graph_lock = threading.Lock()
+
+
+def get_companion_graph():
+    """Per-process graph, rebuilt when the catalogue version changes"""
+    global _graph
+    version = get_catalogue_version()
+    if _graph is None or _graph[0] != version:
+        with _graph_lock:
+            if _graph is None or _graph[0] != version:
+                plants = dict(Plant.objects.order_by().values_list('id', 'name'))
+                edges = list(PlantCompanion.objects.filter(companion__isnull=False)
+                             .values_list('plant_id', 'companion_id'))
+                _graph = (version, CompanionGraph(plants, edges))
+    return _graph[1]
@@ -0,0 +1,208 @@
+from collections import Counter, defaultdict
+from datetime import timedelta
+
+from django.db import transaction
+from django.db.models import Count, F, Window
+from django.db.models.functions import RowNumber
+from django.utils import timezone
+
+from .models import DashboardSummary, PlantReminder, TrackedPlant
+
+UPCOMING_ITEMS = 10
+SUMMARY_FIELDS = ['plants_total', 'health_counts', 'open_reminders', 'reminder_calendar', 'upcoming']
+
+
+def empty_summary():
+    return {'plants_total': 0, 'health_counts': {}, 'open_reminders': 0, 'reminder_calendar': {}, 'upcoming': []}
+
+
+def upcoming_entry(reminder_id, reminder_type, due_date, tracked_plant_id, plant_name):
+    return {
+        'id': reminder_id,
+        'type': reminder_type,
+        'due_date': str(due_date),
+        'tracked_plant': tracked_plant_id,
+        'plant_name': plant_name,
+    }
+
+
+def compute_upcoming(user_ids, today):
+    """user id -> the first UPCOMING_ITEMS open reminders due today or later"""
+    # Overdue reminders are counted from the calendar; listing them here would crowd out what is coming up
+    upcoming = (
+        PlantReminder.objects.filter(user_id__in=user_ids, completed=False, due_date__gte=today)
+        .annotate(position=Window(RowNumber(), partition_by=F('user_id'), order_by=[F('due_date').asc(), F('id').asc()]))
+        .filter(position__lte=UPCOMING_ITEMS)
+        .order_by('user_id', 'position')
+        .values_list('user_id', 'id', 'type', 'due_date', 'tracked_plant_id', 'tracked_plant__name')
+    )
+    entries = defaultdict(list)
+    for user_id, *fields in upcoming:
+        entries[user_id].append(upcoming_entry(*fields))
+    return entries
+
+
+def compute_summaries(user_ids):
+    """user id -> summary fields, for a batch of users in three grouped queries"""
+    summaries = {user_id: empty_summary() for user_id in user_ids}
+    if not summaries:
+        return summaries
+
+    health = (TrackedPlant.objects.filter(user_id__in=summaries).order_by()
+              .values_list('user_id', 'health_status').annotate(count=Count('id')))
+    for user_id, health_status, count in health:
+        summary = summaries[user_id]
+        summary['health_counts'][health_status] = count
+        summary['plants_total'] += count
+
+    calendar = (PlantReminder.objects.filter(user_id__in=summaries, completed=False).order_by()
+                .values_list('user_id', 'type', 'due_date').annotate(count=Count('id')))
+    for user_id, reminder_type, due_date, count in calendar:
+        summary = summaries[user_id]
+        summary['reminder_calendar'].setdefault(reminder_type, {})[due_date.isoformat()] = count
+        summary['open_reminders'] += count
+
+    for user_id, entries in compute_upcoming(summaries, timezone.localdate()).items():
+        summaries[user_id]['upcoming'] = entries
+    return summaries
+
+
+def refresh_summaries(user_ids):
+    """Recompute and upsert the summary rows of these users; for bulk writes and check_dashboards"""
+    summaries = compute_summaries(set(user_ids))
+    DashboardSummary.objects.bulk_create(
+        [DashboardSummary(user_id=user_id, **fields) for user_id, fields in summaries.items()],
+        update_conflicts=True, unique_fields=['user'], update_fields=SUMMARY_FIELDS + ['updated_at'],
+    )
+    return summaries
+
+
+class SummaryDelta:
+    """Changes to one user's summary, collected from model signals (see api.signals)"""
+
+    def __init__(self):
+        self.plants_total = 0
+        self.health_counts = Counter()
+        self.calendar = Counter()  # (type, ISO due date) -> change in open reminders
+        self.unlisted = set()  # Reminder ids to drop from upcoming
+        self.listed = {}  # Reminder id -> upcoming entry to (re)insert
+        self.plant_names = {}  # Tracked plant id -> name shown in upcoming
+        self.reload_upcoming = False
+        self.recompute = False  # Some change couldn't be expressed as a delta
+
+    def count_plant(self, health_status, sign):
+        self.plants_total += sign
+        self.health_counts[health_status] += sign
+
+    def count_reminder(self, reminder_id, reminder_type, due_date, sign):
+        self.calendar[reminder_type, str(due_date)] += sign
+        self.listed.pop(reminder_id, None)
+        if sign < 0:
+            self.unlisted.add(reminder_id)
+
+
+def adjust_counts(counts, key, change):
+    value = counts.get(key, 0) + change
+    if value > 0:
+        counts[key] = value
+    else:
+        counts.pop(key, None)
+
+
+def merge_upcoming(upcoming, delta, today):
+    """The upcoming list with the delta applied, or None if it has to be re-read"""
+    if delta.reload_upcoming:
+        return None
+    today = today.isoformat()
+    kept = [entry for entry in upcoming
+            if entry['id'] not in delta.unlisted and entry['id'] not in delta.listed and entry['due_date'] >= today]
+    # A full list that lost an entry no longer knows which reminder comes next
+    if len(upcoming) >= UPCOMING_ITEMS and len(kept) < len(upcoming):
+        return None
+    kept.extend(entry for entry in delta.listed.values() if entry['due_date'] >= today)
+    kept.sort(key=lambda entry: (entry['due_date'], entry['id']))
+    for entry in kept:
+        if entry['tracked_plant'] in delta.plant_names:
+            entry['plant_name'] = delta.plant_names[entry['tracked_plant']]
+    return kept[:UPCOMING_ITEMS]
+
+
+def apply_deltas(deltas):
+    """
+    Apply {user id: SummaryDelta} to the stored summaries: two primary-key queries for the
+    batch, plus one to re-read upcoming lists that can't be patched.
+    """
+    today = timezone.localdate()
+    recompute = {user_id for user_id, delta in deltas.items() if delta.recompute}
+    with transaction.atomic():
+        summaries = list(DashboardSummary.objects.select_for_update()
+                         .filter(pk__in=set(deltas) - recompute).order_by('pk'))
+        reload = []
+        for summary in summaries:
+            delta = deltas[summary.pk]
+            summary.plants_total += delta.plants_total
+            for health_status, change in delta.health_counts.items():
+                adjust_counts(summary.health_counts, health_status, change)
+            for (reminder_type, due_date), change in delta.calendar.items():
+                dates = summary.reminder_calendar.setdefault(reminder_type, {})
+                adjust_counts(dates, due_date, change)
+                if not dates:
+                    del summary.reminder_calendar[reminder_type]
+                summary.open_reminders += change
+            upcoming = merge_upcoming(summary.upcoming, delta, today)
+            if upcoming is None:
+                reload.append(summary)
+            else:
+                summary.upcoming = upcoming
+        if reload:
+            upcoming = compute_upcoming([summary.pk for summary in reload], today)
+            for summary in reload:
+                summary.upcoming = upcoming.get(summary.pk, [])
+        now = timezone.now()
+        for summary in summaries:
+            summary.updated_at = now
+        DashboardSummary.objects.bulk_update(summaries, SUMMARY_FIELDS + ['updated_at'])
+    # Missing rows are rebuilt whole, like check_dashboards --fix does
+    recompute |= set(deltas) - {summary.pk for summary in summaries}
+    if recompute:
+        refresh_summaries(recompute)
+
+
+def upcoming_outdated(stored, expected, today):
+    """
+    Whether a stored upcoming list only differs from the expected one by entries that have
+    fallen due since it was written: not drift, but a shorter list until the next refresh.
+    """
+    today = today.isoformat()
+    current = [entry for entry in stored if entry['due_date'] >= today]
+    return len(current) < len(stored) and current == expected[:len(current)]
+
+
+def get_summary(user_id):
+    """The user's summary fields in one primary-key read"""
+    # Rows are created with the user and backfilled by migration; check_dashboards --fix repairs any gap
+    return DashboardSummary.objects.filter(pk=user_id).values(*SUMMARY_FIELDS).first() or empty_summary()
+
+
+def present_summary(summary, today):
+    """Add the date-dependent numbers, derived from the stored reminder calendar"""
+    week_end = (today + timedelta(days=7)).isoformat()
+    today = today.isoformat()
+    overdue = due_this_week = 0
+    for dates in summary['reminder_calendar'].values():
+        for due_date, count in dates.items():
+            if due_date < today:
+                overdue += count
+            elif due_date <= week_end:
+                due_this_week += count
+    watering = summary['reminder_calendar'].get('Watering')
+    return {
+        'plants_total': summary['plants_total'],
+        'plants_by_health': summary['health_counts'],
+        'open_reminders': summary['open_reminders'],
+        'overdue_reminders': overdue,
+        'due_this_week': due_this_week,
+        'next_watering': min(watering) if watering else None,
+        # Stored entries fall due as days pass; they are counted as overdue from then on
+        'upcoming_reminders': [entry for entry in summary['upcoming'] if entry['due_date'] >= today],
+    }
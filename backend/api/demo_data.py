@@ -0,0 +1,75 @@
+# Vocabularies for fabricated data, shared by add_demo_plants and generate_load_data
+
+PLANT_TYPES = [
+    ('Rose', 'Rosa', 'flower'),
+    ('Tomato', 'Solanum lycopersicum', 'vegetable'),
+    ('Apple Tree', 'Malus domestica', 'fruit'),
+    ('Lavender', 'Lavandula', 'flower'),
+    ('Carrot', 'Daucus carota', 'vegetable'),
+    ('Strawberry', 'Fragaria × ananassa', 'fruit'),
+    ('Sunflower', 'Helianthus annuus', 'flower'),
+    ('Cucumber', 'Cucumis sativus', 'vegetable'),
+    ('Lemon Tree', 'Citrus limon', 'fruit'),
+    ('Tulip', 'Tulipa', 'flower'),
+    ('Bell Pepper', 'Capsicum annuum', 'vegetable'),
+    ('Blueberry', 'Vaccinium corymbosum', 'fruit'),
+    ('Dahlia', 'Dahlia pinnata', 'flower'),
+    ('Lettuce', 'Lactuca sativa', 'vegetable'),
+    ('Orange Tree', 'Citrus × sinensis', 'fruit'),
+    ('Peony', 'Paeonia', 'flower'),
+    ('Spinach', 'Spinacia oleracea', 'vegetable'),
+    ('Grape Vine', 'Vitis vinifera', 'fruit'),
+    ('Chrysanthemum', 'Chrysanthemum', 'flower'),
+    ('Broccoli', 'Brassica oleracea var. italica', 'vegetable'),
+]
+
+SOIL_TYPES = ['sandy', 'loamy', 'clay', 'silt']
+SUNLIGHT_OPTIONS = ['full_sun', 'partial_sun', 'shade']
+WATERING_SCHEDULES = ['daily', 'weekly', 'custom']
+
+GROWTH_STAGES = [
+    ['Seedling', 'Vegetative', 'Flowering', 'Fruiting'],
+    ['Germination', 'Leaf Development', 'Maturity'],
+    ['Early Growth', 'Establishment', 'Peak Growth', 'Dormancy']
+]
+
+PESTS = [
+    'Aphids', 'Spider Mites', 'Whiteflies', 'Caterpillars',
+    'Japanese Beetles', 'Slugs', 'Scale Insects', 'Thrips'
+]
+
+COMPANION_PLANTS = [
+    'Marigold', 'Basil', 'Nasturtium', 'Garlic', 'Mint',
+    'Dill', 'Chamomile', 'Oregano', 'Thyme', 'Chives'
+]
+
+
+def demo_plant_fields(rng, name, scientific_name, category):
+    """Plant field values with realistic random details; rng is the random module or a random.Random"""
+    return dict(
+        name=name,
+        scientific_name=scientific_name,
+        category=category,
+        soil_type=rng.choice(SOIL_TYPES),
+        sunlight=rng.choice(SUNLIGHT_OPTIONS),
+        watering_schedule=rng.choice(WATERING_SCHEDULES),
+        fertilization_needs=rng.choice([True, False]),
+        growth_stages=rng.choice(GROWTH_STAGES),
+        pests=rng.sample(PESTS, k=rng.randint(2, 4)),
+        climate_suitability=rng.choice(['Tropical', 'Mediterranean', 'Temperate', 'Continental']),
+        care_instructions=f"1. Plant in well-draining soil\\n2. Water {rng.choice(['regularly', 'moderately', 'sparingly'])}\\n3. Fertilize {rng.choice(['monthly', 'quarterly', 'annually'])}\\n4. Prune as needed for shape and health",
+        companion_plants=rng.sample(COMPANION_PLANTS, k=rng.randint(2, 4)),
+        lifespan=rng.choice(['Annual', 'Biennial', 'Perennial', '2-3 years', '5-10 years']),
+        ideal_temperature=f"{rng.randint(15, 25)}°C - {rng.randint(26, 35)}°C",
+        humidity_needs=f"{rng.randint(40, 60)}% - {rng.randint(61, 80)}%",
+        characteristics=f"A {rng.choice(['hardy', 'delicate', 'robust', 'versatile'])} plant with {rng.choice(['beautiful flowers', 'edible fruits', 'aromatic leaves', 'ornamental value'])}.",
+        growth_time=f"{rng.randint(60, 180)} days",
+        harvest_time=rng.choice(['Spring', 'Summer', 'Fall', 'Winter', 'Year-round']),
+        yield_potential=f"{rng.randint(1, 10)} kg per plant" if category in ['vegetable', 'fruit'] else 'N/A',
+        disease_resistance=rng.choice(['High', 'Medium', 'Low']),
+        seasonal_preferences=rng.choice(['Spring planting', 'Summer planting', 'Fall planting', 'Year-round planting']),
+        propagation_methods=', '.join(rng.sample(['Seeds', 'Cuttings', 'Division', 'Layering'], k=rng.randint(1, 3))),
+        pruning_needs=rng.choice(['Regular pruning required', 'Minimal pruning needed', 'Annual pruning recommended']),
+        soil_ph_preference=f"{rng.randint(5, 7)}.{rng.randint(0, 9)} - {rng.randint(6, 8)}.{rng.randint(0, 9)}",
+        nutrient_requirements=rng.choice(['High', 'Medium', 'Low'])
+    )
@@ -0,0 +1,91 @@
+import math
+
+from django.db.models import Count
+from rest_framework.exceptions import ValidationError
+
+from .models import Plant
+
+# Facet field -> allowed values
+FACETS = {
+    'category': dict(Plant.CATEGORY_CHOICES),
+    'soil_type': dict(Plant.SOIL_TYPES),
+    'sunlight': dict(Plant.SUNLIGHT_CHOICES),
+    'watering_schedule': dict(Plant.WATERING_CHOICES),
+}
+
+# Query parameter -> (parsed bound column, lookup) for range overlap filtering
+RANGE_FILTERS = {
+    'min_temperature': ('temperature_max', 'gte'),
+    'max_temperature': ('temperature_min', 'lte'),
+    'min_humidity': ('humidity_max', 'gte'),
+    'max_humidity': ('humidity_min', 'lte'),
+}
+
+
+def parse_facet_filters(params):
+    """?category=flower,fruit -> {'category': ['flower', 'fruit']}; unknown values are a 400"""
+    selected = {}
+    for field, choices in FACETS.items():
+        raw = params.get(field)
+        if not raw:
+            continue
+        values = [value.strip() for value in raw.split(',') if value.strip()]
+        unknown = [value for value in values if value not in choices]
+        if unknown:
+            raise ValidationError({'error': f"Unknown {field}: {', '.join(unknown)}. "
+                                            f"Choose from {', '.join(choices)}"})
+        if values:
+            selected[field] = values
+    return selected
+
+
+def apply_facet_filters(queryset, selected, exclude=None):
+    for field, values in selected.items():
+        if field == exclude:
+            continue
+        if len(values) == 1:
+            queryset = queryset.filter(**{field: values[0]})
+        else:
+            queryset = queryset.filter(**{f'{field}__in': values})
+    return queryset
+
+
+def apply_range_filters(queryset, params):
+    """
+    Keep plants whose parsed ideal range overlaps the requested one, e.g.
+    ?min_temperature=18&max_temperature=24 matches a plant listed as "20-30°C".
+    """
+    for param, (column, lookup) in RANGE_FILTERS.items():
+        raw = params.get(param)
+        if raw in (None, ''):
+            continue
+        try:
+            value = float(raw)
+        except ValueError:
+            value = math.nan
+        if not math.isfinite(value):
+            raise ValidationError({'error': f'{param} must be a number'})
+        queryset = queryset.filter(**{f'{column}__{lookup}': value})
+    return queryset
+
+
+def facet_counts(queryset, selected):
+    """
+    Per-value counts for every facet, from a single GROUP BY over all facet columns.
+
+    queryset must already carry the non-facet filters (search, ranges). Each facet is
+    counted with every other facet's selection applied but not its own, so the UI can
+    show how many results picking another value would give.
+    """
+    fields = list(FACETS)
+    rows = list(queryset.order_by().values(*fields).annotate(count=Count('id')))
+
+    counts = {field: {value: 0 for value in choices} for field, choices in FACETS.items()}
+    for row in rows:
+        for field in fields:
+            matches_others = all(
+                row[other] in values for other, values in selected.items() if other != field
+            )
+            if matches_others and row[field] in counts[field]:
+                counts[field][row[field]] += row['count']
+    return counts
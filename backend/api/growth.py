@@ -0,0 +1,131 @@
+from datetime import date, datetime, time, timedelta
+
+from django.db import connection, transaction
+from django.db.models import Avg, Count, Max, Min, Q
+from django.db.models.functions import TruncDay, TruncMonth, TruncWeek
+from django.utils import timezone
+from django.utils.dateparse import parse_date, parse_datetime
+
+HEALTH_STATUSES = ['Excellent', 'Good', 'Fair', 'Poor']
+MAX_INGEST = 1000
+MAX_POINTS = 400
+RAW_LIMIT = 500
+DEFAULT_RANGE = timedelta(days=365)
+
+# bucket -> (truncation, bucket width used to check the point count)
+BUCKETS = {
+    'day': (TruncDay, timedelta(days=1)),
+    'week': (TruncWeek, timedelta(days=7)),
+    'month': (TruncMonth, timedelta(days=30)),
+}
+
+
+# Partitioning (Postgres only)
+
+def add_months(month, count):
+    years, index = divmod(month.month - 1 + count, 12)
+    return date(month.year + years, index + 1, 1)
+
+
+def partition_name(table, month):
+    return f'{table}_y{month:%Y}m{month:%m}'
+
+
+def partition_statement(table, month):
+    """CREATE statement for the partition of table holding the month starting at month"""
+    return (
+        f'CREATE TABLE IF NOT EXISTS "{partition_name(table, month)}" PARTITION OF "{table}" '
+        f"FOR VALUES FROM ('{month.isoformat()} 00:00:00+00') TO ('{add_months(month, 1).isoformat()} 00:00:00+00')"
+    )
+
+
+def partition_statements(table, first_month, months):
+    """CREATE statements for monthly partitions of table, starting at first_month"""
+    return [partition_statement(table, add_months(first_month, offset)) for offset in range(months)]
+
+
+def default_partition_months(cursor, table):
+    """First days of the months that have rows sitting in table's default partition"""
+    cursor.execute(
+        f"SELECT DISTINCT date_trunc('month', recorded_at AT TIME ZONE 'UTC')::date "
+        f'FROM "{table}_default" ORDER BY 1'
+    )
+    return [row[0] for row in cursor.fetchall()]
+
+
+def split_default_partition(cursor, table, months):
+    """
+    Give each of these months its own partition and move its rows there from the default
+    partition; returns the rows moved. Postgres refuses to create a partition whose range
+    matches rows in the default, so the default is detached meanwhile. Run in a transaction.
+    """
+    if not months:
+        return 0
+    cursor.execute(f'ALTER TABLE "{table}" DETACH PARTITION "{table}_default"')
+    moved = 0
+    for month in months:
+        cursor.execute(partition_statement(table, month))
+        cursor.execute(
+            f'WITH moved AS (DELETE FROM "{table}_default" WHERE recorded_at >= %s AND recorded_at < %s '
+            f'RETURNING *) INSERT INTO "{table}" SELECT * FROM moved',
+            [f'{month.isoformat()} 00:00:00+00', f'{add_months(month, 1).isoformat()} 00:00:00+00'],
+        )
+        moved += cursor.rowcount
+    cursor.execute(f'ALTER TABLE "{table}" ATTACH PARTITION "{table}_default" DEFAULT')
+    return moved
+
+
+def create_partitions(months_ahead=3, today=None):
+    """
+    Make sure the current and next months_ahead months have partitions, and move any rows
+    that landed in the default partition (a cron gap, backfilled history) into partitions of
+    their own. Returns (upcoming months ensured, rows moved).
+    """
+    from .models import GrowthLog
+
+    if connection.vendor != 'postgresql':
+        return 0, 0
+    table = GrowthLog._meta.db_table
+    today = today or timezone.now().date()
+    statements = partition_statements(table, today.replace(day=1), months_ahead + 1)
+    with transaction.atomic(), connection.cursor() as cursor:
+        stranded = default_partition_months(cursor, table)
+        moved = split_default_partition(cursor, table, stranded)
+        for sql in statements:
+            cursor.execute(sql)
+    return len(statements), moved
+
+
+# Querying
+
+def parse_moment(value, end_of_day=False):
+    """An ISO date or datetime from a query parameter, as an aware datetime; None if unparseable"""
+    moment = parse_datetime(value)
+    if moment is None:
+        day = parse_date(value)
+        if day is None:
+            return None
+        moment = datetime.combine(day, time.max if end_of_day else time.min)
+    if timezone.is_naive(moment):
+        moment = timezone.make_aware(moment)
+    return moment
+
+
+def pick_bucket(start, end):
+    """The finest bucket that keeps the range under MAX_POINTS points"""
+    for name, (_, width) in BUCKETS.items():
+        if (end - start) / width <= MAX_POINTS:
+            return name
+    return 'month'
+
+
+def rollup(logs, bucket):
+    """Aggregate logs into one row per bucket: counts, height stats and a health breakdown"""
+    trunc = BUCKETS[bucket][0]
+    health = {f'health_{status.lower()}': Count('id', filter=Q(health_status=status)) for status in HEALTH_STATUSES}
+    return list(
+        logs.annotate(bucket=trunc('recorded_at')).order_by().values('bucket')
+        .annotate(logs=Count('id'), height_avg=Avg('height_cm'), height_min=Min('height_cm'),
+                  height_max=Max('height_cm'), **health)
+        .order_by('bucket')
+    )
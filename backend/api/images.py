@@ -0,0 +1,149 @@
+import hashlib
+import logging
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.db import connection, models
+from django.db.models.fields.files import ImageFieldFile
+from django.utils import timezone
+
+logger = logging.getLogger(__name__)
+
+# Widths generated for every plant image, each as WebP and a JPEG fallback
+VARIANT_WIDTHS = [160, 320, 640, 1280]
+VARIANT_FORMATS = {
+    'webp': ('WEBP', {'quality': 80, 'method': 4}),
+    'jpeg': ('JPEG', {'quality': 82, 'optimize': True, 'progressive': True}),
+}
+DERIVED_DIR = 'plant_images/derived'
+
+
+def content_digest(file):
+    """sha256 of a file's bytes, leaving it at position 0"""
+    digest = hashlib.sha256()
+    file.seek(0)
+    for chunk in iter(lambda: file.read(64 * 1024), b''):
+        digest.update(chunk)
+    file.seek(0)
+    return digest.hexdigest()
+
+
+def plant_image_path(instance, filename):
+    """upload_to for Plant.image; filename is already the content digest (see ContentAddressedFieldFile)"""
+    return f'plant_images/{filename[:2]}/{filename}'
+
+
+class ContentAddressedFieldFile(ImageFieldFile):
+    """Names uploads by their sha256, so a file's URL never changes meaning and identical uploads share one file"""
+
+    def save(self, name, content, save=True):
+        name = content_digest(content) + os.path.splitext(name)[1].lower()
+        path = self.field.generate_filename(self.instance, name)
+        if not self.storage.exists(path):
+            return super().save(name, content, save)
+        self.name = path
+        setattr(self.instance, self.field.attname, self.name)
+        self._committed = True
+        if save:
+            self.instance.save()
+
+
+class ContentAddressedImageField(models.ImageField):
+    attr_class = ContentAddressedFieldFile
+
+
+def save_once(name, content):
+    # Content-addressed: an existing file with this name already holds these bytes
+    if not default_storage.exists(name):
+        default_storage.save(name, ContentFile(content))
+    return name
+
+
+def build_variants(name):
+    """Write the resized WebP/JPEG derivatives of a stored image; returns what Plant.image_variants stores"""
+    from PIL import Image, ImageOps
+
+    with default_storage.open(name, 'rb') as source:
+        digest = content_digest(source)
+        image = ImageOps.exif_transpose(Image.open(source))
+        image.load()
+    width, height = image.size
+    if image.mode in ('RGBA', 'LA', 'P'):
+        image = image.convert('RGBA')
+        # JPEG has no alpha: flatten onto white
+        opaque = Image.new('RGB', image.size, (255, 255, 255))
+        opaque.paste(image, mask=image.getchannel('A'))
+    else:
+        image = opaque = image.convert('RGB')
+
+    # Never upscale. Below the largest step the native width is the largest variant, so a
+    # 1000px original still serves 1000px instead of stopping at 640
+    widths = [size for size in VARIANT_WIDTHS if size < width]
+    if width <= VARIANT_WIDTHS[-1]:
+        widths.append(width)
+    variants = []
+    for size in widths:
+        size_height = max(1, round(height * size / width))
+        for extension, (image_format, options) in VARIANT_FORMATS.items():
+            base = opaque if image_format == 'JPEG' else image
+            resized = base.resize((size, size_height), Image.LANCZOS) if size != width else base
+            output = BytesIO()
+            resized.save(output, image_format, **options)
+            variants.append({
+                'width': size,
+                'height': size_height,
+                'format': extension,
+                'name': save_once(f'{DERIVED_DIR}/{digest[:2]}/{digest}-{size}.{extension}', output.getvalue()),
+            })
+    return {'source': name, 'width': width, 'height': height, 'variants': variants}
+
+
+def process_plant(plant_id):
+    """(Re)build one plant's image variants; a no-op if its image changed again meanwhile"""
+    from .catalogue import invalidate_catalogue_version
+    from .models import Plant
+
+    plant = Plant.objects.filter(pk=plant_id).only('id', 'image').first()
+    if plant is None:
+        return None
+    variants = build_variants(plant.image.name) if plant.image else {}
+    # update() skips post_save, so this doesn't schedule the plant again
+    updated = Plant.objects.filter(pk=plant_id, image=plant.image.name).update(
+        image_variants=variants, updated_at=timezone.now())
+    if updated:
+        invalidate_catalogue_version()
+    return variants
+
+
+# Background pool: uploads return immediately, variants appear once built
+
+_executor = None
+_executor_lock = threading.Lock()
+
+
+def get_executor():
+    global _executor
+    with _executor_lock:
+        if _executor is None:
+            _executor = ThreadPoolExecutor(max_workers=getattr(settings, 'IMAGE_WORKERS', 2),
+                                           thread_name_prefix='plant-images')
+        return _executor
+
+
+def _run(plant_id):
+    try:
+        process_plant(plant_id)
+    except Exception:
+        logger.exception('Image variants failed plant=%s', plant_id)
+    finally:
+        # Each pool thread has its own connection
+        connection.close()
+
+
+def schedule_variants(plant_id):
+    return get_executor().submit(_run, plant_id)
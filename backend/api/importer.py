@@ -0,0 +1,228 @@
+import csv
+import io
+import json
+import os
+
+from django.core.exceptions import ValidationError
+from django.db import connection, models, transaction
+from django.utils import timezone
+
+from .models import Plant
+from .names import normalize_name
+
+# Columns an import may set; the climate bounds are derived, timestamps are set on write
+SKIPPED_FIELDS = {'id', 'external_id', 'image', 'created_at', 'updated_at'}
+IMPORT_FIELDS = [field for field in Plant._meta.concrete_fields
+                 if field.editable and field.name not in SKIPPED_FIELDS]
+BOUND_FIELDS = [field for _, low, high in Plant.CLIMATE_SOURCES.values() for field in (low, high)]
+# Written on insert and overwritten on conflict
+UPSERT_FIELDS = [field.name for field in IMPORT_FIELDS] + BOUND_FIELDS
+
+EXTERNAL_ID = Plant._meta.get_field('external_id')
+
+TRUE_VALUES = {'true', 't', 'yes', 'y', '1'}
+FALSE_VALUES = {'false', 'f', 'no', 'n', '0', ''}
+
+
+class RowError(ValueError):
+    pass
+
+
+def detect_format(path):
+    return 'jsonl' if os.path.splitext(path)[1].lower() in ('.jsonl', '.ndjson') else 'csv'
+
+
+def read_rows(path, file_format):
+    """(row number, dict) for each record of a CSV file with a header line, or of a JSON-lines file"""
+    with open(path, newline='', encoding='utf-8-sig') as source:
+        if file_format == 'csv':
+            for number, row in enumerate(csv.DictReader(source), start=1):
+                yield number, row
+            return
+        number = 0
+        for line in source:
+            if not line.strip():
+                continue
+            number += 1
+            try:
+                row = json.loads(line)
+            except ValueError as e:
+                yield number, RowError(f'invalid JSON: {e}')
+                continue
+            yield number, row if isinstance(row, dict) else RowError('expected a JSON object')
+
+
+def choice_lookup(field):
+    """lowercased value or label -> stored value, so 'Full Sun' and 'full_sun' both import"""
+    lookup = {}
+    for value, label in field.choices:
+        lookup[str(value).lower()] = value
+        lookup[str(label).lower()] = value
+    return lookup
+
+
+CHOICES = {field.name: choice_lookup(field) for field in IMPORT_FIELDS if field.choices}
+
+
+def coerce(field, value):
+    """A raw CSV/JSON value as the field's Python value; CSV lists are JSON arrays or ';'-separated"""
+    if isinstance(value, str):
+        value = value.strip()
+    if field.name in CHOICES and isinstance(value, str):
+        return CHOICES[field.name].get(value.lower(), value)
+    if isinstance(field, models.BooleanField) and isinstance(value, str):
+        if value.lower() in TRUE_VALUES:
+            return True
+        if value.lower() in FALSE_VALUES:
+            return False
+        return value
+    if isinstance(field, models.JSONField) and isinstance(value, str):
+        if value.startswith('['):
+            return json.loads(value)
+        return [item.strip() for item in value.split(';') if item.strip()]
+    if value in (None, '') and field.null:
+        return None
+    if value is None:
+        return ''
+    return value
+
+
+def natural_key(scientific_name, name):
+    """external_id of a row without its own key: the normalized scientific (or common) name"""
+    return normalize_name(scientific_name or name)
+
+
+def key_existing_plants(plant_model=Plant, batch_size=2000):
+    """
+    Give catalogue rows without an external_id (created before imports had keys, or through the
+    API) their natural key, so an import of the same plant updates them instead of adding a
+    duplicate. When two rows share a key the older one gets it. Returns the rows keyed.
+    """
+    taken = set(plant_model.objects.exclude(external_id=None).values_list('external_id', flat=True))
+    keyed = []
+    unkeyed = plant_model.objects.filter(external_id=None).order_by('id').only('id', 'name', 'scientific_name')
+    for plant in unkeyed.iterator(chunk_size=batch_size):
+        key = natural_key(plant.scientific_name, plant.name)
+        if key and key not in taken:
+            taken.add(key)
+            plant.external_id = key
+            keyed.append(plant)
+    plant_model.objects.bulk_update(keyed, ['external_id'], batch_size=batch_size)
+    return len(keyed)
+
+
+def build_plant(row):
+    """A validated, unsaved Plant for one input record; raises RowError"""
+    values = {}
+    errors = []
+    for field in IMPORT_FIELDS:
+        try:
+            value = coerce(field, row.get(field.name))
+            if value in field.empty_values and field.has_default():
+                # e.g. no pests listed: the default empty list, which clean() would reject as blank
+                values[field.name] = field.get_default()
+                continue
+            values[field.name] = field.clean(value, None)
+        except (ValidationError, ValueError) as e:
+            messages = e.messages if isinstance(e, ValidationError) else [str(e)]
+            errors.append(f"{field.name}: {' '.join(messages)}")
+    external_id = str(row.get('external_id') or '').strip()
+    try:
+        EXTERNAL_ID.clean(external_id, None)
+    except ValidationError as e:
+        errors.append(f"external_id: {' '.join(e.messages)}")
+    if errors:
+        raise RowError('; '.join(errors))
+
+    plant = Plant(**values)
+    plant.external_id = external_id or natural_key(plant.scientific_name, plant.name)
+    plant.parse_climate()
+    return plant
+
+
+def validated_plants(rows, errors):
+    """Plants for the valid rows; (row number, message) of the others go to errors"""
+    for number, row in rows:
+        if isinstance(row, RowError):
+            errors.append((number, str(row)))
+            continue
+        try:
+            yield number, build_plant(row)
+        except RowError as e:
+            errors.append((number, str(e)))
+
+
+def upsert(plants):
+    """Insert or update one batch on external_id; returns the number of rows written"""
+    # Within a batch the last row for a key wins; an upsert can't touch the same row twice
+    plants = list({plant.external_id: plant for plant in plants}.values())
+    with transaction.atomic():
+        Plant.objects.bulk_create(plants, update_conflicts=True, unique_fields=['external_id'],
+                                  update_fields=UPSERT_FIELDS + ['updated_at'])
+    return len(plants)
+
+
+def copy_value(value):
+    # CSV for COPY: an unquoted empty field is NULL, a quoted one an empty string
+    if value is None:
+        return ''
+    if isinstance(value, (list, dict)):
+        value = json.dumps(value)
+    elif isinstance(value, bool):
+        value = 't' if value else 'f'
+    return '"' + str(value).replace('"', '""') + '"'
+
+
+def copy_upsert(plants):
+    """upsert through COPY into a temporary table and one INSERT ... ON CONFLICT (Postgres only)"""
+    plants = list({plant.external_id: plant for plant in plants}.values())
+    columns = ['external_id'] + UPSERT_FIELDS
+    table = Plant._meta.db_table
+    quoted = ', '.join(f'"{column}"' for column in columns)
+    data = io.StringIO()
+    for plant in plants:
+        data.write(','.join(copy_value(getattr(plant, column)) for column in columns) + '\n')
+    data.seek(0)
+
+    now = timezone.now()
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(f'CREATE TEMP TABLE plant_import ON COMMIT DROP AS SELECT {quoted} FROM "{table}" WITH NO DATA')
+        copy_sql = f'COPY plant_import ({quoted}) FROM STDIN WITH (FORMAT csv)'
+        raw = cursor.cursor
+        if hasattr(raw, 'copy_expert'):  # psycopg2
+            raw.copy_expert(copy_sql, data)
+        else:  # psycopg 3
+            with raw.copy(copy_sql) as copy:
+                copy.write(data.getvalue())
+        updates = ', '.join(f'"{column}" = EXCLUDED."{column}"' for column in UPSERT_FIELDS + ['updated_at'])
+        # image_variants has no database default; updates keep the variants already built
+        cursor.execute(
+            f'INSERT INTO "{table}" ({quoted}, "image_variants", "created_at", "updated_at") '
+            f'SELECT {quoted}, %s, %s, %s FROM plant_import '
+            f'ON CONFLICT ("external_id") DO UPDATE SET {updates}',
+            [json.dumps(Plant._meta.get_field('image_variants').get_default()), now, now],
+        )
+        # ON COMMIT DROP alone would keep it for the next batch when the caller holds a transaction
+        cursor.execute('DROP TABLE plant_import')
+    return len(plants)
+
+
+def read_checkpoint(path, source):
+    """Rows of source already imported according to the checkpoint file, 0 if there is none for it"""
+    try:
+        with open(path, encoding='utf-8') as checkpoint_file:
+            checkpoint = json.load(checkpoint_file)
+    except (OSError, ValueError):
+        return 0
+    stat = os.stat(source)
+    if checkpoint.get('source') != os.path.abspath(source) or checkpoint.get('size') != stat.st_size:
+        return 0
+    return checkpoint.get('row', 0)
+
+
+def write_checkpoint(path, source, row):
+    temporary = f'{path}.tmp'
+    with open(temporary, 'w', encoding='utf-8') as checkpoint_file:
+        json.dump({'source': os.path.abspath(source), 'size': os.stat(source).st_size, 'row': row}, checkpoint_file)
+    # Atomic, so a crash mid-write leaves the previous checkpoint
+    os.replace(temporary, path)
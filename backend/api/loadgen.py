@@ -0,0 +1,195 @@
+import gzip
+import json
+import os
+import random
+from datetime import timedelta
+from itertools import accumulate
+
+from django.core.management.color import no_style
+from django.db import connection, connections, transaction
+
+from .dashboard import refresh_summaries
+from .demo_data import PLANT_TYPES, demo_plant_fields
+from .models import ROLE_PROFILES, DashboardSummary, Plant, PlantReminder, TrackedPlant, User, UserProfile
+from .names import normalize_name
+
+# Generated rows are recognisable by these prefixes, so they can be replaced or snapshotted alone
+USER_PREFIX = 'load_'
+PLANT_PREFIX = 'load-plant-'
+MAX_PLANTS_PER_USER = 500
+
+ROLES = (['Homeowner', 'Gardener', 'Supervisor', 'System Admin'], [70, 20, 8, 2])
+HEALTH = (['Excellent', 'Good', 'Fair', 'Poor'], [20, 50, 20, 10])
+STAGES = (['Seedling', 'Vegetative', 'Flowering', 'Fruiting', 'Mature'], [15, 30, 25, 15, 15])
+REMINDER_TYPES = (['Watering', 'Fertilizing', 'Pruning', 'Pest Check', 'Harvesting', 'Repotting', 'Other'],
+                  [50, 20, 10, 10, 5, 3, 2])
+REMINDERS_PER_PLANT = ([0, 1, 2, 3, 5, 8], [20, 35, 20, 12, 8, 5])
+LOCATIONS = ['New York', 'Austin', 'Seattle', 'Denver', 'Miami', 'Chicago', 'Portland', 'Phoenix']
+SKILL_LEVELS = ['Beginner', 'Intermediate', 'Expert']
+
+# Models in a snapshot, parents first, with the filter selecting generated rows
+SNAPSHOT_MODELS = [
+    (Plant, {'external_id__startswith': PLANT_PREFIX}),
+    (User, {'username__startswith': USER_PREFIX}),
+    (UserProfile, {'user__username__startswith': USER_PREFIX}),
+    *((model, {'profile__user__username__startswith': USER_PREFIX}) for model in ROLE_PROFILES.values()),
+    (TrackedPlant, {'user__username__startswith': USER_PREFIX}),
+    (PlantReminder, {'user__username__startswith': USER_PREFIX}),
+    (DashboardSummary, {'user__username__startswith': USER_PREFIX}),
+]
+
+
+def catalogue_names(count):
+    """Names of the generated catalogue, most popular first: the demo plants, then numbered varieties"""
+    names = []
+    for index in range(count):
+        name = PLANT_TYPES[index % len(PLANT_TYPES)][0]
+        variety = index // len(PLANT_TYPES)
+        names.append(f'{name} {variety + 1}' if variety else name)
+    return names
+
+
+def create_catalogue(seed, count):
+    rng = random.Random(f'{seed}:catalogue')
+    plants = []
+    for index, name in enumerate(catalogue_names(count)):
+        _, scientific_name, category = PLANT_TYPES[index % len(PLANT_TYPES)]
+        plant = Plant(external_id=f'{PLANT_PREFIX}{index}', **demo_plant_fields(rng, name, scientific_name, category))
+        plant.parse_climate()
+        plants.append(plant)
+    Plant.objects.bulk_create(plants, batch_size=1000, ignore_conflicts=True)
+
+
+def generate_users(seed, start, stop, names, today, password):
+    """
+    Users start..stop-1 with profiles, role profiles, tracked plants, reminders and dashboard
+    summaries, in one transaction. Every user draws from their own seeded generator, so the data
+    doesn't depend on how the range was split between workers. Returns (users, tracked plants,
+    reminders) written.
+    """
+    # Zipf-like popularity: the k-th catalogue plant is tracked 1/k as often as the first
+    popularity = list(accumulate(1 / rank for rank in range(1, len(names) + 1)))
+    users, profiles, plans = [], [], []
+    for index in range(start, stop):
+        rng = random.Random(f'{seed}:user:{index}')
+        user = User(username=f'{USER_PREFIX}{index}', email=f'{USER_PREFIX}{index}@example.invalid',
+                    password=password, role=rng.choices(*ROLES)[0])
+        users.append(user)
+        profiles.append(UserProfile(user=user, full_name=f'Load User {index}', location=rng.choice(LOCATIONS),
+                                    skill_level=rng.choice(SKILL_LEVELS)))
+        # Pareto: most gardens hold a handful of plants, a few hold hundreds
+        plant_count = min(int(rng.paretovariate(1.2)), MAX_PLANTS_PER_USER)
+        plans.append((user, rng, rng.choices(names, cum_weights=popularity, k=plant_count)))
+
+    with transaction.atomic():
+        User.objects.bulk_create(users)
+        UserProfile.objects.bulk_create(profiles)
+        # The role's extension row, which the profile endpoints create on the first update
+        role_profiles = {}
+        for profile in profiles:
+            model = ROLE_PROFILES.get(profile.user.role)
+            if model is not None:
+                role_profiles.setdefault(model, []).append(model(profile=profile))
+        for model, rows in role_profiles.items():
+            model.objects.bulk_create(rows)
+
+        tracked, reminder_plans = [], []
+        for user, rng, plant_names in plans:
+            for name in plant_names:
+                planted = today - timedelta(days=rng.randint(0, 3 * 365))
+                plant = TrackedPlant(
+                    user=user, name=name, type=name, plant_key=normalize_name(name),
+                    planted_date=planted,
+                    last_watered=max(planted, today - timedelta(days=int(rng.expovariate(1 / 3)))),
+                    last_fertilized=max(planted, today - timedelta(days=rng.randint(0, 90))),
+                    health_status=rng.choices(*HEALTH)[0], growth_stage=rng.choices(*STAGES)[0],
+                )
+                tracked.append(plant)
+                reminder_plans.append((plant, rng))
+        TrackedPlant.objects.bulk_create(tracked, batch_size=2000)
+
+        reminders = []
+        for plant, rng in reminder_plans:
+            for _ in range(rng.choices(*REMINDERS_PER_PLANT)[0]):
+                due_date = today + timedelta(days=rng.randint(-30, 30))
+                reminder_type = rng.choices(*REMINDER_TYPES)[0]
+                reminders.append(PlantReminder(
+                    user_id=plant.user_id, tracked_plant=plant, type=reminder_type, due_date=due_date,
+                    # Most past reminders were dealt with; the rest are overdue
+                    completed=due_date < today and rng.random() < 0.8,
+                    repeat_every_days=rng.choice([None, 3, 7]) if reminder_type == 'Watering' else None,
+                ))
+        PlantReminder.objects.bulk_create(reminders, batch_size=2000)
+        refresh_summaries([user.id for user in users])
+    return len(users), len(tracked), len(reminders)
+
+
+def run_range(seed, start, stop, names, today, password, chunk_size):
+    """generate_users over start..stop in chunks; entry point of a worker process"""
+    totals = [0, 0, 0]
+    for chunk_start in range(start, stop, chunk_size):
+        counts = generate_users(seed, chunk_start, min(chunk_start + chunk_size, stop), names, today, password)
+        totals = [total + count for total, count in zip(totals, counts)]
+    connections.close_all()
+    return totals
+
+
+def clear_generated():
+    """Delete generated users (their rows cascade) and catalogue plants"""
+    User.objects.filter(username__startswith=USER_PREFIX).delete()
+    Plant.objects.filter(external_id__startswith=PLANT_PREFIX).delete()
+
+
+def generated_exists():
+    return (User.objects.filter(username__startswith=USER_PREFIX).exists()
+            or Plant.objects.filter(external_id__startswith=PLANT_PREFIX).exists())
+
+
+# Snapshots: one gzipped JSON-lines file per table plus manifest.json
+
+def table_file(model):
+    return f'{model._meta.db_table}.jsonl.gz'
+
+
+def write_snapshot(directory, manifest, batch_size=5000):
+    """Dump the generated rows of every SNAPSHOT_MODELS table; returns the manifest written"""
+    os.makedirs(directory, exist_ok=True)
+    tables = []
+    for model, condition in SNAPSHOT_MODELS:
+        columns = [field.attname for field in model._meta.concrete_fields]
+        rows = 0
+        with gzip.open(os.path.join(directory, table_file(model)), 'wt', encoding='utf-8') as output:
+            queryset = model.objects.filter(**condition).order_by('pk').values_list(*columns)
+            for row in queryset.iterator(chunk_size=batch_size):
+                output.write(json.dumps(row, default=str) + '\n')
+                rows += 1
+        tables.append({'model': model._meta.label, 'columns': columns, 'rows': rows})
+    manifest = dict(manifest, tables=tables)
+    with open(os.path.join(directory, 'manifest.json'), 'w', encoding='utf-8') as output:
+        json.dump(manifest, output, indent=2)
+    return manifest
+
+
+def load_snapshot(directory, batch_size=5000):
+    """Insert a snapshot's rows with their original ids and move the id sequences past them"""
+    with open(os.path.join(directory, 'manifest.json'), encoding='utf-8') as source:
+        manifest = json.load(source)
+    models = {model._meta.label: model for model, _ in SNAPSHOT_MODELS}
+    loaded = {}
+    with transaction.atomic():
+        for table in manifest['tables']:
+            model = models[table['model']]
+            columns, batch, rows = table['columns'], [], 0
+            with gzip.open(os.path.join(directory, table_file(model)), 'rt', encoding='utf-8') as source:
+                for line in source:
+                    batch.append(model(**dict(zip(columns, json.loads(line)))))
+                    if len(batch) >= batch_size:
+                        model.objects.bulk_create(batch)
+                        rows += len(batch)
+                        batch = []
+            model.objects.bulk_create(batch)
+            loaded[table['model']] = rows + len(batch)
+        with connection.cursor() as cursor:
+            for sql in connection.ops.sequence_reset_sql(no_style(), list(models.values())):
+                cursor.execute(sql)
+    return manifest, loaded
@@ -0,0 +1,48 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+
+from api.models import Plant, UserProfile
+
+MODELS = {
+    'plants': Plant,
+    'profiles': UserProfile,
+}
+
+
+class Command(BaseCommand):
+    help = 'Re-parse free-text climate fields into their numeric min/max columns, in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--model', choices=['all', *MODELS], default='all')
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        names = MODELS if options['model'] == 'all' else [options['model']]
+        for name in names:
+            self.backfill(name, MODELS[name], options['batch_size'])
+
+    def backfill(self, name, model, batch_size):
+        sources = model.CLIMATE_SOURCES
+        bound_fields = [field for _, low, high in sources.values() for field in (low, high)]
+        start = time.perf_counter()
+        last_id = 0
+        total = 0
+        while True:
+            # Keyset batches keep each transaction short and never hold the whole table in memory
+            batch = list(
+                model.objects.filter(id__gt=last_id).order_by('id').only('id', *sources)[:batch_size]
+            )
+            if not batch:
+                break
+            for obj in batch:
+                obj.parse_climate()
+            with transaction.atomic():
+                model.objects.bulk_update(batch, bound_fields)
+            last_id = batch[-1].id
+            total += len(batch)
+            self.stdout.write(f'{name}: {total} rows')
+
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(f'Backfilled {total} {name} in {elapsed:.1f}s'))
@@ -0,0 +1,192 @@
+import json
+import random
+import statistics
+import subprocess
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from api.authentication import RefreshToken
+from api.loadgen import USER_PREFIX
+from api.models import Plant, TrackedPlant, User
+
+# name -> (method, path, query parameters or JSON body); login bodies are filled in per user
+ENDPOINTS = {
+    'plant_list': ('get', '/api/plants/', {}),
+    'plant_list_summary': ('get', '/api/plants/', {'view': 'summary'}),
+    'plant_filter': ('get', '/api/plants/', {'q': 'rose', 'category': 'flower'}),
+    'plant_facets': ('get', '/api/plants/', {'facets': '1'}),
+    'plant_search': ('get', '/api/plants/search/', {'q': 'tomato'}),
+    'plant_meta': ('get', '/api/plants/meta/', {}),
+    'tracked_plants': ('get', '/api/tracked-plants/', {}),
+    'reminders': ('get', '/api/plant-reminders/', {}),
+    'upcoming_reminders': ('get', '/api/upcoming-reminders/', {}),
+    'dashboard': ('get', '/api/dashboard/', {}),
+    'profile': ('get', '/api/profile/', {}),
+    'sync': ('get', '/api/sync/', {}),
+    'recommendations': ('get', '/api/recommendations/', {}),
+    'login': ('post', '/api/login/', None),
+}
+# Compared against the baseline: lower is better for all of them
+TRACKED_METRICS = ['p50_ms', 'p95_ms', 'queries_max', 'bytes_mean']
+
+
+def percentile(values, fraction):
+    """Nearest-rank percentile of sorted values"""
+    return values[min(len(values) - 1, max(0, int(round(fraction * len(values))) - 1))]
+
+
+def summarize(timings, queries, sizes, errors):
+    timings = sorted(timings)
+    return {
+        'requests': len(timings),
+        'errors': errors,
+        'p50_ms': round(percentile(timings, 0.50), 3),
+        'p95_ms': round(percentile(timings, 0.95), 3),
+        'p99_ms': round(percentile(timings, 0.99), 3),
+        'mean_ms': round(statistics.fmean(timings), 3),
+        'max_ms': round(timings[-1], 3),
+        'queries_mean': round(statistics.fmean(queries), 2),
+        'queries_max': max(queries),
+        'bytes_mean': round(statistics.fmean(sizes)),
+    }
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True,
+                              timeout=5, check=True).stdout.strip()
+    except (OSError, subprocess.SubprocessError):
+        return None
+
+
+def regressions(results, baseline, tolerance, min_delta_ms):
+    """Human-readable metric regressions of results against a previous results file"""
+    found = []
+    for name, metrics in results['endpoints'].items():
+        before = baseline.get('endpoints', {}).get(name)
+        if before is None:
+            continue
+        if metrics['errors'] > before.get('errors', 0):
+            found.append(f"{name}: {metrics['errors']} errors (was {before.get('errors', 0)})")
+        for metric in TRACKED_METRICS:
+            old, new = before.get(metric), metrics[metric]
+            if old is None:
+                continue
+            if metric == 'queries_max':
+                # Query counts are deterministic: any increase is a regression
+                if new > old:
+                    found.append(f'{name}: {metric} {old} -> {new}')
+                continue
+            # Ignore sub-millisecond jitter on fast endpoints
+            if metric.endswith('_ms') and new - old < min_delta_ms:
+                continue
+            if new > old * (1 + tolerance):
+                found.append(f'{name}: {metric} {old} -> {new} (+{(new / old - 1) * 100 if old else 100:.0f}%)')
+    return found
+
+
+class Command(BaseCommand):
+    help = ('Benchmark the API endpoints against the current (seeded) database: latency percentiles, '
+            'queries per request and response bytes, written as JSON and compared with a baseline')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--requests', type=int, default=50, help='Measured requests per endpoint')
+        parser.add_argument('--warmup', type=int, default=5, help='Unmeasured requests per endpoint first')
+        parser.add_argument('--users', type=int, default=20, help='Generated users to spread requests over')
+        parser.add_argument('--endpoints', default=','.join(ENDPOINTS), help='Comma-separated endpoint names')
+        parser.add_argument('--password', default='load-test-password',
+                            help='Password of the generated users (see generate_load_data)')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--output', default='bench-results.json')
+        parser.add_argument('--baseline', default=None, help='Results file of an earlier run to compare with')
+        parser.add_argument('--tolerance', type=float, default=0.2,
+                            help='Allowed relative growth of latency and bytes before failing, e.g. 0.2 = 20%%')
+        parser.add_argument('--min-delta-ms', type=float, default=1.0,
+                            help='Latency growth below this many ms never counts as a regression')
+
+    def handle(self, *args, **options):
+        names = [name.strip() for name in options['endpoints'].split(',') if name.strip()]
+        unknown = set(names) - set(ENDPOINTS)
+        if unknown:
+            raise CommandError(f"Unknown endpoints: {', '.join(sorted(unknown))}")
+        if options['requests'] < 1:
+            raise CommandError('--requests must be >= 1')
+
+        # Users with a garden, so per-user endpoints have rows to return
+        user_ids = list(TrackedPlant.objects.filter(user__username__startswith=USER_PREFIX)
+                        .order_by('user_id').values_list('user_id', flat=True).distinct()[:options['users'] * 10])
+        if not user_ids:
+            raise CommandError(f'No generated users ({USER_PREFIX}*) with plants; run generate_load_data '
+                               'or load_snapshot first')
+        rng = random.Random(options['seed'])
+        users = list(User.objects.filter(id__in=rng.sample(user_ids, min(options['users'], len(user_ids))))
+                     .order_by('id'))
+        tokens = {user.id: str(RefreshToken.for_user(user).access_token) for user in users}
+
+        results = {
+            'revision': git_revision(),
+            'created_at': timezone.now().isoformat(),
+            'database': connection.vendor,
+            'dataset': {'users': User.objects.count(), 'plants': Plant.objects.count(),
+                        'tracked_plants': TrackedPlant.objects.count()},
+            'requests': options['requests'],
+            'endpoints': {},
+        }
+        client = APIClient()
+        self.stdout.write(f"{'endpoint':<20} {'p50':>9} {'p95':>9} {'p99':>9} {'queries':>8} {'bytes':>9} {'errors':>6}")
+        # The test client's host is "testserver"
+        with override_settings(ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, 'testserver']):
+            for name in names:
+                metrics = self.run_endpoint(client, name, users, tokens, options)
+                results['endpoints'][name] = metrics
+                self.stdout.write(
+                    f"{name:<20} {metrics['p50_ms']:>7.1f}ms {metrics['p95_ms']:>7.1f}ms {metrics['p99_ms']:>7.1f}ms "
+                    f"{metrics['queries_max']:>8} {metrics['bytes_mean']:>9} {metrics['errors']:>6}"
+                )
+
+        with open(options['output'], 'w', encoding='utf-8') as output:
+            json.dump(results, output, indent=2)
+        self.stdout.write(f"Wrote {options['output']}")
+
+        failures = [f"{name}: {metrics['errors']} failed requests"
+                    for name, metrics in results['endpoints'].items() if metrics['errors']]
+        if options['baseline']:
+            with open(options['baseline'], encoding='utf-8') as source:
+                baseline = json.load(source)
+            failures = regressions(results, baseline, options['tolerance'], options['min_delta_ms'])
+            failures += [f"{name}: {metrics['errors']} failed requests"
+                         for name, metrics in results['endpoints'].items()
+                         if metrics['errors'] and name not in baseline.get('endpoints', {})]
+        if failures:
+            raise CommandError('Benchmark regressions:\n  ' + '\n  '.join(failures))
+        self.stdout.write(self.style.SUCCESS(f'{len(names)} endpoints benchmarked, no regressions'))
+
+    def run_endpoint(self, client, name, users, tokens, options):
+        method, path, data = ENDPOINTS[name]
+        timings, queries, sizes = [], [], []
+        errors = 0
+        for index in range(options['warmup'] + options['requests']):
+            user = users[index % len(users)]
+            if name == 'login':
+                client.credentials()
+                kwargs = {'data': {'email': user.email, 'password': options['password']}, 'format': 'json'}
+            else:
+                client.credentials(HTTP_AUTHORIZATION=f'Bearer {tokens[user.id]}')
+                kwargs = {'data': data}
+            with CaptureQueriesContext(connection) as captured:
+                start = time.perf_counter()
+                response = getattr(client, method)(path, **kwargs)
+                elapsed = (time.perf_counter() - start) * 1000
+            if index < options['warmup']:
+                continue
+            timings.append(elapsed)
+            queries.append(len(captured.captured_queries))
+            sizes.append(len(response.content))
+            errors += response.status_code >= 400
+        return summarize(timings, queries, sizes, errors)
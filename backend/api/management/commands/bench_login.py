@@ -0,0 +1,96 @@
+import multiprocessing
+import random
+import statistics
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.conf import settings
+from django.contrib.auth.hashers import get_hasher, make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from rest_framework.test import APIRequestFactory
+
+from api.models import User
+from api.views import login_view
+
+PREFIX = 'bench_login_'
+PASSWORD = 'bench-login-password'
+
+
+def run_logins(emails, count, seed):
+    """Log in count times as random bench users through login_view; returns per-login seconds and failures"""
+    factory = APIRequestFactory()
+    rng = random.Random(seed)
+    timings, failures = [], 0
+    for _ in range(count):
+        request = factory.post('/api/login/', {'email': rng.choice(emails), 'password': PASSWORD}, format='json')
+        start = time.perf_counter()
+        response = login_view(request)
+        timings.append(time.perf_counter() - start)
+        failures += response.status_code != 200
+    connections.close_all()
+    return timings, failures
+
+
+class Command(BaseCommand):
+    help = 'Measure logins/sec per worker through the login view, with the configured password hasher'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--accounts', type=int, default=100, help='Temporary accounts to log in as')
+        parser.add_argument('--logins', type=int, default=100, help='Logins per worker')
+        parser.add_argument('--workers', type=int, default=1)
+        parser.add_argument('--seed', type=int, default=0)
+
+    def handle(self, *args, **options):
+        accounts, logins, workers = options['accounts'], options['logins'], options['workers']
+        if accounts < 1 or logins < 1 or workers < 1:
+            raise CommandError('--accounts, --logins and --workers must be >= 1')
+
+        hasher = get_hasher()
+        start = time.perf_counter()
+        hashes = 20
+        for _ in range(hashes):
+            encoded = make_password(PASSWORD)
+        hash_ms = (time.perf_counter() - start) / hashes * 1000
+
+        # One hash shared by every bench account; the login path can't tell
+        User.objects.filter(username__startswith=PREFIX).delete()
+        User.objects.bulk_create([
+            User(username=f'{PREFIX}{index}', email=f'{PREFIX}{index}@example.invalid', password=encoded)
+            for index in range(accounts)
+        ], batch_size=1000)
+        emails = [f'{PREFIX}{index}@example.invalid' for index in range(accounts)]
+        total_users = User.objects.count()
+
+        try:
+            start = time.perf_counter()
+            if workers == 1:
+                results = [run_logins(emails, logins, options['seed'])]
+            else:
+                # Forked children must not share the parent's database connection
+                connections.close_all()
+                context = multiprocessing.get_context('fork')
+                with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+                    futures = [pool.submit(run_logins, emails, logins, options['seed'] + worker)
+                               for worker in range(workers)]
+                    results = [future.result() for future in futures]
+            elapsed = time.perf_counter() - start
+        finally:
+            User.objects.filter(username__startswith=PREFIX).delete()
+
+        self.stdout.write(f'Hasher {hasher.algorithm} ({settings.PASSWORD_HASHER}): {hash_ms:.1f}ms per hash, '
+                          f'{total_users} users in the table')
+        for worker, (timings, failures) in enumerate(results):
+            timings.sort()
+            self.stdout.write(
+                f'worker {worker}: {len(timings) / sum(timings):.1f} logins/s, '
+                f'p50 {statistics.median(timings) * 1000:.1f}ms, '
+                f'p95 {timings[int(len(timings) * 0.95) - 1] * 1000:.1f}ms, {failures} failed'
+            )
+        total = sum(len(timings) for timings, _ in results)
+        failed = sum(failures for _, failures in results)
+        style = self.style.SUCCESS if not failed else self.style.WARNING
+        self.stdout.write(style(
+            f'{total} logins by {workers} workers in {elapsed:.1f}s: {total / elapsed:.1f} logins/s overall, '
+            f'{total / elapsed / workers:.1f} per worker'
+        ))
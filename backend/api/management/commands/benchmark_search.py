@@ -0,0 +1,88 @@
+import random
+import statistics
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection, transaction
+
+from api.models import Plant
+from api.search import filter_plants, rank_plants, uses_full_text
+
+WORDS = [
+    'rose', 'tomato', 'basil', 'lavender', 'pepper', 'mint', 'apple', 'lemon', 'tulip', 'carrot',
+    'berry', 'orchid', 'fern', 'lily', 'sage', 'thyme', 'onion', 'garlic', 'melon', 'poppy',
+]
+PESTS = ['Aphids', 'Spider Mites', 'Whiteflies', 'Caterpillars', 'Japanese Beetles', 'Slugs', 'Thrips']
+COMPANIONS = ['Marigold', 'Basil', 'Nasturtium', 'Garlic', 'Mint', 'Dill', 'Chamomile', 'Chives']
+QUERIES = ['tomato', 'tom', 'aphids', 'marigold', 'rose lavender', 'spider', 'prune', 'zzz']
+
+
+class Command(BaseCommand):
+    help = 'Measure plant search latency against catalogue size (data is rolled back afterwards)'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--sizes', default='1000,10000,50000',
+                            help='Comma-separated catalogue sizes to benchmark')
+        parser.add_argument('--repeat', type=int, default=20, help='Runs per query and size')
+        parser.add_argument('--seed', type=int, default=42)
+
+    def handle(self, *args, **options):
+        sizes = sorted(int(size) for size in options['sizes'].split(','))
+        rng = random.Random(options['seed'])
+        backend = 'tsvector/GIN' if uses_full_text() else 'icontains fallback'
+        self.stdout.write(f'Search backend: {backend} ({connection.vendor})')
+        self.stdout.write(f"{'rows':>8} {'query':<15} {'ranked p50':>11} {'ranked p95':>11} {'page p50':>9} {'page p95':>9}")
+
+        with transaction.atomic():
+            created = 0
+            for size in sizes:
+                self.generate_plants(rng, created, size - created)
+                created = size
+                if connection.vendor == 'postgresql':
+                    with connection.cursor() as cursor:
+                        cursor.execute('ANALYZE api_plant')
+                for query in QUERIES:
+                    ranked = self.time_query(lambda: list(rank_plants(Plant.objects.all(), query)[:10]),
+                                             options['repeat'])
+                    page = self.time_query(lambda: list(filter_plants(Plant.objects.all(), query)
+                                                        .order_by('name', 'id')[:50]), options['repeat'])
+                    self.stdout.write(
+                        f'{size:>8} {query:<15} {ranked[0]:>9.2f}ms {ranked[1]:>9.2f}ms '
+                        f'{page[0]:>7.2f}ms {page[1]:>7.2f}ms'
+                    )
+            transaction.set_rollback(True)
+
+    def generate_plants(self, rng, offset, count):
+        batch = []
+        for i in range(offset, offset + count):
+            name = f'{rng.choice(WORDS).title()} {rng.choice(WORDS)} {i}'
+            batch.append(Plant(
+                name=name,
+                scientific_name=f'{rng.choice(WORDS).title()} {rng.choice(WORDS)}us',
+                category=rng.choice(['flower', 'vegetable', 'fruit']),
+                soil_type=rng.choice(['sandy', 'loamy', 'clay', 'silt']),
+                sunlight=rng.choice(['full_sun', 'partial_sun', 'shade']),
+                watering_schedule=rng.choice(['daily', 'weekly', 'custom']),
+                pests=rng.sample(PESTS, k=2),
+                companion_plants=rng.sample(COMPANIONS, k=2),
+                climate_suitability='Temperate',
+                care_instructions=f'Water {rng.choice(["regularly", "sparingly"])}, prune {rng.choice(WORDS)} shoots',
+                lifespan='Annual',
+                ideal_temperature='18-28°C',
+                humidity_needs='40-60%',
+            ))
+            if len(batch) >= 2000:
+                Plant.objects.bulk_create(batch)
+                batch = []
+        if batch:
+            Plant.objects.bulk_create(batch)
+
+    def time_query(self, run, repeat):
+        timings = []
+        for _ in range(repeat):
+            start = time.perf_counter()
+            run()
+            timings.append((time.perf_counter() - start) * 1000)
+        timings.sort()
+        p95 = timings[min(len(timings) - 1, int(len(timings) * 0.95))]
+        return statistics.median(timings), p95
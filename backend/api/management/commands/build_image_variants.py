@@ -0,0 +1,45 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from api.images import process_plant
+from api.models import Plant
+
+
+def build(plant_id):
+    try:
+        return process_plant(plant_id)
+    finally:
+        connection.close()
+
+
+class Command(BaseCommand):
+    help = 'Build the resized WebP/JPEG variants of plant images that are missing or out of date'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--all', action='store_true', help='Rebuild every plant image, not only stale ones')
+        parser.add_argument('--workers', type=int, default=4)
+
+    def handle(self, *args, **options):
+        if options['workers'] < 1:
+            raise CommandError('--workers must be >= 1')
+        plants = Plant.objects.exclude(image='').exclude(image__isnull=True).values_list('id', 'image', 'image_variants')
+        plant_ids = [plant_id for plant_id, image, variants in plants.iterator()
+                     if options['all'] or (variants or {}).get('source') != image]
+
+        start = time.perf_counter()
+        failed = 0
+        with ThreadPoolExecutor(max_workers=options['workers']) as pool:
+            for plant_id, future in zip(plant_ids, [pool.submit(build, plant_id) for plant_id in plant_ids]):
+                try:
+                    future.result()
+                except Exception as error:
+                    failed += 1
+                    self.stderr.write(f'Plant {plant_id}: {error}')
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(
+            f'Built variants for {len(plant_ids) - failed} plants in {elapsed:.1f}s'
+            + (f', {failed} failed' if failed else '')
+        ))
@@ -0,0 +1,59 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from api.dashboard import SUMMARY_FIELDS, compute_summaries, refresh_summaries, upcoming_outdated
+from api.models import DashboardSummary, User
+
+
+class Command(BaseCommand):
+    help = 'Recompute dashboard summaries in batches and report (or fix) rows that drifted'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=1000)
+        parser.add_argument('--fix', action='store_true', help='Rewrite stale, missing or outdated summary rows')
+        parser.add_argument('--verbose-diff', action='store_true', help='Print the differing fields per user')
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        checked = stale = missing = outdated = 0
+        today = timezone.localdate()
+        last_id = 0
+        while True:
+            user_ids = list(User.objects.filter(id__gt=last_id).order_by('id')
+                            .values_list('id', flat=True)[:options['batch_size']])
+            if not user_ids:
+                break
+            last_id = user_ids[-1]
+            expected = compute_summaries(user_ids)
+            stored = {row['user_id']: row for row in
+                      DashboardSummary.objects.filter(user_id__in=user_ids).values('user_id', *SUMMARY_FIELDS)}
+
+            drifted = []
+            for user_id, fields in expected.items():
+                row = stored.get(user_id)
+                if row is None:
+                    missing += 1
+                    drifted.append(user_id)
+                    continue
+                diff = [name for name in SUMMARY_FIELDS if row[name] != fields[name]]
+                if diff == ['upcoming'] and upcoming_outdated(row['upcoming'], fields['upcoming'], today):
+                    outdated += 1
+                    drifted.append(user_id)
+                elif diff:
+                    stale += 1
+                    drifted.append(user_id)
+                    if options['verbose_diff']:
+                        self.stdout.write(f'user {user_id}: ' + ', '.join(
+                            f'{name} {row[name]!r} != {fields[name]!r}' for name in diff))
+            checked += len(user_ids)
+            if options['fix'] and drifted:
+                refresh_summaries(drifted)
+
+        elapsed = time.perf_counter() - start
+        action = 'fixed' if options['fix'] else 'found'
+        style = self.style.SUCCESS if options['fix'] or not (stale or missing) else self.style.WARNING
+        self.stdout.write(style(
+            f'Checked {checked} users in {elapsed:.1f}s: {action} {stale} stale and {missing} missing summaries'
+            f' ({outdated} more only list reminders that have fallen due since)'))
@@ -0,0 +1,35 @@
+import os
+import time
+
+from django.core.files.storage import storages
+from django.core.management.base import BaseCommand, CommandError
+
+from api.storage import BLOB_DIR, DeduplicatingFileSystemStorage
+
+
+class Command(BaseCommand):
+    help = ('Collapse identical files already in MEDIA_ROOT into one stored copy and delete stored '
+            'content no upload refers to any more')
+
+    def handle(self, *args, **options):
+        storage = storages['default']
+        if not isinstance(storage, DeduplicatingFileSystemStorage):
+            raise CommandError('The default storage is not api.storage.DeduplicatingFileSystemStorage')
+
+        start = time.perf_counter()
+        files = freed = 0
+        for directory, subdirectories, filenames in os.walk(storage.location):
+            # Skip the blob store and other hidden directories
+            subdirectories[:] = [name for name in subdirectories if not name.startswith('.')]
+            for filename in filenames:
+                path = os.path.join(directory, filename)
+                if os.path.islink(path) or not os.path.isfile(path):
+                    continue
+                files += 1
+                freed += storage.deduplicate(path)
+        pruned, pruned_bytes = storage.prune_blobs()
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(
+            f'Checked {files} files in {elapsed:.1f}s: {freed / 1024:,.0f} KiB freed by deduplication, '
+            f'{pruned} unused blobs ({pruned_bytes / 1024:,.0f} KiB) removed from {BLOB_DIR}'
+        ))
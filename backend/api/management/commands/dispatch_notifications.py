@@ -0,0 +1,49 @@
+import time
+from collections import Counter
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api.notifications import dispatch_batch, enqueue_all, get_transport
+
+
+class Command(BaseCommand):
+    help = 'Queue reminder digests and pest/disease alerts, then deliver pending notifications'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--transport', default=None,
+                            help='console, file, smtp or a dotted path (default: settings.NOTIFICATION_TRANSPORT)')
+        parser.add_argument('--batch-size', type=int, default=100)
+        parser.add_argument('--rate', type=float, default=None, help='Max sends per second for this worker')
+        parser.add_argument('--once', action='store_true', help='Drain the queue once and exit')
+        parser.add_argument('--poll-interval', type=float, default=30.0)
+        parser.add_argument('--no-enqueue', action='store_true',
+                            help='Only deliver; leave queueing to another worker')
+
+    def handle(self, *args, **options):
+        try:
+            transport = get_transport(options['transport'])
+        except ImportError as exc:
+            raise CommandError(f'Unknown transport: {exc}')
+
+        while True:
+            if not options['no_enqueue']:
+                queued = enqueue_all()
+                self.stdout.write('Queued ' + ', '.join(f'{count} {kind}' for kind, count in queued.items()))
+
+            start = time.perf_counter()
+            totals = Counter()
+            while True:
+                results = dispatch_batch(transport, options['batch_size'], options['rate'])
+                if not results:
+                    break
+                totals.update(results)
+            elapsed = time.perf_counter() - start
+            self.stdout.write(self.style.SUCCESS(
+                f"Sent {totals['sent']}, retrying {totals['retried']}, failed {totals['failed']}, "
+                f"rate limited {totals['rate_limited']}, taken over by another worker {totals['lease_lost']} "
+                f"in {elapsed:.1f}s"
+            ))
+
+            if options['once']:
+                return
+            time.sleep(options['poll_interval'])
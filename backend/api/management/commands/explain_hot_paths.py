@@ -0,0 +1,121 @@
+import random
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection, transaction
+from django.db.models import Count
+
+from api.models import Plant, PlantReminder, TrackedPlant, User
+
+BATCH_SIZE = 5000
+
+
+class Command(BaseCommand):
+    help = ('Seed a large dataset inside a rolled-back transaction and assert via EXPLAIN '
+            'that the dashboard and catalogue queries are served by indexes')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reminders', type=int, default=1_000_000, help='PlantReminder rows to seed')
+        parser.add_argument('--users', type=int, default=10_000)
+        parser.add_argument('--plants', type=int, default=20_000, help='Plant catalogue rows to seed')
+        parser.add_argument('--no-seed', action='store_true', help='Explain against the existing data only')
+        parser.add_argument('--seed', type=int, default=7)
+
+    def handle(self, *args, **options):
+        with transaction.atomic():
+            if not options['no_seed']:
+                self.seed(random.Random(options['seed']), options)
+            failures = self.check_plans()
+            transaction.set_rollback(True)
+
+        if failures:
+            raise CommandError(f'{len(failures)} hot-path queries fall back to a full table scan: '
+                               + ', '.join(failures))
+        self.stdout.write(self.style.SUCCESS('All hot-path queries use index scans'))
+
+    def hot_path_queries(self):
+        user = User.objects.order_by('id').first()
+        if user is None:
+            raise CommandError('No users to explain queries for; run without --no-seed')
+        today = date.today()
+        return [
+            ('upcoming reminders', 'api_plantreminder', PlantReminder.objects.filter(
+                user=user, completed=False, due_date__gte=today, due_date__lte=today + timedelta(days=7),
+            ).order_by('due_date')),
+            ('reminder list', 'api_plantreminder', PlantReminder.objects.filter(user=user).order_by('due_date')),
+            ('plants by health', 'api_trackedplant', TrackedPlant.objects.filter(user=user)
+                .values('health_status').annotate(total=Count('id')).order_by()),
+            ('catalogue page', 'api_plant', Plant.objects.order_by('name', 'id')[:51]),
+            ('catalogue by category', 'api_plant', Plant.objects.filter(category='fruit')
+                .order_by('name', 'id')[:51]),
+            ('catalogue by soil type', 'api_plant', Plant.objects.filter(soil_type='silt')),
+        ]
+
+    def check_plans(self):
+        if connection.vendor == 'postgresql':
+            with connection.cursor() as cursor:
+                for table in ('api_user', 'api_plant', 'api_trackedplant', 'api_plantreminder'):
+                    cursor.execute(f'ANALYZE {table}')
+
+        failures = []
+        for label, table, queryset in self.hot_path_queries():
+            plan = queryset.explain()
+            self.stdout.write(f'-- {label}\n{plan}\n')
+            if self.is_full_scan(plan, table):
+                failures.append(label)
+        return failures
+
+    def is_full_scan(self, plan, table):
+        if connection.vendor == 'postgresql':
+            return f'Seq Scan on {table}' in plan
+        # SQLite: "SCAN <table>" without "USING ... INDEX" reads every row
+        for line in plan.splitlines():
+            if f'SCAN {table}' in line and 'INDEX' not in line:
+                return True
+        return False
+
+    def seed(self, rng, options):
+        self.stdout.write('Seeding users...')
+        User.objects.bulk_create(
+            (User(username=f'explain_user_{i}', email=f'explain_user_{i}@example.com', password='!')
+             for i in range(options['users'])),
+            batch_size=BATCH_SIZE,
+        )
+        user_ids = list(User.objects.filter(username__startswith='explain_user_').values_list('id', flat=True))
+
+        self.stdout.write('Seeding plants...')
+        Plant.objects.bulk_create(
+            (Plant(
+                name=f'Plant {i:07d}',
+                category=rng.choice(['flower', 'vegetable', 'fruit']),
+                soil_type=rng.choice(['sandy', 'loamy', 'clay', 'silt']),
+                sunlight=rng.choice(['full_sun', 'partial_sun', 'shade']),
+                watering_schedule=rng.choice(['daily', 'weekly', 'custom']),
+                climate_suitability='Temperate', care_instructions='', lifespan='Annual',
+                ideal_temperature='18-28°C', humidity_needs='40-60%',
+            ) for i in range(options['plants'])),
+            batch_size=BATCH_SIZE,
+        )
+
+        self.stdout.write('Seeding tracked plants...')
+        today = date.today()
+        plants_per_user = max(1, options['reminders'] // (len(user_ids) * 5))
+        TrackedPlant.objects.bulk_create(
+            (TrackedPlant(
+                user_id=user_id, name=f'Tracked {i}', planted_date=today, last_watered=today,
+                last_fertilized=today, health_status=rng.choice(['Excellent', 'Good', 'Fair', 'Poor']),
+            ) for user_id in user_ids for i in range(plants_per_user)),
+            batch_size=BATCH_SIZE,
+        )
+        tracked = list(TrackedPlant.objects.filter(user_id__in=user_ids).values_list('id', 'user_id'))
+
+        self.stdout.write(f"Seeding {options['reminders']} reminders...")
+        types = [choice for choice, _ in PlantReminder.REMINDER_TYPES]
+        PlantReminder.objects.bulk_create(
+            (PlantReminder(
+                user_id=user_id, tracked_plant_id=tracked_id, type=rng.choice(types),
+                due_date=today + timedelta(days=rng.randint(-365, 365)),
+                completed=rng.random() < 0.8,
+            ) for tracked_id, user_id in (rng.choice(tracked) for _ in range(options['reminders']))),
+            batch_size=BATCH_SIZE,
+        )
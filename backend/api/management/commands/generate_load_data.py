@@ -0,0 +1,88 @@
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+from django.contrib.auth.hashers import make_password
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.utils import timezone
+from django.utils.dateparse import parse_date
+
+from api import pests
+from api.catalogue import invalidate_catalogue_version
+from api.companions import rebuild_graph
+from api.loadgen import (USER_PREFIX, catalogue_names, clear_generated, create_catalogue, generated_exists,
+                         run_range, write_snapshot)
+
+
+class Command(BaseCommand):
+    help = ('Generate a seeded, production-shaped dataset (users, tracked plants, reminders) in bulk, '
+            'optionally saving a snapshot for load_snapshot')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--catalogue', type=int, default=200, help='Catalogue plants to generate')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--today', default=None,
+                            help='Date the data is generated around (YYYY-MM-DD); fix it for identical reruns')
+        parser.add_argument('--workers', type=int, default=1)
+        parser.add_argument('--chunk-size', type=int, default=500, help='Users per transaction')
+        parser.add_argument('--replace', action='store_true', help='Delete previously generated data first')
+        parser.add_argument('--snapshot', default=None, help='Directory to write a snapshot of the data to')
+        parser.add_argument('--password', default='load-test-password', help='Password of every generated user')
+
+    def handle(self, *args, **options):
+        users, workers, chunk_size = options['users'], options['workers'], options['chunk_size']
+        if users < 1 or workers < 1 or chunk_size < 1 or options['catalogue'] < 1:
+            raise CommandError('--users, --catalogue, --workers and --chunk-size must be >= 1')
+        today = parse_date(options['today']) if options['today'] else timezone.localdate()
+        if today is None:
+            raise CommandError('--today must be a date, e.g. 2025-06-01')
+        if generated_exists():
+            if not options['replace']:
+                raise CommandError(f'Generated data ({USER_PREFIX}* users) already exists; pass --replace')
+            clear_generated()
+
+        start = time.perf_counter()
+        seed = options['seed']
+        create_catalogue(seed, options['catalogue'])
+        names = catalogue_names(options['catalogue'])
+        # Hashing once keeps generation fast; every user gets the same password
+        password = make_password(options['password'])
+
+        # Contiguous user ranges per worker; each user's rows depend only on the seed and their index
+        step = -(-users // workers)
+        ranges = [(low, min(low + step, users)) for low in range(0, users, step)]
+        if len(ranges) == 1:
+            results = [run_range(seed, 0, users, names, today, password, chunk_size)]
+        else:
+            # Forked children must not share the parent's database connection
+            connections.close_all()
+            context = multiprocessing.get_context('fork')
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+                futures = [pool.submit(run_range, seed, low, high, names, today, password, chunk_size)
+                           for low, high in ranges]
+                results = [future.result() for future in futures]
+        created_users, tracked, reminders = (sum(column) for column in zip(*results))
+
+        # Bulk inserts skip the Plant signals that maintain these
+        rebuild_graph()
+        pests.rebuild_index()
+        invalidate_catalogue_version()
+        elapsed = time.perf_counter() - start
+        rows = created_users + tracked + reminders
+        self.stdout.write(self.style.SUCCESS(
+            f'Generated {created_users} users, {tracked} tracked plants and {reminders} reminders '
+            f'in {elapsed:.1f}s ({rows / max(elapsed, 1e-9):,.0f} rows/s)'
+        ))
+
+        if options['snapshot']:
+            snapshot_start = time.perf_counter()
+            manifest = write_snapshot(options['snapshot'], {
+                'seed': seed, 'users': users, 'catalogue': options['catalogue'], 'today': today.isoformat(),
+            })
+            total = sum(table['rows'] for table in manifest['tables'])
+            self.stdout.write(self.style.SUCCESS(
+                f"Wrote a snapshot of {total} rows to {options['snapshot']} "
+                f'in {time.perf_counter() - snapshot_start:.1f}s'
+            ))
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from api.growth import create_partitions
+
+
+class Command(BaseCommand):
+    help = ('Create monthly GrowthLog partitions for the coming months and move rows out of the default '
+            'partition (Postgres only); run from cron')
+
+    def add_arguments(self, parser):
+        parser.add_argument('--months-ahead', type=int, default=3)
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'postgresql':
+            self.stdout.write(f'GrowthLog is not partitioned on {connection.vendor}; nothing to do')
+            return
+        months, moved = create_partitions(options['months_ahead'])
+        self.stdout.write(self.style.SUCCESS(
+            f'Ensured {months} monthly partitions; moved {moved} rows out of the default partition'))
@@ -0,0 +1,101 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from api import pests
+from api.catalogue import invalidate_catalogue_version
+from api.companions import rebuild_graph
+from api.importer import (copy_upsert, detect_format, key_existing_plants, read_checkpoint, read_rows, upsert,
+                          validated_plants, write_checkpoint)
+
+
+class Command(BaseCommand):
+    help = 'Stream plants from a CSV or JSON-lines file into the catalogue, upserting on external_id in batches'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path')
+        parser.add_argument('--format', choices=['csv', 'jsonl'], default=None, help='Default: from the file extension')
+        parser.add_argument('--batch-size', type=int, default=2000)
+        parser.add_argument('--method', choices=['auto', 'bulk', 'copy'], default='auto',
+                            help='copy (Postgres only) loads each batch with COPY; auto uses it when available')
+        parser.add_argument('--checkpoint', default=None, help='Default: <path>.checkpoint')
+        parser.add_argument('--restart', action='store_true', help='Ignore the checkpoint and start from the first row')
+        parser.add_argument('--max-errors', type=int, default=1000, help='Stop after this many invalid rows')
+        parser.add_argument('--skip-derived', action='store_true',
+                            help="Don't rebuild the companion graph and pest index afterwards")
+
+    def handle(self, *args, **options):
+        path, batch_size = options['path'], options['batch_size']
+        if not os.path.isfile(path):
+            raise CommandError(f'{path} does not exist')
+        if batch_size < 1:
+            raise CommandError('--batch-size must be >= 1')
+        method = options['method']
+        if method == 'auto':
+            method = 'copy' if connection.vendor == 'postgresql' else 'bulk'
+        if method == 'copy' and connection.vendor != 'postgresql':
+            raise CommandError('--method copy needs PostgreSQL')
+        write = copy_upsert if method == 'copy' else upsert
+
+        checkpoint = options['checkpoint'] or f'{path}.checkpoint'
+        done = 0 if options['restart'] else read_checkpoint(checkpoint, path)
+        if done:
+            self.stdout.write(f'Resuming after row {done} from {checkpoint}')
+
+        # Plants added since the last run (e.g. through the API) have no key to upsert on yet
+        keyed = key_existing_plants(batch_size=batch_size)
+        if keyed:
+            self.stdout.write(f'Keyed {keyed} existing plants on their normalized name')
+
+        rows = ((number, row) for number, row in read_rows(path, options['format'] or detect_format(path))
+                if number > done)
+        errors = []
+        written = 0
+        batch = []
+        last_number = done
+        start = time.perf_counter()
+
+        def flush():
+            nonlocal written, batch
+            written += write([plant for _, plant in batch])
+            write_checkpoint(checkpoint, path, batch[-1][0])
+            batch = []
+            elapsed = time.perf_counter() - start
+            self.stdout.write(f'{last_number} rows read, {written} written ({written / max(elapsed, 1e-9):,.0f} rows/s)')
+
+        for number, plant in validated_plants(rows, errors):
+            # Before this row is written, so the checkpoint stays ahead of the invalid ones
+            if len(errors) > options['max_errors']:
+                break
+            last_number = number
+            batch.append((number, plant))
+            if len(batch) >= batch_size:
+                flush()
+        if batch and len(errors) <= options['max_errors']:
+            flush()
+
+        for number, message in errors[:20]:
+            self.stderr.write(f'row {number}: {message}')
+        if len(errors) > 20:
+            self.stderr.write(f'... and {len(errors) - 20} more invalid rows')
+        if len(errors) > options['max_errors']:
+            raise CommandError(f'Stopped after {len(errors)} invalid rows; fix the input and run again to resume')
+        if os.path.exists(checkpoint):
+            os.remove(checkpoint)
+        elapsed = time.perf_counter() - start
+
+        if written and not options['skip_derived']:
+            # bulk writes skip the Plant post_save signals that keep these in sync
+            derived_start = time.perf_counter()
+            edges = rebuild_graph(batch_size=batch_size)
+            pest_rows = pests.rebuild_index(batch_size=batch_size)
+            self.stdout.write(f'Rebuilt {edges} companion edges and {pest_rows} pest index rows '
+                              f'in {time.perf_counter() - derived_start:.1f}s')
+        invalidate_catalogue_version()
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported {written} plants ({len(errors)} invalid rows skipped) with {method} in {elapsed:.1f}s '
+            f'({written / max(elapsed, 1e-9):,.0f} rows/s)'
+        ))
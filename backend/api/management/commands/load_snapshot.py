@@ -0,0 +1,42 @@
+import os
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+
+from api import pests
+from api.catalogue import invalidate_catalogue_version
+from api.companions import rebuild_graph
+from api.loadgen import USER_PREFIX, clear_generated, generated_exists, load_snapshot
+
+
+class Command(BaseCommand):
+    help = 'Load a dataset snapshot written by generate_load_data --snapshot'
+
+    def add_arguments(self, parser):
+        parser.add_argument('directory')
+        parser.add_argument('--replace', action='store_true', help='Delete previously generated data first')
+        parser.add_argument('--batch-size', type=int, default=5000)
+
+    def handle(self, *args, **options):
+        directory = options['directory']
+        if not os.path.isfile(os.path.join(directory, 'manifest.json')):
+            raise CommandError(f'{directory} has no manifest.json')
+        if generated_exists():
+            if not options['replace']:
+                raise CommandError(f'Generated data ({USER_PREFIX}* users) already exists; pass --replace')
+            clear_generated()
+
+        start = time.perf_counter()
+        manifest, loaded = load_snapshot(directory, batch_size=options['batch_size'])
+        rebuild_graph()
+        pests.rebuild_index()
+        invalidate_catalogue_version()
+        elapsed = time.perf_counter() - start
+
+        for label, rows in loaded.items():
+            self.stdout.write(f'{label}: {rows} rows')
+        total = sum(loaded.values())
+        self.stdout.write(self.style.SUCCESS(
+            f"Loaded seed {manifest['seed']} ({manifest['users']} users, generated around {manifest['today']}): "
+            f'{total} rows in {elapsed:.1f}s ({total / max(elapsed, 1e-9):,.0f} rows/s)'
+        ))
@@ -0,0 +1,23 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from api.pests import fan_out_outbreak, rebuild_index
+
+
+class Command(BaseCommand):
+    help = 'Alert every opted-in user growing a plant susceptible to a pest'
+
+    def add_arguments(self, parser):
+        parser.add_argument('pest', help='Pest name, e.g. "Aphids"')
+        parser.add_argument('--message', default='')
+        parser.add_argument('--rebuild-index', action='store_true',
+                            help='Rebuild the pest index from Plant.pests first')
+
+    def handle(self, *args, **options):
+        if options['rebuild_index']:
+            self.stdout.write(f'Indexed {rebuild_index()} plant/pest pairs')
+        start = time.perf_counter()
+        alerted = fan_out_outbreak(options['pest'], options['message'])
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(f'Alerted {alerted} users in {elapsed:.2f}s'))
@@ -0,0 +1,10 @@
+from django.core.management.base import BaseCommand
+
+from api.sync import TOMBSTONE_TTL, purge_tombstones
+
+
+class Command(BaseCommand):
+    help = f'Delete sync tombstones older than {TOMBSTONE_TTL.days} days'
+
+    def handle(self, *args, **options):
+        self.stdout.write(self.style.SUCCESS(f'Purged {purge_tombstones()} tombstones'))
@@ -0,0 +1,20 @@
+import time
+
+from django.core.management.base import BaseCommand
+
+from api.catalogue import invalidate_catalogue_version
+from api.companions import rebuild_graph
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the companion plant graph from every Plant.companion_plants list'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, **options):
+        start = time.perf_counter()
+        total = rebuild_graph(batch_size=options['batch_size'])
+        invalidate_catalogue_version()
+        elapsed = time.perf_counter() - start
+        self.stdout.write(self.style.SUCCESS(f'Wrote {total} companion edges in {elapsed:.1f}s'))
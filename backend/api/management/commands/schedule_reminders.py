@@ -0,0 +1,59 @@
+import multiprocessing
+import time
+from concurrent.futures import ProcessPoolExecutor
+from datetime import timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.utils import timezone
+
+from api.models import PlantReminder
+from api.scheduler import run_shard
+
+
+class Command(BaseCommand):
+    help = 'Generate upcoming watering, fertilizing and recurring reminders for every tracked plant'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--horizon', type=int, default=14, help='Days ahead to schedule')
+        parser.add_argument('--chunk-size', type=int, default=5000)
+        parser.add_argument('--workers', type=int, default=1,
+                            help='Worker processes; users are split between them by id')
+        parser.add_argument('--shard', type=int, default=None,
+                            help='Only process this shard (0-based), e.g. to spread a run across machines')
+        parser.add_argument('--shards', type=int, default=None, help='Total shards when --shard is given')
+
+    def handle(self, *args, **options):
+        today = timezone.localdate()
+        horizon, chunk_size, workers = options['horizon'], options['chunk_size'], options['workers']
+        if horizon < 0 or chunk_size < 1 or workers < 1:
+            raise CommandError('--horizon must be >= 0, --chunk-size and --workers >= 1')
+
+        if options['shard'] is not None:
+            shards = options['shards'] or 1
+            if not 0 <= options['shard'] < shards:
+                raise CommandError('--shard must be between 0 and --shards - 1')
+            jobs = [(options['shard'], shards)]
+        else:
+            jobs = [(shard, workers) for shard in range(workers)]
+
+        before = PlantReminder.objects.filter(generated=True).count()
+        start = time.perf_counter()
+        if workers == 1 or len(jobs) == 1:
+            results = [run_shard(shard, shards, today, horizon, chunk_size) for shard, shards in jobs]
+        else:
+            # Forked children must not share the parent's database connection
+            connections.close_all()
+            context = multiprocessing.get_context('fork')
+            with ProcessPoolExecutor(max_workers=workers, mp_context=context) as pool:
+                futures = [pool.submit(run_shard, shard, shards, today, horizon, chunk_size)
+                           for shard, shards in jobs]
+                results = [future.result() for future in futures]
+        elapsed = time.perf_counter() - start
+        offered, retired = (sum(column) for column in zip(*results))
+        created = PlantReminder.objects.filter(generated=True).count() - before + retired
+
+        self.stdout.write(self.style.SUCCESS(
+            f'Created {created} reminders ({offered - created} already scheduled, {retired} no longer due) through '
+            f'{today + timedelta(days=horizon)} in {elapsed:.1f}s ({offered / max(elapsed, 1e-9):,.0f} rows/s)'
+        ))
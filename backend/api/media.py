@@ -0,0 +1,141 @@
+import mimetypes
+import os
+import re
+import stat
+
+from django.conf import settings
+from django.core.exceptions import SuspiciousFileOperation
+from django.http import FileResponse, Http404, HttpResponse
+from django.utils._os import safe_join
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, parse_http_date_safe
+from django.views.decorators.http import require_safe
+
+# Content-addressed names (see api.images): the bytes behind such a URL never change
+HASHED_NAME = re.compile(r'^(?P<digest>[0-9a-f]{64}(-\d+)?)\.[0-9a-z]+$')
+IMMUTABLE_MAX_AGE = 365 * 24 * 60 * 60
+RANGE_HEADER = re.compile(r'^bytes=(\d*)-(\d*)$')
+
+
+class RangeFile:
+    """Read-only view of length bytes of a file from offset, for FileResponse"""
+
+    def __init__(self, file, offset, length):
+        file.seek(offset)
+        self.file = file
+        self.remaining = length
+
+    def read(self, size=-1):
+        if size < 0 or size > self.remaining:
+            size = self.remaining
+        data = self.file.read(size)
+        self.remaining -= len(data)
+        return data
+
+    def close(self):
+        self.file.close()
+
+
+def parse_range(header, size):
+    """
+    (start, end) of a single-range "bytes=" header, inclusive; None to send the whole file
+    (no header, or a form we don't serve partially, like multiple ranges), or
+    ValueError if the range can't be satisfied.
+    """
+    match = RANGE_HEADER.match(header.replace(' ', '')) if header else None
+    if match is None:
+        return None
+    first, last = match.groups()
+    if not first and not last:
+        return None
+    if not first:
+        # Suffix range: the last N bytes
+        if int(last) == 0:
+            raise ValueError(header)
+        return max(0, size - int(last)), size - 1
+    start = int(first)
+    end = min(int(last), size - 1) if last else size - 1
+    if start >= size or start > end:
+        raise ValueError(header)
+    return start, end
+
+
+def if_range_matches(request, etag, mtime):
+    """Whether a Range request still applies: its If-Range validator matches the current file"""
+    if_range = request.headers.get('If-Range')
+    if not if_range:
+        return True
+    if if_range.startswith(('"', 'W/')):
+        # Only strong ETags may validate a range
+        return if_range == etag
+    return parse_http_date_safe(if_range) == int(mtime)
+
+
+@require_safe
+def serve_media(request, path):
+    """
+    Serve an upload from MEDIA_ROOT with validators, byte ranges and, for content-addressed
+    names, immutable caching. With MEDIA_OFFLOAD set, the front-end server sends the bytes
+    (X-Accel-Redirect for nginx, X-Sendfile for Apache/lighttpd) after these checks.
+    """
+    if any(part.startswith('.') for part in path.split('/')):
+        raise Http404('Not found')
+    try:
+        full_path = safe_join(settings.MEDIA_ROOT, path)
+        stat_result = os.stat(full_path)
+    except (SuspiciousFileOperation, OSError):
+        raise Http404('Not found')
+    if not stat.S_ISREG(stat_result.st_mode):
+        raise Http404('Not found')
+
+    hashed = HASHED_NAME.match(os.path.basename(path))
+    # A content digest is the best validator there is; otherwise mtime and size
+    etag = f'"{hashed.group("digest")}"' if hashed else f'"{stat_result.st_mtime_ns:x}-{stat_result.st_size:x}"'
+    last_modified = int(stat_result.st_mtime)
+    response = get_conditional_response(request, etag=etag, last_modified=last_modified)
+    if response is None:
+        response = file_response(request, full_path, path, stat_result, etag)
+    response.headers['ETag'] = etag
+    response.headers['Last-Modified'] = http_date(last_modified)
+    if hashed:
+        patch_cache_control(response, public=True, max_age=IMMUTABLE_MAX_AGE, immutable=True)
+    else:
+        patch_cache_control(response, public=True, no_cache=True)
+    return response
+
+
+def file_response(request, full_path, path, stat_result, etag):
+    content_type, encoding = mimetypes.guess_type(path)
+    content_type = content_type if content_type and not encoding else 'application/octet-stream'
+    offload = getattr(settings, 'MEDIA_OFFLOAD', None)
+    if offload == 'x-accel-redirect':
+        # nginx serves the bytes itself, including ranges, from an internal location
+        response = HttpResponse(content_type=content_type)
+        response.headers['X-Accel-Redirect'] = settings.MEDIA_ACCEL_REDIRECT_PREFIX + path
+        return response
+    if offload == 'x-sendfile':
+        response = HttpResponse(content_type=content_type)
+        response.headers['X-Sendfile'] = full_path
+        return response
+
+    size = stat_result.st_size
+    try:
+        byte_range = parse_range(request.headers.get('Range'), size)
+    except ValueError:
+        response = HttpResponse(status=416)
+        response.headers['Content-Range'] = f'bytes */{size}'
+        return response
+    if byte_range is not None and not if_range_matches(request, etag, stat_result.st_mtime):
+        byte_range = None
+
+    if byte_range is None:
+        # A real file object lets the WSGI server use its file wrapper (sendfile) for the body
+        response = FileResponse(open(full_path, 'rb'), content_type=content_type)
+    else:
+        start, end = byte_range
+        response = FileResponse(RangeFile(open(full_path, 'rb'), start, end - start + 1),
+                                content_type=content_type, status=206)
+        response.headers['Content-Length'] = end - start + 1
+        response.headers['Content-Range'] = f'bytes {start}-{end}/{size}'
+    response.headers['Accept-Ranges'] = 'bytes'
+    return response
@@ -0,0 +1,17 @@
+# Generated by Django 5.1.7 on 2026-10-18 08:37
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0003_trackedplant_plantreminder'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='plant',
+            index=models.Index(fields=['name', 'id'], name='plant_name_id_idx'),
+        ),
+    ]
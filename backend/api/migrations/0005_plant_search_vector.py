@@ -0,0 +1,45 @@
+from django.db import migrations
+
+# Weighted search document: names rank above pests/companions, which rank above care text.
+# A generated column keeps it in sync on every INSERT/UPDATE without application code.
+CREATE_SEARCH_VECTOR = [
+    """
+ALTER TABLE api_plant ADD COLUMN search_vector tsvector GENERATED ALWAYS AS (
+    setweight(to_tsvector('english'::regconfig, coalesce(name, '')), 'A') ||
+    setweight(to_tsvector('english'::regconfig, coalesce(scientific_name, '')), 'A') ||
+    setweight(to_tsvector('english'::regconfig, coalesce(pests::text, '')), 'B') ||
+    setweight(to_tsvector('english'::regconfig, coalesce(companion_plants::text, '')), 'B') ||
+    setweight(to_tsvector('english'::regconfig, coalesce(care_instructions, '')), 'C')
+) STORED
+""",
+    "CREATE INDEX plant_search_vector_idx ON api_plant USING GIN (search_vector)",
+]
+
+DROP_SEARCH_VECTOR = [
+    "DROP INDEX IF EXISTS plant_search_vector_idx",
+    "ALTER TABLE api_plant DROP COLUMN IF EXISTS search_vector",
+]
+
+
+def create_search_vector(apps, schema_editor):
+    # Other backends (SQLite in tests) use the icontains fallback in api.search
+    if schema_editor.connection.vendor == 'postgresql':
+        for sql in CREATE_SEARCH_VECTOR:
+            schema_editor.execute(sql)
+
+
+def drop_search_vector(apps, schema_editor):
+    if schema_editor.connection.vendor == 'postgresql':
+        for sql in DROP_SEARCH_VECTOR:
+            schema_editor.execute(sql)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0004_plant_name_id_idx'),
+    ]
+
+    operations = [
+        migrations.RunPython(create_search_vector, drop_search_vector),
+    ]
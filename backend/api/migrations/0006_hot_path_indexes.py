@@ -0,0 +1,41 @@
+# Generated by Django 5.1.7 on 2026-10-18 08:39
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0005_plant_search_vector'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='plant',
+            index=models.Index(fields=['category', 'name', 'id'], name='plant_category_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='plant',
+            index=models.Index(fields=['soil_type'], name='plant_soil_type_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='plant',
+            index=models.Index(fields=['sunlight'], name='plant_sunlight_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='plant',
+            index=models.Index(fields=['watering_schedule'], name='plant_watering_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='plantreminder',
+            index=models.Index(fields=['user', 'due_date'], name='reminder_user_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='plantreminder',
+            index=models.Index(condition=models.Q(('completed', False)), fields=['user', 'due_date'], name='reminder_user_open_due_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='trackedplant',
+            index=models.Index(fields=['user', 'health_status'], name='tracked_user_health_idx'),
+        ),
+    ]
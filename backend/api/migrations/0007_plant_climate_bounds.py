@@ -0,0 +1,51 @@
+# Generated by Django 5.1.7 on 2026-10-18 08:42
+
+from django.db import migrations, models
+
+from api.climate import parse_humidity, parse_temperature
+
+
+def backfill_climate_bounds(apps, schema_editor):
+    Plant = apps.get_model('api', 'Plant')
+    fields = ['temperature_min', 'temperature_max', 'humidity_min', 'humidity_max']
+    batch = []
+    for plant in Plant.objects.only('id', 'ideal_temperature', 'humidity_needs').iterator(chunk_size=2000):
+        plant.temperature_min, plant.temperature_max = parse_temperature(plant.ideal_temperature)
+        plant.humidity_min, plant.humidity_max = parse_humidity(plant.humidity_needs)
+        batch.append(plant)
+        if len(batch) >= 2000:
+            Plant.objects.bulk_update(batch, fields)
+            batch = []
+    if batch:
+        Plant.objects.bulk_update(batch, fields)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0006_hot_path_indexes'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='plant',
+            name='humidity_max',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='plant',
+            name='humidity_min',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='plant',
+            name='temperature_max',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.AddField(
+            model_name='plant',
+            name='temperature_min',
+            field=models.FloatField(blank=True, editable=False, null=True),
+        ),
+        migrations.RunPython(backfill_climate_bounds, migrations.RunPython.noop),
+    ]
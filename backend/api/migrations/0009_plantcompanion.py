@@ -0,0 +1,46 @@
+# Generated by Django 5.1.7 on 2026-10-18 08:45
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+from api.companions import normalize_name
+
+
+def build_companion_graph(apps, schema_editor):
+    Plant = apps.get_model('api', 'Plant')
+    PlantCompanion = apps.get_model('api', 'PlantCompanion')
+    names_to_id = {}
+    for plant_id, name in Plant.objects.order_by('id').values_list('id', 'name').iterator():
+        names_to_id.setdefault(normalize_name(name), plant_id)
+    batch = []
+    for plant in Plant.objects.order_by('id').only('id', 'name', 'companion_plants').iterator():
+        names = {normalize_name(name) for name in plant.companion_plants or []} - {'', normalize_name(plant.name)}
+        batch.extend(PlantCompanion(plant_id=plant.id, companion_name=name, companion_id=names_to_id.get(name))
+                     for name in names)
+        if len(batch) >= 2000:
+            PlantCompanion.objects.bulk_create(batch)
+            batch = []
+    PlantCompanion.objects.bulk_create(batch)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0008_climate_range_columns'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='PlantCompanion',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('companion_name', models.CharField(db_index=True, max_length=100)),
+                ('companion', models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.SET_NULL, related_name='companion_of', to='api.plant')),
+                ('plant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='companion_links', to='api.plant')),
+            ],
+            options={
+                'constraints': [models.UniqueConstraint(fields=('plant', 'companion_name'), name='unique_plant_companion')],
+            },
+        ),
+        migrations.RunPython(build_companion_graph, migrations.RunPython.noop),
+    ]
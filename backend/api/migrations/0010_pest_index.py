@@ -0,0 +1,76 @@
+# Generated by Django 5.1.7 on 2026-10-18 08:46
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+from api.names import normalize_name
+
+
+def build_pest_index(apps, schema_editor):
+    Plant = apps.get_model('api', 'Plant')
+    PlantPest = apps.get_model('api', 'PlantPest')
+    TrackedPlant = apps.get_model('api', 'TrackedPlant')
+
+    batch = []
+    for plant in Plant.objects.order_by('id').only('id', 'name', 'pests').iterator(chunk_size=2000):
+        plant_key = normalize_name(plant.name)
+        pests = {normalize_name(pest) for pest in plant.pests or []} - {''}
+        batch.extend(PlantPest(plant_id=plant.id, pest=pest, plant_key=plant_key) for pest in pests)
+        if len(batch) >= 2000:
+            PlantPest.objects.bulk_create(batch)
+            batch = []
+    PlantPest.objects.bulk_create(batch)
+
+    batch = []
+    for tracked in TrackedPlant.objects.order_by('id').only('id', 'name', 'type').iterator(chunk_size=2000):
+        tracked.plant_key = normalize_name(tracked.type or tracked.name)
+        batch.append(tracked)
+        if len(batch) >= 2000:
+            TrackedPlant.objects.bulk_update(batch, ['plant_key'])
+            batch = []
+    TrackedPlant.objects.bulk_update(batch, ['plant_key'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0009_plantcompanion'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='trackedplant',
+            name='plant_key',
+            field=models.CharField(blank=True, db_index=True, editable=False, max_length=100),
+        ),
+        migrations.CreateModel(
+            name='PestAlert',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('pest', models.CharField(max_length=100)),
+                ('message', models.TextField(blank=True)),
+                ('read', models.BooleanField(default=False)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('user', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='pest_alerts', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['user', '-created_at'], name='pestalert_user_created_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='PlantPest',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('pest', models.CharField(max_length=100)),
+                ('plant_key', models.CharField(max_length=100)),
+                ('plant', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='pest_links', to='api.plant')),
+            ],
+            options={
+                'indexes': [models.Index(fields=['pest', 'plant_key'], name='plantpest_pest_key_idx'), models.Index(fields=['plant_key', 'pest'], name='plantpest_key_pest_idx')],
+                'constraints': [models.UniqueConstraint(fields=('plant', 'pest'), name='unique_plant_pest')],
+            },
+        ),
+        migrations.RunPython(build_pest_index, migrations.RunPython.noop),
+    ]
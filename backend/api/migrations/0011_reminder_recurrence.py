@@ -0,0 +1,27 @@
+# Generated by Django 5.1.7 on 2026-10-18 08:49
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0010_pest_index'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='plantreminder',
+            name='generated',
+            field=models.BooleanField(default=False),
+        ),
+        migrations.AddField(
+            model_name='plantreminder',
+            name='repeat_every_days',
+            field=models.PositiveIntegerField(blank=True, null=True),
+        ),
+        migrations.AddConstraint(
+            model_name='plantreminder',
+            constraint=models.UniqueConstraint(condition=models.Q(('generated', True)), fields=('tracked_plant', 'type', 'due_date'), name='unique_generated_reminder'),
+        ),
+    ]
@@ -0,0 +1,61 @@
+# Generated by Django 5.1.7 on 2026-10-18 08:51
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+def mark_existing_alerts_notified(apps, schema_editor):
+    # Alerts raised before the outbox existed were already shown in the feed; don't email them now
+    PestAlert = apps.get_model('api', 'PestAlert')
+    PestAlert.objects.filter(notified_at__isnull=True).update(notified_at=models.F('created_at'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0011_reminder_recurrence'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Notification',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('kind', models.CharField(choices=[('maintenance', 'Maintenance'), ('pest', 'Pest'), ('disease', 'Disease'), ('community', 'Community')], max_length=20)),
+                ('subject', models.CharField(max_length=200)),
+                ('body', models.TextField()),
+                ('dedupe_key', models.CharField(max_length=200, unique=True)),
+                ('status', models.CharField(choices=[('pending', 'Pending'), ('sending', 'Sending'), ('sent', 'Sent'), ('failed', 'Failed')], default='pending', max_length=10)),
+                ('attempts', models.PositiveSmallIntegerField(default=0)),
+                ('next_attempt_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('last_error', models.TextField(blank=True)),
+                ('sent_at', models.DateTimeField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='pestalert',
+            name='notified_at',
+            field=models.DateTimeField(blank=True, null=True),
+        ),
+        migrations.RunPython(mark_existing_alerts_notified, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='pestalert',
+            index=models.Index(condition=models.Q(('notified_at__isnull', True)), fields=['id'], name='pestalert_unnotified_idx'),
+        ),
+        migrations.AddField(
+            model_name='notification',
+            name='user',
+            field=models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='notifications', to=settings.AUTH_USER_MODEL),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(condition=models.Q(('status__in', ['pending', 'sending'])), fields=['next_attempt_at'], name='notification_queue_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='notification',
+            index=models.Index(fields=['user', 'sent_at'], name='notification_user_sent_idx'),
+        ),
+    ]
@@ -0,0 +1,66 @@
+# Generated by Django 5.1.7 on 2026-10-18 08:54
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count, F, Window
+from django.db.models.functions import RowNumber
+
+
+def backfill_summaries(apps, schema_editor):
+    User = apps.get_model('api', 'User')
+    TrackedPlant = apps.get_model('api', 'TrackedPlant')
+    PlantReminder = apps.get_model('api', 'PlantReminder')
+    DashboardSummary = apps.get_model('api', 'DashboardSummary')
+
+    user_ids = list(User.objects.order_by('id').values_list('id', flat=True))
+    for start in range(0, len(user_ids), 2000):
+        batch = user_ids[start:start + 2000]
+        summaries = {user_id: DashboardSummary(user_id=user_id, health_counts={}, reminder_calendar={}, upcoming=[])
+                     for user_id in batch}
+        health = (TrackedPlant.objects.filter(user_id__in=batch).order_by()
+                  .values_list('user_id', 'health_status').annotate(count=Count('id')))
+        for user_id, health_status, count in health:
+            summaries[user_id].health_counts[health_status] = count
+            summaries[user_id].plants_total += count
+        calendar = (PlantReminder.objects.filter(user_id__in=batch, completed=False).order_by()
+                    .values_list('user_id', 'type', 'due_date').annotate(count=Count('id')))
+        for user_id, reminder_type, due_date, count in calendar:
+            summaries[user_id].reminder_calendar.setdefault(reminder_type, {})[due_date.isoformat()] = count
+            summaries[user_id].open_reminders += count
+        upcoming = (
+            PlantReminder.objects.filter(user_id__in=batch, completed=False)
+            .annotate(position=Window(RowNumber(), partition_by=F('user_id'),
+                                      order_by=[F('due_date').asc(), F('id').asc()]))
+            .filter(position__lte=10)
+            .order_by('user_id', 'position')
+            .values_list('user_id', 'id', 'type', 'due_date', 'tracked_plant_id', 'tracked_plant__name')
+        )
+        for user_id, reminder_id, reminder_type, due_date, tracked_plant_id, plant_name in upcoming:
+            summaries[user_id].upcoming.append({'id': reminder_id, 'type': reminder_type,
+                                                'due_date': due_date.isoformat(),
+                                                'tracked_plant': tracked_plant_id, 'plant_name': plant_name})
+        DashboardSummary.objects.bulk_create(summaries.values())
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0012_notification_outbox'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='DashboardSummary',
+            fields=[
+                ('user', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='dashboard_summary', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('plants_total', models.PositiveIntegerField(default=0)),
+                ('health_counts', models.JSONField(default=dict)),
+                ('open_reminders', models.PositiveIntegerField(default=0)),
+                ('reminder_calendar', models.JSONField(default=dict)),
+                ('upcoming', models.JSONField(default=list)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+            ],
+        ),
+        migrations.RunPython(backfill_summaries, migrations.RunPython.noop),
+    ]
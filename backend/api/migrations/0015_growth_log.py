@@ -0,0 +1,33 @@
+# Generated by Django 5.1.7 on 2026-10-18 08:58
+
+import django.db.models.deletion
+import django.utils.timezone
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0014_sync_tombstones'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='GrowthLog',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('recorded_at', models.DateTimeField(default=django.utils.timezone.now)),
+                ('height_cm', models.FloatField(blank=True, null=True)),
+                ('health_status', models.CharField(blank=True, max_length=20)),
+                ('growth_stage', models.CharField(blank=True, max_length=20)),
+                ('pests_observed', models.JSONField(blank=True, default=list)),
+                ('notes', models.TextField(blank=True)),
+                ('tracked_plant', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='growth_logs', to='api.trackedplant')),
+                ('user', models.ForeignKey(db_index=False, on_delete=django.db.models.deletion.CASCADE, related_name='growth_logs', to=settings.AUTH_USER_MODEL)),
+            ],
+            options={
+                'indexes': [models.Index(fields=['tracked_plant', 'recorded_at'], name='growthlog_plant_time_idx'), models.Index(fields=['user', 'recorded_at'], name='growthlog_user_time_idx')],
+            },
+        ),
+    ]
@@ -0,0 +1,61 @@
+# Partitioning runs in its own migration: CreateModel defers its FK and index DDL to the end of
+# the migration that creates the table, and that DDL has to hit the original table.
+
+from django.db import migrations
+from django.utils import timezone
+
+from api.growth import default_partition_months, partition_statements, split_default_partition
+
+
+def partition_growth_log(apps, schema_editor):
+    """
+    Rebuild the table as a monthly range-partitioned table with a BRIN index.
+
+    Postgres requires the partition key in the primary key, hence (id, recorded_at); Django keeps
+    treating id alone as the primary key, which the identity column still makes unique.
+    Rows already logged are copied over, each month into its own partition. Later rows outside
+    the pre-created months land in the default partition until the growth_partitions command
+    moves them out; it also creates upcoming months ahead of time.
+    """
+    # Other backends (SQLite in tests) keep the plain table
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    GrowthLog = apps.get_model('api', 'GrowthLog')
+    table = GrowthLog._meta.db_table
+    plants = apps.get_model('api', 'TrackedPlant')._meta.db_table
+    users = apps.get_model('api', 'User')._meta.db_table
+    statements = [
+        f'ALTER TABLE "{table}" RENAME TO "{table}_unpartitioned"',
+        f'CREATE TABLE "{table}" (LIKE "{table}_unpartitioned" INCLUDING DEFAULTS INCLUDING IDENTITY) '
+        f'PARTITION BY RANGE (recorded_at)',
+        f'CREATE TABLE "{table}_default" PARTITION OF "{table}" DEFAULT',
+        *partition_statements(table, timezone.now().date().replace(day=1), 4),
+        f'INSERT INTO "{table}" SELECT * FROM "{table}_unpartitioned"',
+        # Frees the constraint and index names for the new table
+        f'DROP TABLE "{table}_unpartitioned"',
+        # The new identity sequence starts over; continue after the copied ids
+        f"SELECT setval(pg_get_serial_sequence('\"{table}\"', 'id'), max(id)) FROM \"{table}\" HAVING count(*) > 0",
+        f'ALTER TABLE "{table}" ADD PRIMARY KEY (id, recorded_at)',
+        f'ALTER TABLE "{table}" ADD CONSTRAINT growthlog_tracked_plant_fk FOREIGN KEY (tracked_plant_id) '
+        f'REFERENCES "{plants}" (id) DEFERRABLE INITIALLY DEFERRED',
+        f'ALTER TABLE "{table}" ADD CONSTRAINT growthlog_user_fk FOREIGN KEY (user_id) '
+        f'REFERENCES "{users}" (id) DEFERRABLE INITIALLY DEFERRED',
+        f'CREATE INDEX growthlog_plant_time_idx ON "{table}" (tracked_plant_id, recorded_at)',
+        f'CREATE INDEX growthlog_user_time_idx ON "{table}" (user_id, recorded_at)',
+        f'CREATE INDEX growthlog_recorded_brin ON "{table}" USING brin (recorded_at)',
+    ]
+    for sql in statements:
+        schema_editor.execute(sql)
+    with schema_editor.connection.cursor() as cursor:
+        split_default_partition(cursor, table, default_partition_months(cursor, table))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0015_growth_log'),
+    ]
+
+    operations = [
+        migrations.RunPython(partition_growth_log, migrations.RunPython.noop),
+    ]
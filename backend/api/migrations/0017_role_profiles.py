@@ -0,0 +1,116 @@
+# Generated by Django 5.1.7 on 2026-10-18 09:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+# extension model -> (User.role, columns moved off UserProfile)
+ROLE_COLUMNS = {
+    'GardenerProfile': ('Gardener', ['experience_level', 'specialization', 'availability', 'service_area',
+                                     'certifications']),
+    'SupervisorProfile': ('Supervisor', ['work_experience', 'managed_projects', 'responsibilities']),
+    'HomeownerProfile': ('Homeowner', ['property_type', 'garden_size', 'preferred_plants', 'organic_fertilizer',
+                                       'plant_tracking']),
+    'AdminProfile': ('System Admin', ['admin_level', 'assigned_responsibilities']),
+}
+
+
+def move_role_fields(apps, schema_editor):
+    """Copy role columns into the extension tables: one row for the user's role, plus one for any other role with data"""
+    UserProfile = apps.get_model('api', 'UserProfile')
+    columns = [name for _, names in ROLE_COLUMNS.values() for name in names]
+
+    last_id = 0
+    while True:
+        batch = list(UserProfile.objects.filter(id__gt=last_id).order_by('id')
+                     .values('id', 'user__role', *columns)[:2000])
+        if not batch:
+            break
+        last_id = batch[-1]['id']
+        for model_name, (role, names) in ROLE_COLUMNS.items():
+            model = apps.get_model('api', model_name)
+            model.objects.bulk_create([
+                model(profile_id=row['id'], **{name: row[name] for name in names})
+                for row in batch
+                if row['user__role'] == role or any(row[name] not in (None, '', False) for name in names)
+            ])
+
+
+def restore_role_fields(apps, schema_editor):
+    UserProfile = apps.get_model('api', 'UserProfile')
+    for model_name, (_, names) in ROLE_COLUMNS.items():
+        model = apps.get_model('api', model_name)
+        last_id = 0
+        while True:
+            batch = list(model.objects.filter(profile_id__gt=last_id).order_by('profile_id')[:2000])
+            if not batch:
+                break
+            last_id = batch[-1].profile_id
+            profiles = []
+            for extension in batch:
+                profile = UserProfile(id=extension.profile_id)
+                for name in names:
+                    setattr(profile, name, getattr(extension, name))
+                profiles.append(profile)
+            UserProfile.objects.bulk_update(profiles, names)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0016_growth_log_partitions'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AdminProfile',
+            fields=[
+                ('profile', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='%(class)s', serialize=False, to='api.userprofile')),
+                ('admin_level', models.CharField(blank=True, max_length=50)),
+                ('assigned_responsibilities', models.TextField(blank=True)),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='GardenerProfile',
+            fields=[
+                ('profile', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='%(class)s', serialize=False, to='api.userprofile')),
+                ('experience_level', models.CharField(blank=True, max_length=50)),
+                ('specialization', models.CharField(blank=True, max_length=100)),
+                ('availability', models.CharField(blank=True, max_length=50)),
+                ('service_area', models.CharField(blank=True, max_length=255)),
+                ('certifications', models.TextField(blank=True)),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='HomeownerProfile',
+            fields=[
+                ('profile', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='%(class)s', serialize=False, to='api.userprofile')),
+                ('property_type', models.CharField(blank=True, max_length=50)),
+                ('garden_size', models.CharField(blank=True, max_length=50)),
+                ('preferred_plants', models.TextField(blank=True)),
+                ('organic_fertilizer', models.BooleanField(default=False)),
+                ('plant_tracking', models.CharField(blank=True, max_length=50)),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.CreateModel(
+            name='SupervisorProfile',
+            fields=[
+                ('profile', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='%(class)s', serialize=False, to='api.userprofile')),
+                ('work_experience', models.IntegerField(blank=True, null=True)),
+                ('managed_projects', models.TextField(blank=True)),
+                ('responsibilities', models.TextField(blank=True)),
+            ],
+            options={
+                'abstract': False,
+            },
+        ),
+        migrations.RunPython(move_role_fields, restore_role_fields),
+    ]
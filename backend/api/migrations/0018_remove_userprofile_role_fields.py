@@ -0,0 +1,73 @@
+# Generated by Django 5.1.7 on 2026-10-18 09:02
+
+from django.db import migrations
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0017_role_profiles'),
+    ]
+
+    operations = [
+        migrations.RemoveField(
+            model_name='userprofile',
+            name='admin_level',
+        ),
+        migrations.RemoveField(
+            model_name='userprofile',
+            name='assigned_responsibilities',
+        ),
+        migrations.RemoveField(
+            model_name='userprofile',
+            name='availability',
+        ),
+        migrations.RemoveField(
+            model_name='userprofile',
+            name='certifications',
+        ),
+        migrations.RemoveField(
+            model_name='userprofile',
+            name='experience_level',
+        ),
+        migrations.RemoveField(
+            model_name='userprofile',
+            name='garden_size',
+        ),
+        migrations.RemoveField(
+            model_name='userprofile',
+            name='managed_projects',
+        ),
+        migrations.RemoveField(
+            model_name='userprofile',
+            name='organic_fertilizer',
+        ),
+        migrations.RemoveField(
+            model_name='userprofile',
+            name='plant_tracking',
+        ),
+        migrations.RemoveField(
+            model_name='userprofile',
+            name='preferred_plants',
+        ),
+        migrations.RemoveField(
+            model_name='userprofile',
+            name='property_type',
+        ),
+        migrations.RemoveField(
+            model_name='userprofile',
+            name='responsibilities',
+        ),
+        migrations.RemoveField(
+            model_name='userprofile',
+            name='service_area',
+        ),
+        migrations.RemoveField(
+            model_name='userprofile',
+            name='specialization',
+        ),
+        migrations.RemoveField(
+            model_name='userprofile',
+            name='work_experience',
+        ),
+    ]
@@ -0,0 +1,46 @@
+# Generated by Django 5.1.7 on 2026-10-18 09:04
+
+import django.db.models.functions.text
+from django.db import migrations, models
+from django.db.models import Count
+from django.db.models.functions import Lower
+
+
+def check_duplicate_emails(apps, schema_editor):
+    """Stop with a list of the clashing accounts rather than fail on the index build or guess which to keep"""
+    User = apps.get_model('api', 'User')
+    duplicates = list(
+        User.objects.exclude(email='').annotate(email_lower=Lower('email')).order_by()
+        .values('email_lower').annotate(accounts=Count('id')).filter(accounts__gt=1)
+        .values_list('email_lower', flat=True)
+    )
+    if not duplicates:
+        return
+    lines = []
+    for email in duplicates[:50]:
+        accounts = (User.objects.annotate(email_lower=Lower('email')).filter(email_lower=email)
+                    .order_by('id').values_list('id', 'username', 'last_login'))
+        lines.append(f'  {email}: ' + ', '.join(
+            f'id={user_id} username={username} last_login={last_login}' for user_id, username, last_login in accounts))
+    if len(duplicates) > 50:
+        lines.append(f'  ... and {len(duplicates) - 50} more')
+    raise RuntimeError(
+        f'{len(duplicates)} email addresses belong to more than one account (ignoring case). Merge or '
+        'change them, then run migrate again:\n' + '\n'.join(lines)
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0018_remove_userprofile_role_fields'),
+        ('auth', '0012_alter_user_first_name_max_length'),
+    ]
+
+    operations = [
+        migrations.RunPython(check_duplicate_emails, migrations.RunPython.noop),
+        migrations.AddConstraint(
+            model_name='user',
+            constraint=models.UniqueConstraint(django.db.models.functions.text.Lower('email'), condition=models.Q(('email', ''), _negated=True), name='user_email_ci_unique'),
+        ),
+    ]
@@ -0,0 +1,18 @@
+# Generated by Django 5.1.7 on 2026-10-18 09:07
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0019_user_email_ci_unique'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='plant',
+            name='external_id',
+            field=models.CharField(blank=True, max_length=150, null=True, unique=True),
+        ),
+    ]
@@ -0,0 +1,24 @@
+# Generated by Django 5.1.7 on 2026-10-18 09:14
+
+import api.images
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0020_plant_external_id'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='plant',
+            name='image_variants',
+            field=models.JSONField(blank=True, default=dict, editable=False),
+        ),
+        migrations.AlterField(
+            model_name='plant',
+            name='image',
+            field=api.images.ContentAddressedImageField(blank=True, null=True, upload_to=api.images.plant_image_path),
+        ),
+    ]
@@ -0,0 +1,19 @@
+from django.db import migrations
+
+from api.importer import key_existing_plants
+
+
+def backfill_external_ids(apps, schema_editor):
+    """Existing plants get the key an import would give them, so re-importing them updates in place"""
+    key_existing_plants(apps.get_model('api', 'Plant'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('api', '0021_plant_image_variants'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_external_ids, migrations.RunPython.noop),
+    ]
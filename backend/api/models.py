@@ -1,5 +1,11 @@
 from django.contrib.auth.models import AbstractUser, Group, Permission
 from django.db import models
+from django.db.models.functions import Lower
+from django.utils import timezone
+
+from .climate import parse_humidity, parse_rainfall, parse_temperature
+from .images import ContentAddressedImageField, plant_image_path
+from .names import normalize_name
 
 class User(AbstractUser):
     ROLE_CHOICES = [
@@ -16,7 +22,41 @@ class User(AbstractUser):
     def __str__(self):
         return self.username
 
-class UserProfile(models.Model):
+    class Meta(AbstractUser.Meta):
+        constraints = [
+            # Emails are the login name: one account per address, ignoring case. Blank emails
+            # (e.g. from createsuperuser) are left out
+            models.UniqueConstraint(Lower('email'), condition=~models.Q(email=''), name='user_email_ci_unique'),
+        ]
+
+    @classmethod
+    def with_email(cls, email):
+        """Users with this email, ignoring case; matches user_email_ci_unique so it is an index lookup"""
+        return cls.objects.alias(email_lower=Lower('email')).exclude(email='').filter(email_lower=email.lower())
+
+class ClimateRangeMixin:
+    """Keeps numeric min/max columns in sync with free-text climate fields such as '20-30°C'"""
+    # source text field -> (parser, min column, max column)
+    CLIMATE_SOURCES = {}
+
+    def parse_climate(self):
+        for source, (parser, low_field, high_field) in self.CLIMATE_SOURCES.items():
+            low, high = parser(getattr(self, source))
+            setattr(self, low_field, low)
+            setattr(self, high_field, high)
+
+    def save(self, *args, **kwargs):
+        self.parse_climate()
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None:
+            update_fields = set(update_fields)
+            for source, (_, low_field, high_field) in self.CLIMATE_SOURCES.items():
+                if source in update_fields:
+                    update_fields.update((low_field, high_field))
+            kwargs['update_fields'] = update_fields
+        super().save(*args, **kwargs)
+
+class UserProfile(ClimateRangeMixin, models.Model):
     # Basic Information
     user = models.OneToOneField('api.User', on_delete=models.CASCADE)
     full_name = models.CharField(max_length=255, blank=True)
@@ -43,34 +83,97 @@ class UserProfile(models.Model):
     
     # Existing fields
     gardening_preferences = models.TextField(blank=True)
-    
-    # Gardener specific fields
+
+    # Role-specific fields live in GardenerProfile, SupervisorProfile, HomeownerProfile and AdminProfile
+
+    # Numeric bounds parsed from the climate text fields, kept in sync on save
+    temperature_min = models.FloatField(null=True, blank=True, editable=False)
+    temperature_max = models.FloatField(null=True, blank=True, editable=False)
+    humidity_min = models.FloatField(null=True, blank=True, editable=False)
+    humidity_max = models.FloatField(null=True, blank=True, editable=False)
+    rainfall_min = models.FloatField(null=True, blank=True, editable=False)
+    rainfall_max = models.FloatField(null=True, blank=True, editable=False)
+
+    CLIMATE_SOURCES = {
+        'average_temperature': (parse_temperature, 'temperature_min', 'temperature_max'),
+        'average_humidity': (parse_humidity, 'humidity_min', 'humidity_max'),
+        'annual_rainfall': (parse_rainfall, 'rainfall_min', 'rainfall_max'),
+    }
+
+    def __str__(self):
+        return f"{self.user.username}'s Profile"
+
+    def role_profile(self):
+        """The extension row for the user's role (unsaved if it doesn't exist yet), None if the role has none"""
+        model = ROLE_PROFILES.get(self.user.role)
+        if model is None:
+            return None
+        try:
+            return getattr(self, model._meta.model_name)
+        except model.DoesNotExist:
+            return model(profile=self)
+
+class RoleProfile(models.Model):
+    """Columns only one role uses, in a one-to-one table per User.role next to the core UserProfile"""
+    ROLE = None
+
+    profile = models.OneToOneField(UserProfile, on_delete=models.CASCADE, primary_key=True,
+                                   related_name='%(class)s')
+
+    class Meta:
+        abstract = True
+
+    @classmethod
+    def field_names(cls):
+        return [field.name for field in cls._meta.concrete_fields if not field.primary_key]
+
+class GardenerProfile(RoleProfile):
+    ROLE = 'Gardener'
+
     experience_level = models.CharField(max_length=50, blank=True)
     specialization = models.CharField(max_length=100, blank=True)
     availability = models.CharField(max_length=50, blank=True)
     service_area = models.CharField(max_length=255, blank=True)
     certifications = models.TextField(blank=True)
-    
-    # Supervisor specific fields
+
+    def __str__(self):
+        return f"Gardener profile {self.profile_id}"
+
+class SupervisorProfile(RoleProfile):
+    ROLE = 'Supervisor'
+
     work_experience = models.IntegerField(null=True, blank=True)
     managed_projects = models.TextField(blank=True)
     responsibilities = models.TextField(blank=True)
-    
-    # Homeowner specific fields
+
+    def __str__(self):
+        return f"Supervisor profile {self.profile_id}"
+
+class HomeownerProfile(RoleProfile):
+    ROLE = 'Homeowner'
+
     property_type = models.CharField(max_length=50, blank=True)
     garden_size = models.CharField(max_length=50, blank=True)
     preferred_plants = models.TextField(blank=True)
     organic_fertilizer = models.BooleanField(default=False)
     plant_tracking = models.CharField(max_length=50, blank=True)  # Manual or AI-based
-    
-    # Admin specific fields
+
+    def __str__(self):
+        return f"Homeowner profile {self.profile_id}"
+
+class AdminProfile(RoleProfile):
+    ROLE = 'System Admin'
+
     admin_level = models.CharField(max_length=50, blank=True)
     assigned_responsibilities = models.TextField(blank=True)
 
     def __str__(self):
-        return f"{self.user.username}'s Profile"
+        return f"Admin profile {self.profile_id}"
+
+# User.role -> its profile extension model
+ROLE_PROFILES = {model.ROLE: model for model in (GardenerProfile, SupervisorProfile, HomeownerProfile, AdminProfile)}
 
-class Plant(models.Model):
+class Plant(ClimateRangeMixin, models.Model):
     CATEGORY_CHOICES = [
         ('flower', 'Flower Plant'),
         ('vegetable', 'Vegetable Plant'),
@@ -97,7 +200,11 @@ class Plant(models.Model):
     ]
 
     name = models.CharField(max_length=100)
-    image = models.ImageField(upload_to='plant_images/', null=True, blank=True)
+    # Key of the row in the reference dataset it was imported from (see the import_plants command)
+    external_id = models.CharField(max_length=150, unique=True, null=True, blank=True)
+    image = ContentAddressedImageField(upload_to=plant_image_path, null=True, blank=True)
+    # Resized WebP/JPEG derivatives of image, built in the background (see api.images)
+    image_variants = models.JSONField(default=dict, blank=True, editable=False)
     scientific_name = models.CharField(max_length=150, blank=True, null=True)
     category = models.CharField(max_length=20, choices=CATEGORY_CHOICES)
     soil_type = models.CharField(max_length=20, choices=SOIL_TYPES)
@@ -124,6 +231,12 @@ class Plant(models.Model):
     pruning_needs = models.CharField(max_length=255, blank=True, null=True)
     soil_ph_preference = models.CharField(max_length=100, blank=True, null=True)
     nutrient_requirements = models.CharField(max_length=50, blank=True, null=True)
+
+    # Numeric bounds parsed from ideal_temperature (°C) and humidity_needs (%), kept in sync on save
+    temperature_min = models.FloatField(null=True, blank=True, editable=False)
+    temperature_max = models.FloatField(null=True, blank=True, editable=False)
+    humidity_min = models.FloatField(null=True, blank=True, editable=False)
+    humidity_max = models.FloatField(null=True, blank=True, editable=False)
     
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
@@ -131,11 +244,147 @@ class Plant(models.Model):
     def __str__(self):
         return f"{self.name} ({self.get_category_display()})"
 
+    CLIMATE_SOURCES = {
+        'ideal_temperature': (parse_temperature, 'temperature_min', 'temperature_max'),
+        'humidity_needs': (parse_humidity, 'humidity_min', 'humidity_max'),
+    }
+
     class Meta:
         ordering = ['name']
+        indexes = [
+            # Keyset pagination cursor for the catalogue list
+            models.Index(fields=['name', 'id'], name='plant_name_id_idx'),
+            # Catalogue filters
+            models.Index(fields=['category', 'name', 'id'], name='plant_category_name_idx'),
+            models.Index(fields=['soil_type'], name='plant_soil_type_idx'),
+            models.Index(fields=['sunlight'], name='plant_sunlight_idx'),
+            models.Index(fields=['watering_schedule'], name='plant_watering_idx'),
+            # Climate range overlap: min <= x_max AND max >= x_min
+            models.Index(fields=['temperature_min', 'temperature_max'], name='plant_temperature_idx'),
+            models.Index(fields=['humidity_min', 'humidity_max'], name='plant_humidity_idx'),
+        ]
+
+class PlantCompanion(models.Model):
+    """One edge of the companion graph, built from Plant.companion_plants"""
+    plant = models.ForeignKey(Plant, on_delete=models.CASCADE, related_name='companion_links')
+    # Resolved catalogue plant, or null while no plant with that name exists
+    companion = models.ForeignKey(Plant, on_delete=models.SET_NULL, null=True, blank=True, related_name='companion_of')
+    companion_name = models.CharField(max_length=100, db_index=True)  # normalized, see api.names.normalize_name
+
+    def __str__(self):
+        return f"{self.plant_id} -> {self.companion_name}"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['plant', 'companion_name'], name='unique_plant_companion'),
+        ]
+
+class PlantPest(models.Model):
+    """Inverted pest index: one row per (plant, pest) from Plant.pests"""
+    plant = models.ForeignKey(Plant, on_delete=models.CASCADE, related_name='pest_links')
+    pest = models.CharField(max_length=100)  # normalized, e.g. "aphid"
+    plant_key = models.CharField(max_length=100)  # normalized plant name, joins TrackedPlant.plant_key
+
+    def __str__(self):
+        return f"{self.pest} -> {self.plant_id}"
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(fields=['plant', 'pest'], name='unique_plant_pest'),
+        ]
+        indexes = [
+            models.Index(fields=['pest', 'plant_key'], name='plantpest_pest_key_idx'),
+            models.Index(fields=['plant_key', 'pest'], name='plantpest_key_pest_idx'),
+        ]
+
+class PestAlert(models.Model):
+    """A pest outbreak alert delivered to a user's feed"""
+    user = models.ForeignKey('api.User', on_delete=models.CASCADE, related_name='pest_alerts')
+    pest = models.CharField(max_length=100)
+    message = models.TextField(blank=True)
+    read = models.BooleanField(default=False)
+    notified_at = models.DateTimeField(null=True, blank=True)  # Set once queued in a notification digest
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.pest} alert for user {self.user_id}"
+
+    class Meta:
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', '-created_at'], name='pestalert_user_created_idx'),
+            models.Index(fields=['id'], condition=models.Q(notified_at__isnull=True), name='pestalert_unnotified_idx'),
+        ]
+
+class Notification(models.Model):
+    """Outbox row for one outgoing message, delivered by the dispatch_notifications worker"""
+    KIND_CHOICES = [
+        ('maintenance', 'Maintenance'),
+        ('pest', 'Pest'),
+        ('disease', 'Disease'),
+        ('community', 'Community'),
+    ]
+    STATUS_CHOICES = [
+        ('pending', 'Pending'),
+        ('sending', 'Sending'),
+        ('sent', 'Sent'),
+        ('failed', 'Failed'),
+    ]
+
+    user = models.ForeignKey('api.User', on_delete=models.CASCADE, related_name='notifications')
+    kind = models.CharField(max_length=20, choices=KIND_CHOICES)
+    subject = models.CharField(max_length=200)
+    body = models.TextField()
+    # Identifies the digest this row was built for, so enqueueing twice never sends twice
+    dedupe_key = models.CharField(max_length=200, unique=True)
+    status = models.CharField(max_length=10, choices=STATUS_CHOICES, default='pending')
+    attempts = models.PositiveSmallIntegerField(default=0)
+    # When pending: earliest send time (backoff/rate limit). When sending: end of the worker's lease.
+    next_attempt_at = models.DateTimeField(default=timezone.now)
+    last_error = models.TextField(blank=True)
+    sent_at = models.DateTimeField(null=True, blank=True)
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    def __str__(self):
+        return f"{self.kind} notification for user {self.user_id} ({self.status})"
+
+    class Meta:
+        indexes = [
+            # Work queue: only open rows, in the order workers claim them
+            models.Index(fields=['next_attempt_at'], condition=models.Q(status__in=['pending', 'sending']),
+                         name='notification_queue_idx'),
+            # Per-user rate limit window
+            models.Index(fields=['user', 'sent_at'], name='notification_user_sent_idx'),
+        ]
+
+class LoadedStateMixin:
+    """
+    Remembers LOADED_FIELDS as last read from or written to the database, so the dashboard
+    signals can turn a save into a delta (see api.signals). loaded_state is None when unknown.
+    """
+    LOADED_FIELDS = ()
+    loaded_state = None
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance.remember_loaded_state()
+        return instance
+
+    def refresh_from_db(self, *args, **kwargs):
+        super().refresh_from_db(*args, **kwargs)
+        self.remember_loaded_state()
+
+    def remember_loaded_state(self, fields=None):
+        if self.get_deferred_fields() & set(self.LOADED_FIELDS):
+            self.loaded_state = None
+        elif fields is None or self.loaded_state is None:
+            self.loaded_state = {name: getattr(self, name) for name in self.LOADED_FIELDS}
+        else:
+            self.loaded_state.update((name, getattr(self, name)) for name in fields)
 
 # New models for plant tracking
-class TrackedPlant(models.Model):
+class TrackedPlant(LoadedStateMixin, models.Model):
     user = models.ForeignKey('api.User', on_delete=models.CASCADE, related_name='tracked_plants')
     name = models.CharField(max_length=100)
     type = models.CharField(max_length=100, blank=True, null=True)
@@ -145,13 +394,32 @@ class TrackedPlant(models.Model):
     notes = models.TextField(blank=True, null=True)
     health_status = models.CharField(max_length=20, default='Good')  # Excellent, Good, Fair, Poor
     growth_stage = models.CharField(max_length=20, default='Seedling')  # Seedling, Vegetative, Flowering, Fruiting, Mature
+    # Normalized type (or name) used to join against catalogue-derived indexes such as PlantPest
+    plant_key = models.CharField(max_length=100, blank=True, db_index=True, editable=False)
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    LOADED_FIELDS = ('name', 'health_status')
+
     def __str__(self):
         return f"{self.name} - {self.user.username}"
 
-class PlantReminder(models.Model):
+    def save(self, *args, **kwargs):
+        self.plant_key = normalize_name(self.type or self.name)
+        update_fields = kwargs.get('update_fields')
+        if update_fields is not None and {'type', 'name'} & set(update_fields):
+            kwargs['update_fields'] = set(update_fields) | {'plant_key'}
+        super().save(*args, **kwargs)
+
+    class Meta:
+        indexes = [
+            # Dashboard breakdown of a user's plants by health
+            models.Index(fields=['user', 'health_status'], name='tracked_user_health_idx'),
+            # Delta sync: a user's rows changed since a point in time
+            models.Index(fields=['user', 'updated_at'], name='tracked_user_updated_idx'),
+        ]
+
+class PlantReminder(LoadedStateMixin, models.Model):
     REMINDER_TYPES = [
         ('Watering', 'Watering'),
         ('Fertilizing', 'Fertilizing'),
@@ -168,11 +436,92 @@ class PlantReminder(models.Model):
     due_date = models.DateField()
     notes = models.TextField(blank=True, null=True)
     completed = models.BooleanField(default=False)
+    # Recurrence rule: the scheduler materializes a copy every N days after due_date
+    repeat_every_days = models.PositiveIntegerField(null=True, blank=True)
+    generated = models.BooleanField(default=False)  # Created by the schedule_reminders command
     created_at = models.DateTimeField(auto_now_add=True)
     updated_at = models.DateTimeField(auto_now=True)
 
+    LOADED_FIELDS = ('tracked_plant_id', 'type', 'due_date', 'completed')
+
     def __str__(self):
         return f"{self.type} for {self.tracked_plant.name} - {self.due_date}"
 
     class Meta:
         ordering = ['due_date']
+        indexes = [
+            # Reminder list for a user, sorted by due date
+            models.Index(fields=['user', 'due_date'], name='reminder_user_due_idx'),
+            # Upcoming/overdue reminders only ever look at open ones
+            models.Index(fields=['user', 'due_date'], condition=models.Q(completed=False),
+                         name='reminder_user_open_due_idx'),
+            models.Index(fields=['user', 'updated_at'], name='reminder_user_updated_idx'),
+        ]
+        constraints = [
+            # Makes scheduler runs idempotent: re-running only hits ON CONFLICT DO NOTHING
+            models.UniqueConstraint(fields=['tracked_plant', 'type', 'due_date'], condition=models.Q(generated=True),
+                                    name='unique_generated_reminder'),
+        ]
+
+class DashboardSummary(models.Model):
+    """Per-user dashboard numbers, kept current by signals so the dashboard is one primary-key read"""
+    user = models.OneToOneField('api.User', on_delete=models.CASCADE, primary_key=True,
+                                related_name='dashboard_summary')
+    plants_total = models.PositiveIntegerField(default=0)
+    health_counts = models.JSONField(default=dict)  # {"Good": 3, "Poor": 1}
+    open_reminders = models.PositiveIntegerField(default=0)
+    # Open reminders per type and due date, {"Watering": {"2025-05-01": 2}}; overdue/next-due are derived at read time
+    reminder_calendar = models.JSONField(default=dict)
+    upcoming = models.JSONField(default=list)  # Earliest open reminders due on or after the day it was written
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"Dashboard summary for user {self.user_id}"
+
+class SyncTombstone(models.Model):
+    """Marks a deleted TrackedPlant or PlantReminder so delta sync can tell clients to drop it"""
+    MODEL_CHOICES = [
+        ('tracked_plant', 'Tracked plant'),
+        ('reminder', 'Reminder'),
+    ]
+
+    user = models.ForeignKey('api.User', on_delete=models.CASCADE, related_name='sync_tombstones')
+    model = models.CharField(max_length=20, choices=MODEL_CHOICES)
+    object_id = models.BigIntegerField()
+    deleted_at = models.DateTimeField(default=timezone.now)
+
+    def __str__(self):
+        return f"Deleted {self.model} {self.object_id}"
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['user', 'deleted_at'], name='tombstone_user_deleted_idx'),
+        ]
+
+class GrowthLog(models.Model):
+    """
+    Append-only growth/health observations for a tracked plant.
+
+    On Postgres the table is range-partitioned by month on recorded_at with a BRIN index on it
+    (see migration 0016 and the growth_partitions command); rows are never updated.
+    """
+    tracked_plant = models.ForeignKey(TrackedPlant, on_delete=models.CASCADE, related_name='growth_logs',
+                                      db_index=False)
+    user = models.ForeignKey('api.User', on_delete=models.CASCADE, related_name='growth_logs', db_index=False)
+    recorded_at = models.DateTimeField(default=timezone.now)
+    height_cm = models.FloatField(null=True, blank=True)
+    health_status = models.CharField(max_length=20, blank=True)  # Excellent, Good, Fair, Poor
+    growth_stage = models.CharField(max_length=20, blank=True)
+    pests_observed = models.JSONField(default=list, blank=True)
+    notes = models.TextField(blank=True)
+
+    def __str__(self):
+        return f"Growth log for plant {self.tracked_plant_id} at {self.recorded_at}"
+
+    class Meta:
+        indexes = [
+            # One plant's history over a time range
+            models.Index(fields=['tracked_plant', 'recorded_at'], name='growthlog_plant_time_idx'),
+            # Also serves the cascade when a user is deleted
+            models.Index(fields=['user', 'recorded_at'], name='growthlog_user_time_idx'),
+        ]
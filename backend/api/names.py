@@ -0,0 +1,28 @@
+import re
+
+SPACES_RE = re.compile(r'\s+')
+# Width of the columns normalized names are stored in (PlantCompanion.companion_name, PlantPest.pest,
+# plant_key); free text longer than this is cut, the same way everywhere, so names still compare equal
+MAX_NAME_LENGTH = 100
+
+
+def normalize_name(name):
+    """'  Marigolds ' -> 'marigold', so free-text names (companions, pests, tracked plant types) compare equal"""
+    name = SPACES_RE.sub(' ', str(name or '')).strip().lower()
+    if len(name) <= 3:
+        return name
+    if name.endswith('ies'):
+        name = name[:-3] + 'y'
+    elif name.endswith('oes'):
+        name = name[:-2]
+    elif name.endswith('s') and not name.endswith('ss'):
+        name = name[:-1]
+    return name[:MAX_NAME_LENGTH].rstrip()
+
+
+def name_variants(name):
+    """Spellings a catalogue name may have for a normalized name: 'berry' -> berry, berrys, berries"""
+    variants = {name, f'{name}s', f'{name}es'}
+    if name.endswith('y'):
+        variants.add(name[:-1] + 'ies')
+    return variants
@@ -0,0 +1,328 @@
+import hashlib
+import logging
+import random
+import sys
+import time
+from collections import Counter
+from datetime import timedelta
+from itertools import groupby
+
+from django.conf import settings
+from django.core.mail import EmailMessage, get_connection
+from django.db import transaction
+from django.db.models import Count
+from django.utils import timezone
+from django.utils.module_loading import import_string
+
+from .models import Notification, PestAlert, PlantReminder, TrackedPlant, UserProfile
+
+logger = logging.getLogger(__name__)
+
+# Notification.kind -> UserProfile opt-in flag
+PREFERENCE_FIELDS = {
+    'maintenance': 'maintenance_reminders',
+    'pest': 'pest_alerts',
+    'disease': 'disease_alerts',
+    'community': 'community_notifications',
+}
+
+DIGEST_ITEMS = 20
+MAX_ATTEMPTS = 5
+RETRY_BASE = timedelta(minutes=1)
+RETRY_MAX = timedelta(hours=6)
+# A claimed row goes back on the queue if its worker hasn't reported back by then. The lease is
+# renewed row by row just before sending, so a slow (rate-limited) batch never outlives it
+LEASE = timedelta(minutes=5)
+RESULT_FIELDS = ['status', 'attempts', 'next_attempt_at', 'last_error', 'sent_at']
+
+
+class PermanentError(Exception):
+    """Raised by a transport when retrying can never succeed, e.g. the user has no address"""
+
+
+class BaseTransport:
+    """Delivers notifications; open()/close() bracket each claimed batch"""
+
+    def open(self):
+        pass
+
+    def close(self):
+        pass
+
+    def send(self, notification):
+        raise NotImplementedError
+
+
+class ConsoleTransport(BaseTransport):
+    def __init__(self, stream=None):
+        self.stream = stream or sys.stdout
+
+    def send(self, notification):
+        self.stream.write(f"To: {notification.user.email or notification.user.username}\n"
+                          f"Subject: {notification.subject}\n\n{notification.body}\n\n")
+
+
+class FileTransport(ConsoleTransport):
+    def __init__(self, path=None):
+        self.path = path or getattr(settings, 'NOTIFICATION_FILE_PATH', 'notifications.log')
+
+    def open(self):
+        self.stream = open(self.path, 'a', encoding='utf-8')
+
+    def close(self):
+        self.stream.close()
+
+
+class SMTPTransport(BaseTransport):
+    """Sends through one SMTP connection per batch; defaults to a local test server"""
+
+    def __init__(self, host=None, port=None):
+        self.connection = get_connection(
+            'django.core.mail.backends.smtp.EmailBackend',
+            host=host or getattr(settings, 'NOTIFICATION_SMTP_HOST', 'localhost'),
+            port=port or getattr(settings, 'NOTIFICATION_SMTP_PORT', 1025),
+        )
+
+    def open(self):
+        self.connection.open()
+
+    def close(self):
+        self.connection.close()
+
+    def send(self, notification):
+        if not notification.user.email:
+            raise PermanentError('user has no email address')
+        EmailMessage(notification.subject, notification.body, to=[notification.user.email],
+                     connection=self.connection).send()
+
+
+TRANSPORTS = {
+    'console': ConsoleTransport,
+    'file': FileTransport,
+    'smtp': SMTPTransport,
+}
+
+
+def get_transport(name=None):
+    """A transport by short name or dotted path; defaults to settings.NOTIFICATION_TRANSPORT"""
+    name = name or getattr(settings, 'NOTIFICATION_TRANSPORT', 'console')
+    transport_class = TRANSPORTS.get(name) or import_string(name)
+    return transport_class()
+
+
+def get_rate_limit():
+    """(max notifications, per window) for a single user"""
+    count, seconds = getattr(settings, 'NOTIFICATION_RATE_LIMIT', (5, 3600))
+    return count, timedelta(seconds=seconds)
+
+
+# Enqueueing
+
+def write_outbox(notifications, batch_size=2000):
+    """Insert outbox rows whose dedupe_key isn't queued yet; returns how many were new"""
+    notifications = list(notifications)
+    existing = set(Notification.objects.filter(dedupe_key__in=[n.dedupe_key for n in notifications])
+                   .values_list('dedupe_key', flat=True))
+    new = [n for n in notifications if n.dedupe_key not in existing]
+    # ignore_conflicts still covers a concurrent worker inserting the same key in between
+    Notification.objects.bulk_create(new, batch_size=batch_size, ignore_conflicts=True)
+    return len(new)
+
+
+def digest_body(intro, lines):
+    shown = lines[:DIGEST_ITEMS]
+    body = '\n'.join([intro, ''] + [f'- {line}' for line in shown])
+    if len(lines) > len(shown):
+        body += f'\n...and {len(lines) - len(shown)} more'
+    return body
+
+
+def enqueue(kind, user_ids, subject, body, dedupe_key):
+    """Queue the same message for every listed user that opted into this kind of notification"""
+    opted_in = UserProfile.objects.filter(user_id__in=user_ids, **{PREFERENCE_FIELDS[kind]: True})
+    return write_outbox(
+        Notification(user_id=user_id, kind=kind, subject=subject, body=body, dedupe_key=f'{dedupe_key}:{user_id}')
+        for user_id in opted_in.values_list('user_id', flat=True)
+    )
+
+
+def enqueue_maintenance_digests(today, chunk_size=2000):
+    """One digest per opted-in user per day listing all of their open reminders due by today"""
+    reminders = (
+        PlantReminder.objects
+        .filter(completed=False, due_date__lte=today, user__userprofile__maintenance_reminders=True)
+        .order_by('user_id', 'due_date', 'id')
+        .values_list('user_id', 'type', 'due_date', 'tracked_plant__name')
+    )
+    batch = []
+    queued = 0
+    for user_id, rows in groupby(reminders.iterator(chunk_size=chunk_size), key=lambda row: row[0]):
+        lines = [f'{name}: {reminder_type} ({"due today" if due == today else f"overdue since {due}"})'
+                 for _, reminder_type, due, name in rows]
+        batch.append(Notification(
+            user_id=user_id, kind='maintenance', dedupe_key=f'maintenance:{today}:{user_id}',
+            subject=f'{len(lines)} plant care task{"s" if len(lines) != 1 else ""} due today',
+            body=digest_body('These reminders need your attention:', lines),
+        ))
+        if len(batch) >= chunk_size:
+            queued += write_outbox(batch)
+            batch = []
+    return queued + write_outbox(batch)
+
+
+def enqueue_pest_alerts(chunk_size=2000):
+    """Fold each user's new PestAlert rows into one notification and mark them notified"""
+    queued = 0
+    while True:
+        with transaction.atomic():
+            alerts = list(
+                PestAlert.objects.select_for_update(skip_locked=True, of=('self',))
+                .filter(notified_at__isnull=True).order_by('id')
+                .values_list('id', 'user_id', 'pest', 'message', 'user__userprofile__pest_alerts')[:chunk_size]
+            )
+            if not alerts:
+                return queued
+            batch = []
+            for user_id, rows in groupby(sorted(alerts, key=lambda row: (row[1], row[0])), key=lambda row: row[1]):
+                rows = list(rows)
+                if not rows[0][4]:
+                    continue  # Opted out since the alert was raised; still marked notified below
+                lines = [f'{pest}: {message}' if message else pest for _, _, pest, message, _ in rows]
+                batch.append(Notification(
+                    user_id=user_id, kind='pest', dedupe_key=f'pest:{rows[0][0]}:{user_id}',
+                    subject='Pest outbreak near you' if len(rows) == 1 else f'{len(rows)} pest outbreaks near you',
+                    body=digest_body('Plants you grow are susceptible to:', lines),
+                ))
+            queued += write_outbox(batch)
+            PestAlert.objects.filter(id__in=[row[0] for row in alerts]).update(notified_at=timezone.now())
+
+
+def enqueue_disease_alerts(chunk_size=2000):
+    """Notify opted-in users about tracked plants in poor health, once per distinct set of plants"""
+    plants = (
+        TrackedPlant.objects
+        .filter(health_status='Poor', user__userprofile__disease_alerts=True)
+        .order_by('user_id', 'id')
+        .values_list('user_id', 'id', 'name')
+    )
+    batch = []
+    queued = 0
+    for user_id, rows in groupby(plants.iterator(chunk_size=chunk_size), key=lambda row: row[0]):
+        rows = list(rows)
+        fingerprint = hashlib.md5(','.join(str(row[1]) for row in rows).encode()).hexdigest()
+        batch.append(Notification(
+            user_id=user_id, kind='disease', dedupe_key=f'disease:{fingerprint}:{user_id}',
+            subject=f'{len(rows)} of your plants may be diseased',
+            body=digest_body('These plants are in poor health:', [name for _, _, name in rows]),
+        ))
+        if len(batch) >= chunk_size:
+            queued += write_outbox(batch)
+            batch = []
+    return queued + write_outbox(batch)
+
+
+def enqueue_all(today=None):
+    today = today or timezone.localdate()
+    return {
+        'maintenance': enqueue_maintenance_digests(today),
+        'pest': enqueue_pest_alerts(),
+        'disease': enqueue_disease_alerts(),
+    }
+
+
+# Dispatching
+
+def claim(batch_size):
+    """
+    Lease up to batch_size due notifications to this worker.
+
+    SELECT ... FOR UPDATE SKIP LOCKED lets concurrent workers claim disjoint rows without
+    waiting on each other; the lease is written before the lock is released, so no other
+    worker picks the rows up until it expires.
+    """
+    now = timezone.now()
+    with transaction.atomic():
+        ids = list(
+            Notification.objects.select_for_update(skip_locked=True)
+            .filter(status__in=['pending', 'sending'], next_attempt_at__lte=now)
+            .order_by('next_attempt_at').values_list('id', flat=True)[:batch_size]
+        )
+        Notification.objects.filter(id__in=ids).update(status='sending', next_attempt_at=now + LEASE)
+    return list(Notification.objects.filter(id__in=ids).select_related('user').order_by('id'))
+
+
+def renew_lease(notification):
+    """
+    Extend this worker's lease on a claimed row right before sending it. The stored lease end
+    doubles as the claim token: if it changed, the lease ran out and another worker claimed
+    the row, so this worker must not send it.
+    """
+    lease_end = timezone.now() + LEASE
+    renewed = Notification.objects.filter(
+        id=notification.id, status='sending', next_attempt_at=notification.next_attempt_at,
+    ).update(next_attempt_at=lease_end)
+    notification.next_attempt_at = lease_end
+    return bool(renewed)
+
+
+def retry_delay(attempts):
+    delay = min(RETRY_BASE * 2 ** (attempts - 1), RETRY_MAX)
+    return delay * random.uniform(1.0, 1.25)
+
+
+def dispatch_batch(transport, batch_size=100, rate=None):
+    """Claim and send one batch; returns counts of sent, retried, failed and rate-limited rows"""
+    notifications = claim(batch_size)
+    results = Counter()
+    if not notifications:
+        return results
+
+    limit, window = get_rate_limit()
+    now = timezone.now()
+    sent_recently = Counter(dict(
+        Notification.objects.filter(user_id__in={n.user_id for n in notifications}, sent_at__gte=now - window)
+        .values('user_id').annotate(sent=Count('id')).values_list('user_id', 'sent')
+    ))
+
+    interval = 1.0 / rate if rate else 0.0
+    last_send = 0.0
+    transport.open()
+    try:
+        for notification in notifications:
+            if sent_recently[notification.user_id] >= limit:
+                notification.status = 'pending'
+                notification.next_attempt_at = now + window
+                notification.save(update_fields=RESULT_FIELDS)
+                results['rate_limited'] += 1
+                continue
+            if not renew_lease(notification):
+                results['lease_lost'] += 1
+                logger.warning('Lease on notification %s expired before it was sent; skipped', notification.id)
+                continue
+            wait = last_send + interval - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+            last_send = time.monotonic()
+            try:
+                transport.send(notification)
+            except Exception as exc:
+                notification.attempts += 1
+                notification.last_error = str(exc)[:1000]
+                if isinstance(exc, PermanentError) or notification.attempts >= MAX_ATTEMPTS:
+                    notification.status = 'failed'
+                    results['failed'] += 1
+                    logger.warning('Giving up on notification %s: %s', notification.id, exc)
+                else:
+                    notification.status = 'pending'
+                    notification.next_attempt_at = timezone.now() + retry_delay(notification.attempts)
+                    results['retried'] += 1
+            else:
+                notification.status = 'sent'
+                notification.sent_at = timezone.now()
+                sent_recently[notification.user_id] += 1
+                results['sent'] += 1
+            # Recorded at once: if the worker dies later in the batch, this row is not sent again
+            notification.save(update_fields=RESULT_FIELDS)
+    finally:
+        transport.close()
+    return results
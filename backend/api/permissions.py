@@ -1,5 +1,7 @@
 from rest_framework.permissions import BasePermission
 
+# request.user comes from the cached user row (api.authentication), so these checks run no query
+
 class IsAdmin(BasePermission):
     """Only Admins can access this API"""
     def has_permission(self, request, view):
@@ -19,3 +21,8 @@ class IsHomeowner(BasePermission):
     """Only Homeowners can access this API"""
     def has_permission(self, request, view):
         return request.user.is_authenticated and request.user.role == 'Homeowner'
+
+class IsSystemAdmin(BasePermission):
+    """Only System Admins can access this API"""
+    def has_permission(self, request, view):
+        return request.user.is_authenticated and request.user.role == 'System Admin'
@@ -0,0 +1,79 @@
+from django.db import connection, transaction
+from django.utils import timezone
+
+from .models import PestAlert, Plant, PlantPest, TrackedPlant, UserProfile
+from .names import normalize_name
+
+
+def plant_pests(plant):
+    pests = {normalize_name(pest) for pest in plant.pests or []}
+    pests.discard('')
+    return pests
+
+
+@transaction.atomic
+def sync_plant(plant):
+    """Rewrite one plant's rows in the inverted index after it is saved"""
+    PlantPest.objects.filter(plant=plant).delete()
+    plant_key = normalize_name(plant.name)
+    PlantPest.objects.bulk_create(
+        PlantPest(plant=plant, pest=pest, plant_key=plant_key) for pest in plant_pests(plant)
+    )
+
+
+def rebuild_index(batch_size=2000):
+    total = 0
+    with transaction.atomic():
+        PlantPest.objects.all().delete()
+        batch = []
+        for plant in Plant.objects.order_by('id').only('id', 'name', 'pests').iterator(chunk_size=batch_size):
+            plant_key = normalize_name(plant.name)
+            batch.extend(PlantPest(plant_id=plant.id, pest=pest, plant_key=plant_key) for pest in plant_pests(plant))
+            if len(batch) >= batch_size:
+                PlantPest.objects.bulk_create(batch)
+                total += len(batch)
+                batch = []
+        PlantPest.objects.bulk_create(batch)
+        total += len(batch)
+    return total
+
+
+def susceptibility(user, pest=None):
+    """{pest: [{'id', 'name'}, ...]} for the user's tracked plants, from two indexed queries"""
+    tracked = list(TrackedPlant.objects.filter(user=user).exclude(plant_key='').values('id', 'name', 'plant_key'))
+    by_key = {}
+    for tp in tracked:
+        by_key.setdefault(tp['plant_key'], []).append({'id': tp['id'], 'name': tp['name']})
+    if not by_key:
+        return {}
+
+    links = PlantPest.objects.filter(plant_key__in=by_key)
+    if pest:
+        links = links.filter(pest=normalize_name(pest))
+    result = {}
+    for pest_name, plant_key in links.values_list('pest', 'plant_key').distinct():
+        result.setdefault(pest_name, []).extend(by_key[plant_key])
+    return result
+
+
+def fan_out_outbreak(pest, message=''):
+    """
+    Create one PestAlert for every opted-in user growing a plant susceptible to pest.
+
+    Runs as a single INSERT ... SELECT so the database joins the pest index, tracked plants
+    and profiles itself; nothing is loaded into Python no matter how many users it reaches.
+    """
+    qn = connection.ops.quote_name
+    alert = PestAlert._meta
+    sql = (
+        f"INSERT INTO {qn(alert.db_table)} ({qn('user_id')}, {qn('pest')}, {qn('message')}, {qn('read')}, {qn('created_at')}) "
+        f"SELECT DISTINCT tp.{qn('user_id')}, %s, %s, %s, %s "
+        f"FROM {qn(TrackedPlant._meta.db_table)} tp "
+        f"JOIN {qn(PlantPest._meta.db_table)} pp ON pp.{qn('plant_key')} = tp.{qn('plant_key')} "
+        f"JOIN {qn(UserProfile._meta.db_table)} up ON up.{qn('user_id')} = tp.{qn('user_id')} "
+        f"WHERE pp.{qn('pest')} = %s AND up.{qn('pest_alerts')} = %s"
+    )
+    params = [normalize_name(pest), message, False, timezone.now(), normalize_name(pest), True]
+    with transaction.atomic(), connection.cursor() as cursor:
+        cursor.execute(sql, params)
+        return cursor.rowcount
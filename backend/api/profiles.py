@@ -0,0 +1,42 @@
+from django.conf import settings
+from django.core.cache import cache
+
+from .models import ROLE_PROFILES, UserProfile
+from .serializers import UserProfileSerializer
+
+CACHE_KEY = 'profile:{user_id}'
+# Profile edits invalidate the entry in the saving worker only, unless the cache is shared
+CACHE_TTL = 60 * 60 if settings.CACHE_SHARED else 60
+
+
+def create_profile(user):
+    profile, _ = UserProfile.objects.get_or_create(user=user, defaults={'full_name': user.username})
+    return profile
+
+
+def load_profile(user):
+    """The user's profile joined to the extension table of their role, in one query"""
+    profiles = UserProfile.objects.filter(user=user)
+    model = ROLE_PROFILES.get(user.role)
+    if model is not None:
+        profiles = profiles.select_related(model._meta.model_name)
+    profile = profiles.first()
+    if profile is None:
+        # Accounts created before profiles were made on registration
+        profile = create_profile(user)
+    profile.user = user
+    return profile
+
+
+def get_profile_data(user):
+    """Serialized profile, cached per user; a warm read runs no queries"""
+    key = CACHE_KEY.format(user_id=user.id)
+    data = cache.get(key)
+    if data is None:
+        data = UserProfileSerializer(load_profile(user)).data
+        cache.set(key, data, CACHE_TTL)
+    return data
+
+
+def invalidate_profile(user_id):
+    cache.delete(CACHE_KEY.format(user_id=user_id))
@@ -0,0 +1,60 @@
+import functools
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+
+class QueryBudgetExceeded(AssertionError):
+    pass
+
+
+def _check(label, max_queries, captured):
+    count = len(captured.captured_queries)
+    if count > max_queries:
+        statements = '\n'.join(query['sql'] for query in captured.captured_queries)
+        raise QueryBudgetExceeded(
+            f'{label} ran {count} queries, budget is {max_queries}:\n{statements}'
+        )
+
+
+@contextmanager
+def assert_max_queries(max_queries, label='Block'):
+    """Test helper: fail if the block runs more than max_queries SQL queries"""
+    with CaptureQueriesContext(connection) as captured:
+        yield captured
+    _check(label, max_queries, captured)
+
+
+def _wrap(func, max_queries, label):
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        if not getattr(settings, 'QUERY_BUDGET_ENFORCE', False):
+            return func(*args, **kwargs)
+        with assert_max_queries(max_queries, label):
+            return func(*args, **kwargs)
+
+    wrapper.query_budget = max_queries
+    return wrapper
+
+
+def query_budget(max_queries=None, **per_method):
+    """
+    Declare how many queries a view handler may run (authentication not included).
+
+        @query_budget(1)                      # function view or single method
+        @query_budget(list=1, retrieve=1)     # viewset class, per action
+
+    Enforced only when settings.QUERY_BUDGET_ENFORCE is true (opt-in; api.tests.test_query_budgets
+    turns it on and also checks each endpoint with assert_max_queries).
+    """
+    def decorator(target):
+        if isinstance(target, type):
+            for name, budget in per_method.items():
+                method = getattr(target, name)
+                setattr(target, name, _wrap(method, budget, f'{target.__name__}.{name}'))
+            return target
+        return _wrap(target, max_queries, target.__qualname__)
+
+    return decorator
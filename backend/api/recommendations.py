@@ -0,0 +1,178 @@
+import threading
+
+import numpy as np
+from django.conf import settings
+from django.core.cache import cache
+
+from .catalogue import get_catalogue_version
+from .models import Plant
+
+CATEGORIES = [value for value, _ in Plant.CATEGORY_CHOICES]
+SOILS = [value for value, _ in Plant.SOIL_TYPES]
+WATERING = [value for value, _ in Plant.WATERING_CHOICES]
+
+# Profile values as entered on the profile page -> Plant choice values
+PLANT_TYPE_TO_CATEGORY = {'flowers': 'flower', 'vegetables': 'vegetable', 'fruits': 'fruit'}
+
+# Profile fields that change the result; update_user_profile drops the cached top-K when one changes
+PROFILE_FIELDS = (
+    'preferred_plant_types', 'soil_type', 'climate_zone', 'skill_level', 'watering_frequency',
+    'average_temperature', 'average_humidity',
+)
+
+WEIGHTS = {
+    'category': 3.0,
+    'soil': 2.0,
+    'watering': 1.0,
+    'easy_care': 1.0,
+    'climate_zone': 2.0,
+    'temperature': 2.0,
+    'humidity': 1.0,
+}
+
+TOP_K = 50
+CACHE_KEY = 'recommendations:{user_id}'
+# Profile edits invalidate the entry in the saving worker only, unless the cache is shared
+CACHE_TTL = 60 * 60 * 24 if settings.CACHE_SHARED else 60
+
+# One-hot blocks of the plant feature matrix, in column order: (block, Plant column, values)
+BLOCKS = [
+    ('category', 'category', CATEGORIES),
+    ('soil', 'soil_type', SOILS),
+    ('watering', 'watering_schedule', WATERING),
+]
+
+
+class CatalogueMatrix:
+    """The plant catalogue encoded as NumPy arrays, one row per plant"""
+
+    def __init__(self, rows):
+        n = len(rows)
+        self.ids = np.fromiter((row['id'] for row in rows), dtype=np.int64, count=n)
+        width = sum(len(values) for _, _, values in BLOCKS) + 1
+        self.features = np.zeros((n, width), dtype=np.float32)
+
+        offset = 0
+        self.offsets = {}
+        for block, column, values in BLOCKS:
+            self.offsets[block] = offset
+            index = {value: i for i, value in enumerate(values)}
+            for r, row in enumerate(rows):
+                i = index.get(row[column])
+                if i is not None:
+                    self.features[r, offset + i] = 1.0
+            offset += len(values)
+
+        # Easy care: weekly watering, no feeding, good disease resistance
+        self.offsets['easy_care'] = offset
+        self.features[:, offset] = np.fromiter(
+            ((row['watering_schedule'] == 'weekly') + (not row['fertilization_needs'])
+             + ((row['disease_resistance'] or '').lower() == 'high') for row in rows),
+            dtype=np.float32, count=n,
+        ) / 3.0
+
+        self.temperature = self._bounds(rows, 'temperature_min', 'temperature_max')
+        self.humidity = self._bounds(rows, 'humidity_min', 'humidity_max')
+        self.climate_text = np.array([(row['climate_suitability'] or '').lower() for row in rows], dtype=object)
+        self._zone_masks = {}
+
+    def _bounds(self, rows, low, high):
+        values = np.array([(row[low], row[high]) for row in rows], dtype=np.float64).reshape(-1, 2)
+        return values[:, 0], values[:, 1]
+
+    def zone_mask(self, zone):
+        zone = zone.lower()
+        if zone not in self._zone_masks:
+            self._zone_masks[zone] = np.fromiter(
+                (zone in text for text in self.climate_text), dtype=np.float32, count=len(self.climate_text))
+        return self._zone_masks[zone]
+
+    def profile_vector(self, profile):
+        """Encode the profile as weights over the one-hot feature columns"""
+        vector = np.zeros(self.features.shape[1], dtype=np.float32)
+        wanted = {PLANT_TYPE_TO_CATEGORY.get(str(t).lower()) for t in profile.preferred_plant_types or []}
+        for i, category in enumerate(CATEGORIES):
+            if category in wanted:
+                vector[self.offsets['category'] + i] = WEIGHTS['category']
+        soil = (profile.soil_type or '').lower()
+        if soil in SOILS:
+            vector[self.offsets['soil'] + SOILS.index(soil)] = WEIGHTS['soil']
+        watering = (profile.watering_frequency or '').lower()
+        if watering in WATERING:
+            vector[self.offsets['watering'] + WATERING.index(watering)] = WEIGHTS['watering']
+        if (profile.skill_level or '').lower() == 'beginner':
+            vector[self.offsets['easy_care']] = WEIGHTS['easy_care']
+        return vector
+
+    def score(self, profile):
+        scores = self.features @ self.profile_vector(profile)
+        if profile.climate_zone:
+            scores += WEIGHTS['climate_zone'] * self.zone_mask(profile.climate_zone)
+        scores += WEIGHTS['temperature'] * overlap_fraction(
+            self.temperature, profile.temperature_min, profile.temperature_max)
+        scores += WEIGHTS['humidity'] * overlap_fraction(
+            self.humidity, profile.humidity_min, profile.humidity_max)
+        return scores
+
+    def top_k(self, profile, k=TOP_K):
+        if not len(self.ids):
+            return []
+        scores = self.score(profile)
+        k = min(k, len(scores))
+        best = np.argpartition(-scores, k - 1)[:k]
+        best = best[np.lexsort((self.ids[best], -scores[best]))]
+        return [(int(self.ids[i]), round(float(scores[i]), 3)) for i in best]
+
+
+def overlap_fraction(bounds, low, high):
+    """
+    Share of the profile's [low, high] range covered by each plant's range, 0 where unknown.
+    A single value (low == high, e.g. "25°C") scores 1 where the plant's range contains it.
+    """
+    if low is None or high is None:
+        return 0.0
+    plant_low, plant_high = bounds
+    if high <= low:
+        return ((plant_low <= low) & (low <= plant_high)).astype(np.float64)
+    width = max(high - low, 1.0)
+    covered = np.minimum(plant_high, high) - np.maximum(plant_low, low)
+    return np.nan_to_num(np.clip(covered / width, 0.0, 1.0))
+
+
+_matrix = None
+_matrix_lock = threading.Lock()
+
+
+def get_catalogue_matrix():
+    """Per-process matrix, rebuilt when the catalogue version changes"""
+    global _matrix
+    version = get_catalogue_version()
+    if _matrix is None or _matrix[0] != version:
+        with _matrix_lock:
+            if _matrix is None or _matrix[0] != version:
+                rows = list(Plant.objects.order_by().values(
+                    'id', 'category', 'soil_type', 'watering_schedule', 'fertilization_needs',
+                    'disease_resistance', 'climate_suitability', 'temperature_min', 'temperature_max',
+                    'humidity_min', 'humidity_max',
+                ))
+                _matrix = (version, CatalogueMatrix(rows))
+    return _matrix[1]
+
+
+def get_recommendations(user_id, load_profile):
+    """
+    Cached top-K (plant id, score) pairs for a user. load_profile() is only called on a
+    cache miss, so a warm request never reads the profile row.
+    """
+    version = get_catalogue_version()
+    key = CACHE_KEY.format(user_id=user_id)
+    cached = cache.get(key)
+    if cached is not None and cached['version'] == version:
+        return cached['results']
+    results = get_catalogue_matrix().top_k(load_profile())
+    cache.set(key, {'version': version, 'results': results}, CACHE_TTL)
+    return results
+
+
+def invalidate_recommendations(user_id):
+    cache.delete(CACHE_KEY.format(user_id=user_id))
@@ -0,0 +1,95 @@
+from datetime import timedelta
+
+from django.db import transaction
+from django.utils import timezone
+
+from .dashboard import refresh_summaries
+from .models import PlantReminder, TrackedPlant
+from .scheduler import reschedule_care
+from .serializers import ReminderActionSerializer
+
+MAX_BULK_ACTIONS = 500
+
+# Completing one of these reminders also records the care on the tracked plant
+CARE_FIELDS = {'Watering': 'last_watered', 'Fertilizing': 'last_fertilized'}
+
+
+def error(reminder_id, message):
+    return {'id': reminder_id, 'status': 'error', 'error': message}
+
+
+def apply_reminder_actions(user, items, today):
+    """
+    Apply a batch of complete/snooze/reschedule actions to the user's reminders.
+
+    Ownership is checked with one query and the writes are one UPDATE for completions, one
+    bulk_update for new due dates and one UPDATE per care field, all in a single transaction.
+    Plants whose care dates moved get their generated care reminders re-planned (see
+    api.scheduler.sync_care). Returns one result per item, in request order.
+    """
+    results = [None] * len(items)
+    actions = {}
+    for index, item in enumerate(items):
+        serializer = ReminderActionSerializer(data=item)
+        if not serializer.is_valid():
+            item_id = item.get('id') if isinstance(item, dict) else None
+            results[index] = {'id': item_id, 'status': 'error', 'error': serializer.errors}
+        elif serializer.validated_data['id'] in actions:
+            results[index] = error(serializer.validated_data['id'], 'Reminder appears more than once in this request.')
+        else:
+            actions[serializer.validated_data['id']] = (index, serializer.validated_data)
+
+    reminders = PlantReminder.objects.filter(user=user, id__in=actions).only(
+        'id', 'tracked_plant', 'type', 'due_date', 'completed', 'generated')
+    reminders = {reminder.id: reminder for reminder in reminders}
+
+    completed_ids = []
+    moved = []
+    cared_for = {field: set() for field in CARE_FIELDS.values()}
+    for reminder_id, (index, data) in actions.items():
+        reminder = reminders.get(reminder_id)
+        if reminder is None:
+            results[index] = error(reminder_id, 'Reminder not found.')
+            continue
+        if data['action'] == 'complete':
+            if not reminder.completed:
+                completed_ids.append(reminder.id)
+                if reminder.type in CARE_FIELDS:
+                    cared_for[CARE_FIELDS[reminder.type]].add(reminder.tracked_plant_id)
+            results[index] = {'id': reminder.id, 'status': 'ok', 'completed': True, 'due_date': reminder.due_date}
+            continue
+        if reminder.completed:
+            results[index] = error(reminder.id, 'Reminder is already completed.')
+            continue
+        if data['action'] == 'snooze':
+            reminder.due_date = max(reminder.due_date, today) + timedelta(days=data['days'])
+        else:
+            reminder.due_date = data['due_date']
+        moved.append((index, reminder))
+
+    for index, reminder in moved:
+        results[index] = {'id': reminder.id, 'status': 'ok', 'completed': False, 'due_date': reminder.due_date}
+
+    now = timezone.now()
+    with transaction.atomic():
+        if completed_ids:
+            PlantReminder.objects.filter(id__in=completed_ids).update(completed=True, updated_at=now)
+        if moved:
+            for _, reminder in moved:
+                # A moved reminder belongs to the user now: the scheduler neither retires it as off its
+                # grid nor re-creates the occurrences it stands in for (see api.scheduler.sync_care)
+                reminder.generated = False
+                reminder.updated_at = now
+            PlantReminder.objects.bulk_update([reminder for _, reminder in moved], ['due_date', 'generated', 'updated_at'])
+        for field, tracked_ids in cared_for.items():
+            if tracked_ids:
+                TrackedPlant.objects.filter(id__in=tracked_ids, **{f'{field}__lt': today}).update(
+                    **{field: today, 'updated_at': now})
+        # The care dates moved, so the generated care reminders still open for these plants are re-planned
+        cared_for_ids = set().union(*cared_for.values())
+        if cared_for_ids:
+            reschedule_care(cared_for_ids, today, refresh=False)
+        # The UPDATEs above bypass the signals that keep the dashboard summary current
+        if completed_ids or moved:
+            transaction.on_commit(lambda: refresh_summaries([user.id]))
+    return results
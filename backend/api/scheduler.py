@@ -0,0 +1,243 @@
+from datetime import timedelta
+
+from django.db import connection, connections
+from django.db.models import F, Q
+
+from .dashboard import refresh_summaries
+from .models import Plant, PlantReminder, SyncTombstone, TrackedPlant
+from .names import name_variants, normalize_name
+
+# Plant.watering_schedule -> days between waterings; 'custom' plants are checked twice a week
+WATERING_INTERVALS = {'daily': 1, 'weekly': 7, 'custom': 3}
+DEFAULT_WATERING_INTERVAL = 7
+FERTILIZING_INTERVAL = 30
+DEFAULT_HORIZON_DAYS = 14
+CARE_TYPES = ('Watering', 'Fertilizing')
+
+
+def load_care_schedule(plant_keys=None):
+    """normalized plant name -> (watering interval, needs fertilizer), for the catalogue or just plant_keys"""
+    plants = Plant.objects.order_by('id')
+    if plant_keys is not None:
+        condition = Q()
+        for key in plant_keys:
+            for variant in name_variants(key):
+                condition |= Q(name__iexact=variant)
+        if not condition:
+            return {}
+        plants = plants.filter(condition)
+    schedule = {}
+    rows = plants.values_list('name', 'watering_schedule', 'fertilization_needs')
+    for name, watering, fertilize in rows.iterator(chunk_size=5000):
+        schedule.setdefault(normalize_name(name), (WATERING_INTERVALS.get(watering, DEFAULT_WATERING_INTERVAL), fertilize))
+    return schedule
+
+
+def occurrences(last_done, interval, today, horizon_end):
+    """
+    Due dates on the last_done + n * interval grid through horizon_end. Only the first missed
+    date is kept, as the one overdue reminder; the grid resumes from today. Every date depends
+    on last_done alone, so daily reruns offer the same rows until the care is recorded.
+    """
+    step = timedelta(days=interval)
+    due = last_done + step
+    if due < today:
+        yield due
+        due += step * -(-(today - due).days // interval)
+    while due <= horizon_end:
+        yield due
+        due += step
+
+
+def shard_filter(queryset, shard, shards):
+    if shards <= 1:
+        return queryset
+    return queryset.annotate(user_shard=F('user_id') % shards).filter(user_shard=shard)
+
+
+def care_reminders(tracked, schedule, today, horizon_end):
+    watering_interval, fertilize = schedule.get(tracked['plant_key'], (DEFAULT_WATERING_INTERVAL, True))
+    for due in occurrences(tracked['last_watered'], watering_interval, today, horizon_end):
+        yield 'Watering', due
+    if fertilize:
+        for due in occurrences(tracked['last_fertilized'], FERTILIZING_INTERVAL, today, horizon_end):
+            yield 'Fertilizing', due
+
+
+def on_recurrence(rules, tracked_plant_id, reminder_type, due_date):
+    """Whether due_date is a copy of one of the plant's recurring reminders of that type"""
+    for rule_due, interval in rules.get((tracked_plant_id, reminder_type), ()):
+        days = (due_date - rule_due).days
+        if days > 0 and days % max(interval, 1) == 0:
+            return True
+    return False
+
+
+def covered_until(tracked_plant_ids, types=None):
+    """
+    (plant, type) -> latest due date of the user's own open one-off reminders, such as a snoozed
+    one (see api.reminders). Such a reminder stands in for the occurrences due up to its date,
+    which are therefore not generated again.
+    """
+    reminders = PlantReminder.objects.filter(
+        tracked_plant_id__in=tracked_plant_ids, generated=False, completed=False, repeat_every_days__isnull=True)
+    if types is not None:
+        reminders = reminders.filter(type__in=types)
+    covered = {}
+    for tracked_plant_id, reminder_type, due_date in reminders.values_list('tracked_plant_id', 'type', 'due_date'):
+        key = (tracked_plant_id, reminder_type)
+        covered[key] = max(due_date, covered.get(key, due_date))
+    return covered
+
+
+def is_covered(covered, tracked_plant_id, reminder_type, due_date):
+    until = covered.get((tracked_plant_id, reminder_type))
+    return until is not None and due_date <= until
+
+
+def retire_reminders(rows):
+    """
+    Delete (id, user_id) reminders in one statement per batch. The per-row post_delete signals
+    are skipped, so their sync tombstones are written here; callers refresh the dashboards.
+    """
+    if not rows:
+        return
+    SyncTombstone.objects.bulk_create(
+        [SyncTombstone(user_id=user_id, model='reminder', object_id=reminder_id) for reminder_id, user_id in rows])
+    qn = connection.ops.quote_name
+    ids = [reminder_id for reminder_id, _ in rows]
+    with connection.cursor() as cursor:
+        for start in range(0, len(ids), 500):
+            batch = ids[start:start + 500]
+            cursor.execute(f"DELETE FROM {qn(PlantReminder._meta.db_table)} WHERE {qn('id')} IN "
+                           f"({', '.join(['%s'] * len(batch))})", batch)
+
+
+def sync_care(chunk, schedule, today, horizon_end, refresh=True):
+    """
+    Bring the generated care reminders of these tracked plants in line with their schedule:
+    open ones that no longer fall on the grid of the current last_watered/last_fertilized
+    (superseded by recorded care, or missed dates past the first) are retired, missing ones
+    are inserted, except where an open reminder of the user's (such as a snoozed one, see
+    api.reminders) already covers the date. Returns (occurrences offered to the database, reminders retired). Pass
+    refresh=False when the caller refreshes the users' dashboards itself.
+    """
+    wanted = {}
+    for tracked in chunk:
+        for reminder_type, due in care_reminders(tracked, schedule, today, horizon_end):
+            wanted[(tracked['id'], reminder_type, due)] = tracked['user_id']
+    plant_ids = [tracked['id'] for tracked in chunk]
+
+    # Copies of a user's own recurring Watering/Fertilizing reminders are generated too; leave them be
+    rules = {}
+    recurring = PlantReminder.objects.filter(
+        tracked_plant_id__in=plant_ids, type__in=CARE_TYPES, repeat_every_days__isnull=False,
+    ).values_list('tracked_plant_id', 'type', 'due_date', 'repeat_every_days')
+    for tracked_plant_id, reminder_type, due_date, interval in recurring:
+        rules.setdefault((tracked_plant_id, reminder_type), []).append((due_date, interval))
+
+    stale = []
+    scheduled = set()
+    open_reminders = PlantReminder.objects.filter(
+        tracked_plant_id__in=plant_ids, type__in=CARE_TYPES, generated=True, completed=False,
+    ).values_list('id', 'user_id', 'tracked_plant_id', 'type', 'due_date')
+    for reminder_id, user_id, tracked_plant_id, reminder_type, due_date in open_reminders:
+        slot = (tracked_plant_id, reminder_type, due_date)
+        if slot in wanted:
+            scheduled.add(slot)
+        elif not on_recurrence(rules, *slot):
+            stale.append((reminder_id, user_id))
+    retire_reminders(stale)
+
+    # Slots with a completed reminder are skipped by the unique_generated_reminder constraint
+    covered = covered_until(plant_ids, CARE_TYPES)
+    reminders = [
+        PlantReminder(user_id=user_id, tracked_plant_id=slot[0], type=slot[1], due_date=slot[2], generated=True)
+        for slot, user_id in wanted.items() if slot not in scheduled and not is_covered(covered, *slot)
+    ]
+    PlantReminder.objects.bulk_create(reminders, ignore_conflicts=True)
+    # Neither the raw delete nor bulk_create sends the signals that keep dashboard summaries current
+    changed = {user_id for _, user_id in stale} | {reminder.user_id for reminder in reminders}
+    if changed and refresh:
+        refresh_summaries(changed)
+    return len(reminders), len(stale)
+
+
+def schedule_care(today, horizon_days=DEFAULT_HORIZON_DAYS, chunk_size=5000, shard=0, shards=1, schedule=None):
+    """
+    Materialize watering/fertilizing reminders for every tracked plant in the shard, retiring
+    the ones that no longer apply (see sync_care). Reruns are safe. Returns (occurrences
+    offered to the database, reminders retired).
+    """
+    schedule = schedule if schedule is not None else load_care_schedule()
+    horizon_end = today + timedelta(days=horizon_days)
+    queryset = shard_filter(TrackedPlant.objects.all(), shard, shards)
+
+    offered = retired = 0
+    last_id = 0
+    while True:
+        chunk = list(
+            queryset.filter(id__gt=last_id).order_by('id')
+            .values('id', 'user_id', 'plant_key', 'last_watered', 'last_fertilized')[:chunk_size]
+        )
+        if not chunk:
+            break
+        chunk_offered, chunk_retired = sync_care(chunk, schedule, today, horizon_end)
+        offered += chunk_offered
+        retired += chunk_retired
+        last_id = chunk[-1]['id']
+    return offered, retired
+
+
+def reschedule_care(tracked_plant_ids, today, horizon_days=DEFAULT_HORIZON_DAYS, refresh=True):
+    """sync_care for a few tracked plants, e.g. right after care was recorded on them"""
+    chunk = list(TrackedPlant.objects.filter(id__in=tracked_plant_ids)
+                 .values('id', 'user_id', 'plant_key', 'last_watered', 'last_fertilized'))
+    if not chunk:
+        return 0, 0
+    schedule = load_care_schedule({tracked['plant_key'] for tracked in chunk})
+    return sync_care(chunk, schedule, today, today + timedelta(days=horizon_days), refresh)
+
+
+def schedule_recurring(today, horizon_days=DEFAULT_HORIZON_DAYS, chunk_size=5000, shard=0, shards=1):
+    """Materialize upcoming copies of user-defined recurring reminders; idempotent like schedule_care"""
+    horizon_end = today + timedelta(days=horizon_days)
+    queryset = shard_filter(PlantReminder.objects.filter(repeat_every_days__isnull=False), shard, shards)
+
+    offered = 0
+    last_id = 0
+    while True:
+        chunk = list(
+            queryset.filter(id__gt=last_id).order_by('id')
+            .values('id', 'user_id', 'tracked_plant_id', 'type', 'due_date', 'notes', 'repeat_every_days')[:chunk_size]
+        )
+        if not chunk:
+            break
+        covered = covered_until({rule['tracked_plant_id'] for rule in chunk})
+        reminders = []
+        for rule in chunk:
+            interval = max(rule['repeat_every_days'], 1)
+            # First occurrence after the rule's own due date that falls inside [today, horizon_end]
+            steps = max(1, -(-(today - rule['due_date']).days // interval))
+            due = rule['due_date'] + timedelta(days=steps * interval)
+            while due <= horizon_end:
+                if not is_covered(covered, rule['tracked_plant_id'], rule['type'], due):
+                    reminders.append(PlantReminder(
+                        user_id=rule['user_id'], tracked_plant_id=rule['tracked_plant_id'], type=rule['type'],
+                        due_date=due, notes=rule['notes'], generated=True,
+                    ))
+                due += timedelta(days=interval)
+        offered += len(PlantReminder.objects.bulk_create(reminders, ignore_conflicts=True))
+        # bulk_create skips the signals that keep dashboard summaries current
+        refresh_summaries({reminder.user_id for reminder in reminders})
+        last_id = chunk[-1]['id']
+    return offered
+
+
+def run_shard(shard, shards, today, horizon_days, chunk_size):
+    """Worker entry point; each process opens its own database connection. Returns (offered, retired)"""
+    connections.close_all()
+    care, retired = schedule_care(today, horizon_days, chunk_size, shard, shards)
+    recurring = schedule_recurring(today, horizon_days, chunk_size, shard, shards)
+    connections.close_all()
+    return care + recurring, retired
@@ -0,0 +1,72 @@
+import re
+
+from django.db import connection
+from django.db.models import BooleanField, Case, FloatField, IntegerField, Q, Value, When
+from django.db.models.expressions import RawSQL
+
+# Text search configuration used by the search_vector column (see migration 0005)
+SEARCH_CONFIG = 'english'
+
+# Columns folded into the search document; the JSON lists are searched as text
+SEARCH_FIELDS = ('name', 'scientific_name', 'care_instructions', 'pests', 'companion_plants')
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+
+def tokenize(query):
+    return TOKEN_RE.findall(query.lower())[:10] if query else []
+
+
+def build_tsquery(tokens):
+    # Every term is a prefix match so "tom" finds "tomato" while typing
+    return ' & '.join(f'{token}:*' for token in tokens)
+
+
+def uses_full_text():
+    return connection.vendor == 'postgresql'
+
+
+def filter_plants(queryset, query):
+    """Restrict a Plant queryset to rows matching the search query"""
+    tokens = tokenize(query)
+    if not tokens:
+        return queryset
+    if uses_full_text():
+        match = RawSQL(
+            'api_plant.search_vector @@ to_tsquery(%s::regconfig, %s)',
+            (SEARCH_CONFIG, build_tsquery(tokens)),
+            output_field=BooleanField(),
+        )
+        return queryset.filter(match)
+
+    # Portable fallback (SQLite in tests): every token must appear in some searchable column
+    for token in tokens:
+        condition = Q()
+        for field in SEARCH_FIELDS:
+            condition |= Q(**{f'{field}__icontains': token})
+        queryset = queryset.filter(condition)
+    return queryset
+
+
+def rank_plants(queryset, query):
+    """Filter by the search query and order by relevance, best match first"""
+    tokens = tokenize(query)
+    if not tokens:
+        return queryset.none()
+    queryset = filter_plants(queryset, query)
+    if uses_full_text():
+        rank = RawSQL(
+            'ts_rank_cd(api_plant.search_vector, to_tsquery(%s::regconfig, %s))',
+            (SEARCH_CONFIG, build_tsquery(tokens)),
+            output_field=FloatField(),
+        )
+    else:
+        phrase = ' '.join(tokens)
+        rank = Case(
+            When(name__iexact=phrase, then=Value(4)),
+            When(name__istartswith=phrase, then=Value(3)),
+            When(Q(name__icontains=phrase) | Q(scientific_name__icontains=phrase), then=Value(2)),
+            default=Value(1),
+            output_field=IntegerField(),
+        )
+    return queryset.annotate(search_rank=rank).order_by('-search_rank', 'name', 'id')
@@ -1,6 +1,9 @@
+from datetime import timedelta
 from rest_framework import serializers
 from django.contrib.auth import get_user_model
-from .models import UserProfile, Plant, TrackedPlant, PlantReminder
+from django.core.files.storage import default_storage
+from django.utils import timezone
+from .models import UserProfile, Plant, TrackedPlant, PlantReminder, PestAlert, GrowthLog
 
 User = get_user_model()
 
@@ -17,23 +20,62 @@ class UserProfileSerializer(serializers.ModelSerializer):
         fields = (
             'user', 'full_name', 'phone_number', 'address',
             'average_temperature', 'average_humidity', 'annual_rainfall', 'climate_zone',
-            'gardening_preferences', 'experience_level', 'specialization',
-            'availability', 'service_area', 'certifications',
-            'work_experience', 'managed_projects', 'responsibilities',
-            'property_type', 'garden_size', 'preferred_plants',
-            'admin_level', 'assigned_responsibilities',
+            'gardening_preferences',
             'preferred_plant_types', 'location', 'zip_code', 'soil_type',
             'skill_level', 'watering_frequency', 'maintenance_reminders',
             'pest_alerts', 'disease_alerts', 'community_notifications',
-            'organic_fertilizer', 'plant_tracking'
         )
 
+    def to_representation(self, instance):
+        # The fields of the user's role extension are flattened in, so clients see one profile
+        data = super().to_representation(instance)
+        role_profile = instance.role_profile()
+        if role_profile is not None:
+            for name in role_profile.field_names():
+                data[name] = getattr(role_profile, name)
+        return data
+
 class PlantSerializer(serializers.ModelSerializer):
+    # Columns a catalogue grid card needs; used by ?view=summary
+    SUMMARY_FIELDS = ('id', 'name', 'scientific_name', 'image', 'image_variants', 'category',
+                      'soil_type', 'sunlight', 'watering_schedule')
+
+    image_variants = serializers.SerializerMethodField()
+
     class Meta:
         model = Plant
         fields = '__all__'
         read_only_fields = ('created_at', 'updated_at')
 
+    def __init__(self, *args, **kwargs):
+        # Optional sparse fieldset, e.g. PlantSerializer(plants, many=True, fields=['id', 'name'])
+        fields = kwargs.pop('fields', None)
+        super().__init__(*args, **kwargs)
+        if fields is not None:
+            for field_name in set(self.fields) - set(fields):
+                self.fields.pop(field_name)
+
+    def get_image_variants(self, plant):
+        """Per-width URLs and srcset strings for <picture>/<img srcset>; None until the variants are built"""
+        variants = plant.image_variants or {}
+        if not variants.get('variants') or variants.get('source') != plant.image.name:
+            return None
+        request = self.context.get('request')
+        sizes = {}
+        srcset = {}
+        for variant in variants['variants']:
+            url = default_storage.url(variant['name'])
+            if request is not None:
+                url = request.build_absolute_uri(url)
+            sizes.setdefault(str(variant['width']), {})[variant['format']] = url
+            srcset.setdefault(variant['format'], []).append(f"{url} {variant['width']}w")
+        return {
+            'width': variants['width'],
+            'height': variants['height'],
+            'sizes': sizes,
+            'srcset': {image_format: ', '.join(entries) for image_format, entries in srcset.items()},
+        }
+
 class TrackedPlantSerializer(serializers.ModelSerializer):
     class Meta:
         model = TrackedPlant
@@ -51,9 +93,46 @@ class PlantReminderSerializer(serializers.ModelSerializer):
     class Meta:
         model = PlantReminder
         fields = ['id', 'tracked_plant', 'plant_name', 'type', 'due_date', 
-                 'notes', 'completed', 'created_at', 'updated_at']
-        read_only_fields = ['id', 'created_at', 'updated_at']
+                 'notes', 'completed', 'repeat_every_days', 'generated', 'created_at', 'updated_at']
+        read_only_fields = ['id', 'generated', 'created_at', 'updated_at']
     
     def create(self, validated_data):
         reminder = PlantReminder.objects.create(**validated_data)
         return reminder
+
+class ReminderActionSerializer(serializers.Serializer):
+    """One item of a bulk reminder request: complete, snooze by N days, or reschedule to a date"""
+    ACTIONS = ['complete', 'snooze', 'reschedule']
+
+    id = serializers.IntegerField()
+    action = serializers.ChoiceField(choices=ACTIONS)
+    days = serializers.IntegerField(min_value=1, max_value=365, default=1)
+    due_date = serializers.DateField(required=False)
+
+    def validate(self, data):
+        if data['action'] == 'reschedule' and 'due_date' not in data:
+            raise serializers.ValidationError({'due_date': 'This field is required to reschedule.'})
+        return data
+
+class GrowthLogSerializer(serializers.ModelSerializer):
+    # A plain id: ownership of a whole batch is checked with one query in the view
+    tracked_plant = serializers.IntegerField(source='tracked_plant_id')
+    health_status = serializers.ChoiceField(choices=['Excellent', 'Good', 'Fair', 'Poor'], required=False, allow_blank=True)
+    height_cm = serializers.FloatField(min_value=0, required=False, allow_null=True)
+
+    class Meta:
+        model = GrowthLog
+        fields = ['id', 'tracked_plant', 'recorded_at', 'height_cm', 'health_status', 'growth_stage',
+                  'pests_observed', 'notes']
+        read_only_fields = ['id']
+
+    def validate_recorded_at(self, value):
+        if value > timezone.now() + timedelta(minutes=5):
+            raise serializers.ValidationError('Cannot log observations in the future.')
+        return value
+
+class PestAlertSerializer(serializers.ModelSerializer):
+    class Meta:
+        model = PestAlert
+        fields = ['id', 'pest', 'message', 'read', 'created_at']
+        read_only_fields = ['id', 'pest', 'message', 'created_at']
@@ -0,0 +1,209 @@
+from contextlib import contextmanager
+
+from django.db import transaction
+from django.db.models import QuerySet
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .catalogue import invalidate_catalogue_version
+from . import pests
+from .companions import sync_plant
+from .authentication import forget_user
+from .dashboard import SummaryDelta, apply_deltas, upcoming_entry
+from .images import schedule_variants
+from .profiles import create_profile, invalidate_profile
+from .models import (AdminProfile, DashboardSummary, GardenerProfile, HomeownerProfile, Plant, PlantReminder,
+                     SupervisorProfile, SyncTombstone, TrackedPlant, User, UserProfile)
+
+
+# Receivers run in definition order: update derived data before bumping the catalogue version
+
+@receiver(post_save, sender=Plant)
+def sync_companion_graph(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    if update_fields is not None and not {'name', 'companion_plants'} & set(update_fields):
+        return
+    sync_plant(instance)
+
+
+@receiver(post_save, sender=Plant)
+def sync_pest_index(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    if update_fields is not None and not {'name', 'pests'} & set(update_fields):
+        return
+    pests.sync_plant(instance)
+
+
+@receiver(post_save, sender=Plant)
+def build_image_variants(sender, instance, raw=False, update_fields=None, **kwargs):
+    if raw or (update_fields is not None and 'image' not in update_fields):
+        return
+    # Variants record the image they were built from; rebuild when that is no longer the current one
+    if (instance.image.name or None) != (instance.image_variants or {}).get('source'):
+        plant_id = instance.pk
+        transaction.on_commit(lambda: schedule_variants(plant_id))
+
+
+@receiver(post_save, sender=Plant)
+@receiver(post_delete, sender=Plant)
+def plant_changed(sender, instance, **kwargs):
+    invalidate_catalogue_version()
+
+
+class PendingDeltas(dict):
+    """user id -> SummaryDelta for one transaction, applied once when it commits"""
+    applied = False
+
+    def __missing__(self, user_id):
+        self[user_id] = delta = SummaryDelta()
+        return delta
+
+    def apply(self):
+        self.applied = True
+        apply_deltas(self)
+
+
+@contextmanager
+def summary_delta(user_id):
+    """The delta collecting this user's dashboard changes in the current transaction"""
+    connection = transaction.get_connection()
+    pending = getattr(connection, 'dashboard_deltas', None)
+    # A batch whose callback is no longer queued was rolled back
+    queued = (pending is not None and not pending.applied
+              and any(callback == pending.apply for _, callback, _ in connection.run_on_commit))
+    if not queued:
+        pending = connection.dashboard_deltas = PendingDeltas()
+    yield pending[user_id]
+    if not queued:
+        # Outside a transaction this applies the delta right away
+        transaction.on_commit(pending.apply)
+
+
+def deleting_user(origin):
+    return isinstance(origin, User) or (isinstance(origin, QuerySet) and origin.model is User)
+
+
+def saved_fields(instance, update_fields):
+    return [name for name in instance.LOADED_FIELDS if update_fields is None or name in update_fields]
+
+
+@receiver(post_save, sender=TrackedPlant)
+def tracked_plant_saved(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    fields = saved_fields(instance, update_fields)
+    before = instance.loaded_state
+    after = {name: getattr(instance, name) for name in fields}
+    if created or before is None or any(before[name] != value for name, value in after.items()):
+        with summary_delta(instance.user_id) as delta:
+            if created:
+                delta.count_plant(instance.health_status, 1)
+            elif before is None:
+                delta.recompute = True
+            else:
+                if before['health_status'] != after.get('health_status', before['health_status']):
+                    delta.count_plant(before['health_status'], -1)
+                    delta.count_plant(instance.health_status, 1)
+                if before['name'] != after.get('name', before['name']):
+                    delta.plant_names[instance.pk] = instance.name
+    instance.remember_loaded_state(fields)
+
+
+@receiver(post_save, sender=PlantReminder)
+def reminder_saved(sender, instance, created, raw=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    fields = saved_fields(instance, update_fields)
+    before = None if created else instance.loaded_state
+    after = dict(before or {}, **{name: getattr(instance, name) for name in fields})
+    if created or before is None or after != before:
+        with summary_delta(instance.user_id) as delta:
+            if before is None and not created:
+                delta.recompute = True
+            else:
+                if before and not before['completed']:
+                    delta.count_reminder(instance.pk, before['type'], before['due_date'], -1)
+                if not after['completed']:
+                    delta.count_reminder(instance.pk, after['type'], after['due_date'], 1)
+                    list_reminder(delta, instance, after)
+    instance.remember_loaded_state(fields)
+
+
+def list_reminder(delta, instance, state):
+    """Queue an open reminder for the upcoming list"""
+    if str(state['due_date']) < timezone.localdate().isoformat():
+        return
+    if PlantReminder.tracked_plant.is_cached(instance):
+        delta.listed[instance.pk] = upcoming_entry(instance.pk, state['type'], state['due_date'],
+                                                   state['tracked_plant_id'], instance.tracked_plant.name)
+    else:
+        # Not worth a query here; the list is re-read when the delta is applied
+        delta.reload_upcoming = True
+
+
+@receiver(post_delete, sender=TrackedPlant)
+@receiver(post_delete, sender=PlantReminder)
+def dashboard_row_deleted(sender, instance, origin=None, **kwargs):
+    # A deleted user's summary goes with the user
+    if deleting_user(origin):
+        return
+    state = instance.loaded_state or {name: getattr(instance, name) for name in instance.LOADED_FIELDS}
+    if sender is PlantReminder and state['completed']:
+        return
+    # Reminders cascading from a deleted tracked plant join the plant's batch
+    with summary_delta(instance.user_id) as delta:
+        if sender is TrackedPlant:
+            delta.count_plant(state['health_status'], -1)
+        else:
+            delta.count_reminder(instance.pk, state['type'], state['due_date'], -1)
+
+
+@receiver(post_save, sender=User)
+def create_dashboard_summary(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        DashboardSummary.objects.create(user=instance)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def user_changed(sender, instance, **kwargs):
+    forget_user(instance.pk)
+
+
+@receiver(post_save, sender=User)
+def create_user_profile(sender, instance, created, raw=False, **kwargs):
+    if created and not raw:
+        create_profile(instance)
+
+
+# The cached profile embeds username, email and role, so user edits invalidate it too
+@receiver(post_save, sender=User)
+@receiver(post_save, sender=UserProfile)
+@receiver(post_delete, sender=UserProfile)
+def profile_changed(sender, instance, created=False, update_fields=None, **kwargs):
+    if created or (update_fields is not None and set(update_fields) <= {'last_login', 'password'}):
+        return
+    invalidate_profile(instance.pk if sender is User else instance.user_id)
+
+
+@receiver(post_save, sender=GardenerProfile)
+@receiver(post_save, sender=SupervisorProfile)
+@receiver(post_save, sender=HomeownerProfile)
+@receiver(post_save, sender=AdminProfile)
+def role_profile_changed(sender, instance, raw=False, **kwargs):
+    # Role rows are shown flattened into the cached profile, so creating one changes it too
+    if not raw:
+        invalidate_profile(instance.profile.user_id)
+
+
+@receiver(post_delete, sender=TrackedPlant)
+@receiver(post_delete, sender=PlantReminder)
+def record_tombstone(sender, instance, origin=None, **kwargs):
+    # Nothing to sync for a user who is being deleted
+    if deleting_user(origin):
+        return
+    model = 'tracked_plant' if sender is TrackedPlant else 'reminder'
+    SyncTombstone.objects.create(user_id=instance.user_id, model=model, object_id=instance.pk)
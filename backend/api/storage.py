@@ -0,0 +1,97 @@
+import hashlib
+import os
+import re
+import tempfile
+
+from django.core.files.storage import FileSystemStorage
+
+# Under MEDIA_ROOT; the media view never serves dot-directories
+BLOB_DIR = '.content'
+# Blobs being written. Outside BLOB_DIR, so prune_blobs never sees a half-written upload
+INCOMING_DIR = '.incoming'
+BLOB_NAME = re.compile(r'^[0-9a-f]{64}$')
+
+
+class DeduplicatingFileSystemStorage(FileSystemStorage):
+    """
+    FileSystemStorage that keeps one copy of each distinct upload. The bytes live once in
+    BLOB_DIR under their sha256 and every saved name is a hard link to that blob, so names,
+    URLs and deletes behave as before while identical uploads take no extra space.
+    """
+
+    def blob_path(self, digest):
+        return os.path.join(self.location, BLOB_DIR, digest[:2], digest)
+
+    def store_blob(self, content):
+        """Write content into the blob store unless an identical blob exists; returns the blob path"""
+        incoming = os.path.join(self.location, INCOMING_DIR)
+        os.makedirs(incoming, exist_ok=True)
+        digest = hashlib.sha256()
+        with tempfile.NamedTemporaryFile(dir=incoming, delete=False) as temporary:
+            for chunk in content.chunks():
+                digest.update(chunk)
+                temporary.write(chunk)
+        blob = self.blob_path(digest.hexdigest())
+        if os.path.exists(blob):
+            os.unlink(temporary.name)
+        else:
+            os.makedirs(os.path.dirname(blob), exist_ok=True)
+            if self.file_permissions_mode is not None:
+                os.chmod(temporary.name, self.file_permissions_mode)
+            # Atomic, and concurrent writers of the same digest write the same bytes
+            os.replace(temporary.name, blob)
+        return blob
+
+    def _save(self, name, content):
+        blob = self.store_blob(content)
+        while True:
+            full_path = self.path(name)
+            os.makedirs(os.path.dirname(full_path), exist_ok=True)
+            try:
+                os.link(blob, full_path)
+            except FileExistsError:
+                # Same race handling as FileSystemStorage._save
+                name = self.get_available_name(name)
+                continue
+            except OSError:
+                # No hard links here (e.g. another filesystem), or a concurrent prune_blobs removed the
+                # blob before it was linked: store a plain copy
+                content.seek(0)
+                return super()._save(name, content)
+            return str(name).replace('\\', '/')
+
+    def deduplicate(self, path):
+        """Replace an existing file with a link to its blob; returns the bytes freed"""
+        stat = os.stat(path)
+        if stat.st_nlink > 1:
+            return 0
+        with open(path, 'rb') as source:
+            digest = hashlib.sha256()
+            for chunk in iter(lambda: source.read(64 * 1024), b''):
+                digest.update(chunk)
+        blob = self.blob_path(digest.hexdigest())
+        os.makedirs(os.path.dirname(blob), exist_ok=True)
+        if not os.path.exists(blob):
+            # The first copy becomes the blob
+            os.link(path, blob)
+            return 0
+        temporary = f'{path}.dedupe'
+        os.link(blob, temporary)
+        os.replace(temporary, path)
+        return stat.st_size
+
+    def prune_blobs(self):
+        """Delete blobs no saved name links to any more; returns (blobs, bytes) removed"""
+        removed = freed = 0
+        for directory, _, files in os.walk(os.path.join(self.location, BLOB_DIR)):
+            for filename in files:
+                # Anything else, like temporary files earlier versions wrote here, isn't a blob
+                if not BLOB_NAME.match(filename):
+                    continue
+                path = os.path.join(directory, filename)
+                stat = os.stat(path)
+                if stat.st_nlink == 1:
+                    os.unlink(path)
+                    removed += 1
+                    freed += stat.st_size
+        return removed, freed
@@ -0,0 +1,73 @@
+import json
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from binascii import Error as BinasciiError
+from datetime import datetime, timedelta
+
+from django.utils import timezone
+
+from .models import PlantReminder, SyncTombstone, TrackedPlant
+from .serializers import PlantReminderSerializer, TrackedPlantSerializer
+
+# Rows are stamped with updated_at before their transaction commits, so a cursor taken "now" could
+# skip a slow transaction that commits a moment later. Handing out a cursor this far in the past
+# means the next sync re-sends the last few seconds of changes instead; clients upsert by id.
+SYNC_LAG = timedelta(seconds=10)
+# Tombstones older than this are purged; a client whose cursor predates that must resync in full
+TOMBSTONE_TTL = timedelta(days=90)
+
+
+class InvalidToken(ValueError):
+    pass
+
+
+def encode_token(moment):
+    return urlsafe_b64encode(json.dumps({'t': moment.isoformat()}).encode('utf-8')).decode('ascii')
+
+
+def decode_token(token):
+    try:
+        moment = datetime.fromisoformat(json.loads(urlsafe_b64decode(token.encode('ascii')))['t'])
+    except (TypeError, ValueError, KeyError, UnicodeError, BinasciiError):
+        raise InvalidToken(token)
+    if timezone.is_naive(moment):
+        raise InvalidToken(token)
+    return moment
+
+
+def changes_since(user, since, now=None):
+    """
+    Rows of the user's garden changed or deleted after since (None for everything), plus the
+    token to pass next time. Three index range scans on (user, updated_at / deleted_at).
+    """
+    now = now or timezone.now()
+    reset = since is None or since < now - TOMBSTONE_TTL
+
+    tracked = TrackedPlant.objects.filter(user=user)
+    reminders = PlantReminder.objects.filter(user=user).select_related('tracked_plant')
+    deleted = {'tracked_plant': [], 'reminder': []}
+    if not reset:
+        tracked = tracked.filter(updated_at__gt=since)
+        reminders = reminders.filter(updated_at__gt=since)
+        tombstones = SyncTombstone.objects.filter(user=user, deleted_at__gt=since).order_by('deleted_at')
+        for model, object_id in tombstones.values_list('model', 'object_id'):
+            deleted[model].append(object_id)
+
+    return {
+        'next': encode_token(now - SYNC_LAG),
+        # On reset the client replaces its local copy instead of merging
+        'reset': reset,
+        'tracked_plants': {
+            'updated': TrackedPlantSerializer(tracked.order_by('updated_at', 'id'), many=True).data,
+            'deleted': deleted['tracked_plant'],
+        },
+        'reminders': {
+            'updated': PlantReminderSerializer(reminders.order_by('updated_at', 'id'), many=True).data,
+            'deleted': deleted['reminder'],
+        },
+    }
+
+
+def purge_tombstones(now=None):
+    now = now or timezone.now()
+    deleted, _ = SyncTombstone.objects.filter(deleted_at__lt=now - TOMBSTONE_TTL).delete()
+    return deleted
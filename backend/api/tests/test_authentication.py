@@ -0,0 +1,43 @@
+from django.test import TestCase
+from rest_framework.test import APIClient
+
+from api.authentication import RefreshToken
+from api.models import User
+
+
+class ClaimsAuthenticationTests(TestCase):
+    """Tokens stop working once their user is deactivated, deleted or has other claims"""
+
+    def setUp(self):
+        self.user = User.objects.create_user('auth', 'auth@example.com', 'password', role='Gardener')
+        self.refresh = RefreshToken.for_user(self.user)
+        self.client = APIClient(HTTP_HOST='localhost')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {self.refresh.access_token}')
+
+    def test_active_user(self):
+        self.assertEqual(self.client.get('/api/profile/').status_code, 200)
+
+    def test_deactivated_user(self):
+        self.user.is_active = False
+        self.user.save()
+        self.assertEqual(self.client.get('/api/profile/').status_code, 401)
+        response = self.client.post('/api/token/refresh/', {'refresh': str(self.refresh)}, format='json')
+        self.assertEqual(response.status_code, 401)
+
+    def test_deleted_user(self):
+        self.user.delete()
+        self.assertEqual(self.client.get('/api/profile/').status_code, 401)
+        response = self.client.post('/api/token/refresh/', {'refresh': str(self.refresh)}, format='json')
+        self.assertEqual(response.status_code, 401)
+
+    def test_role_change_needs_a_refreshed_token(self):
+        self.user.role = 'Supervisor'
+        self.user.save()
+        self.assertEqual(self.client.get('/api/profile/').status_code, 401)
+
+        response = self.client.post('/api/token/refresh/', {'refresh': str(self.refresh)}, format='json')
+        self.assertEqual(response.status_code, 200)
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {response.data["access"]}')
+        response = self.client.get('/api/dashboard/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['role'], 'Supervisor')
@@ -0,0 +1,73 @@
+from datetime import timedelta
+
+from django.test import TestCase
+from django.utils import timezone
+
+from api.dashboard import SUMMARY_FIELDS, UPCOMING_ITEMS, compute_summaries, get_summary, present_summary
+from api.models import PlantReminder, TrackedPlant, User
+
+
+class SummaryDeltaTests(TestCase):
+    """Signal deltas keep the stored summary equal to a full recompute"""
+
+    def setUp(self):
+        self.user = User.objects.create_user('dash', 'dash@example.com', 'password')
+        self.today = timezone.localdate()
+
+    def assertInSync(self):
+        stored = get_summary(self.user.id)
+        expected = compute_summaries([self.user.id])[self.user.id]
+        self.assertEqual({name: stored[name] for name in SUMMARY_FIELDS}, expected)
+
+    def add_plant(self, name, health_status='Good'):
+        return TrackedPlant.objects.create(user=self.user, name=name, planted_date=self.today, health_status=health_status,
+                                           last_watered=self.today, last_fertilized=self.today)
+
+    def add_reminder(self, plant, days, reminder_type='Watering'):
+        return PlantReminder.objects.create(user=self.user, tracked_plant=plant, type=reminder_type,
+                                            due_date=self.today + timedelta(days=days))
+
+    def test_saves_and_deletes(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            basil = self.add_plant('Basil')
+            mint = self.add_plant('Mint', 'Poor')
+            reminders = [self.add_reminder(basil, days) for days in range(-3, UPCOMING_ITEMS + 2)]
+            self.add_reminder(mint, 1, 'Pruning')
+        self.assertInSync()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            mint.health_status = 'Good'
+            mint.name = 'Spearmint'
+            mint.save()
+            # Leaves a full upcoming list, which is then re-read
+            reminders[5].completed = True
+            reminders[5].save(update_fields=['completed'])
+        self.assertInSync()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            reminders[-1].due_date = self.today
+            reminders[-1].save()
+            reloaded = PlantReminder.objects.get(pk=reminders[4].pk)
+            reloaded.type = 'Fertilizing'
+            reloaded.save()
+        self.assertInSync()
+
+        with self.captureOnCommitCallbacks(execute=True):
+            PlantReminder.objects.filter(tracked_plant=basil, due_date__gt=self.today + timedelta(days=3)).delete()
+        self.assertInSync()
+
+        # Cascades the plant's remaining reminders in the same batch
+        with self.captureOnCommitCallbacks(execute=True) as callbacks:
+            basil.delete()
+        self.assertEqual(len(callbacks), 1)
+        self.assertInSync()
+
+    def test_upcoming_skips_overdue(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            plant = self.add_plant('Basil')
+            for days in range(-UPCOMING_ITEMS, 0):
+                self.add_reminder(plant, days)
+            upcoming = self.add_reminder(plant, 2)
+        summary = present_summary(get_summary(self.user.id), self.today)
+        self.assertEqual(summary['overdue_reminders'], UPCOMING_ITEMS)
+        self.assertEqual([entry['id'] for entry in summary['upcoming_reminders']], [upcoming.id])
@@ -0,0 +1,37 @@
+from datetime import date, datetime, timezone
+from unittest import skipUnless
+
+from django.db import connection
+from django.test import TestCase
+
+from api.growth import create_partitions
+from api.models import GrowthLog, TrackedPlant, User
+
+
+@skipUnless(connection.vendor == 'postgresql', 'GrowthLog is only partitioned on PostgreSQL')
+class GrowthPartitionTests(TestCase):
+    """Rows in the default partition move into month partitions instead of blocking them"""
+
+    def partitions(self):
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT tableoid::regclass::text, count(*) FROM api_growthlog GROUP BY 1')
+            return dict(cursor.fetchall())
+
+    def test_rows_leave_the_default_partition(self):
+        user = User.objects.create_user('logs', 'logs@example.com', 'password')
+        plant = TrackedPlant.objects.create(user=user, name='Basil', planted_date=date(2020, 1, 1),
+                                            last_watered=date(2020, 1, 1), last_fertilized=date(2020, 1, 1))
+        # A month the cron run missed and backfilled history, both far from any pre-created partition
+        moments = [datetime(2041, 5, 2, tzinfo=timezone.utc), datetime(2041, 5, 31, 23, 59, tzinfo=timezone.utc),
+                   datetime(2012, 7, 1, tzinfo=timezone.utc)]
+        GrowthLog.objects.bulk_create(GrowthLog(user=user, tracked_plant=plant, recorded_at=moment)
+                                      for moment in moments)
+        self.assertEqual(self.partitions().get('api_growthlog_default'), 3)
+
+        _, moved = create_partitions(months_ahead=1, today=date(2041, 4, 10))
+        partitions = self.partitions()
+        self.assertEqual(moved, 3)
+        self.assertNotIn('api_growthlog_default', partitions)
+        self.assertEqual(partitions['api_growthlog_y2041m05'], 2)
+        self.assertEqual(partitions['api_growthlog_y2012m07'], 1)
+        self.assertEqual(create_partitions(months_ahead=1, today=date(2041, 4, 10)), (2, 0))
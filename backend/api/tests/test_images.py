@@ -0,0 +1,87 @@
+import os
+import random
+import tempfile
+from io import BytesIO
+
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.test import TestCase, override_settings
+from PIL import Image
+
+from api.demo_data import demo_plant_fields
+from api.images import VARIANT_WIDTHS, build_variants
+from api.models import Plant
+
+
+def image_bytes(size, mode='RGB', color=(40, 120, 60), image_format='PNG'):
+    output = BytesIO()
+    Image.new(mode, size, color).save(output, image_format)
+    return output.getvalue()
+
+
+class MediaRootTestCase(TestCase):
+    """Writes uploads and variants to a temporary MEDIA_ROOT instead of the project's media/"""
+
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.media_root = directory.name
+        media_root = override_settings(MEDIA_ROOT=directory.name)
+        media_root.enable()
+        self.addCleanup(media_root.disable)
+
+
+class BuildVariantsTests(MediaRootTestCase):
+    def variants(self, content, name='plant_images/source.png'):
+        default_storage.save(name, ContentFile(content))
+        return build_variants(name)
+
+    def test_native_width_is_the_largest_variant(self):
+        result = self.variants(image_bytes((1000, 500)))
+        self.assertEqual((result['width'], result['height']), (1000, 500))
+        widths = sorted({variant['width'] for variant in result['variants']})
+        self.assertEqual(widths, [160, 320, 640, 1000])
+        for variant in result['variants']:
+            self.assertEqual(variant['height'], variant['width'] // 2)
+            with default_storage.open(variant['name']) as stored:
+                self.assertEqual(Image.open(stored).size, (variant['width'], variant['height']))
+        self.assertEqual(len(result['variants']), 2 * len(widths))
+
+    def test_never_upscales(self):
+        result = self.variants(image_bytes((2000, 1000)))
+        self.assertEqual(sorted({variant['width'] for variant in result['variants']}), VARIANT_WIDTHS)
+        small = self.variants(image_bytes((100, 80)), 'plant_images/small.png')
+        self.assertEqual({variant['width'] for variant in small['variants']}, {100})
+
+    def test_alpha_is_flattened_for_jpeg_only(self):
+        result = self.variants(image_bytes((200, 100), 'RGBA', (0, 0, 0, 0)))
+        formats = {variant['format']: variant for variant in result['variants'] if variant['width'] == 160}
+        with default_storage.open(formats['jpeg']['name']) as stored:
+            jpeg = Image.open(stored)
+            self.assertEqual(jpeg.mode, 'RGB')
+            self.assertTrue(all(channel > 250 for channel in jpeg.getpixel((80, 50))))
+        with default_storage.open(formats['webp']['name']) as stored:
+            self.assertEqual(Image.open(stored).getpixel((80, 50))[3], 0)
+
+
+class ContentAddressedFieldFileTests(MediaRootTestCase):
+    def plant(self, name):
+        return Plant.objects.create(**demo_plant_fields(random.Random(name), name, name, 'flower'))
+
+    def test_identical_uploads_share_one_file(self):
+        content = image_bytes((64, 64))
+        first, second = self.plant('Aster'), self.plant('Begonia')
+        first.image.save('Aster.PNG', ContentFile(content))
+        second.image.save('other-name.png', ContentFile(content))
+
+        self.assertEqual(first.image.name, second.image.name)
+        self.assertRegex(first.image.name, r'^plant_images/([0-9a-f]{2})/\1[0-9a-f]{62}\.png$')
+        self.assertEqual(os.listdir(os.path.dirname(first.image.path)), [os.path.basename(first.image.name)])
+        second.refresh_from_db()
+        self.assertEqual(second.image.name, first.image.name)
+
+    def test_different_content_gets_another_name(self):
+        first, second = self.plant('Aster'), self.plant('Begonia')
+        first.image.save('a.png', ContentFile(image_bytes((64, 64))))
+        second.image.save('a.png', ContentFile(image_bytes((64, 64), color=(200, 10, 10))))
+        self.assertNotEqual(first.image.name, second.image.name)
@@ -0,0 +1,106 @@
+import json
+import os
+import random
+import tempfile
+from io import StringIO
+from unittest import skipUnless
+
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.db import connection
+from django.test import TestCase
+
+from api.demo_data import demo_plant_fields
+from api.importer import read_checkpoint, write_checkpoint
+from api.models import Plant
+
+
+class ImportPlantsTests(TestCase):
+    """import_plants upserts valid rows in batches, reports invalid ones and resumes from its checkpoint"""
+    method = 'bulk'
+
+    def setUp(self):
+        self.rng = random.Random(5)
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.path = os.path.join(directory.name, 'plants.jsonl')
+
+    def row(self, name, scientific_name, **fields):
+        return {**demo_plant_fields(self.rng, name, scientific_name, 'flower'), **fields}
+
+    def write(self, rows):
+        with open(self.path, 'w', encoding='utf-8') as target:
+            for row in rows:
+                target.write((row if isinstance(row, str) else json.dumps(row)) + '\n')
+
+    def run_import(self, *args):
+        stdout, stderr = StringIO(), StringIO()
+        call_command('import_plants', self.path, '--method', self.method, '--batch-size', '2', '--skip-derived',
+                     *args, stdout=stdout, stderr=stderr)
+        return stdout.getvalue(), stderr.getvalue()
+
+    def test_upsert(self):
+        self.write([self.row('Rose', 'Rosa'), self.row('Tulip', 'Tulipa'), self.row('Lily', 'Lilium', external_id='L-1')])
+        self.run_import()
+        self.assertEqual(sorted(Plant.objects.values_list('external_id', flat=True)), ['L-1', 'rosa', 'tulipa'])
+
+        self.write([self.row('Garden Rose', 'Rosa'), self.row('Lily', 'Lilium', external_id='L-1', category='vegetable')])
+        self.run_import()
+        self.assertEqual(Plant.objects.count(), 3)
+        self.assertEqual(Plant.objects.get(external_id='rosa').name, 'Garden Rose')
+        self.assertEqual(Plant.objects.get(external_id='L-1').category, 'vegetable')
+
+    def test_existing_unkeyed_plant_is_updated(self):
+        fields = demo_plant_fields(self.rng, 'Rose', 'Rosa', 'flower')
+        existing = Plant.objects.create(**fields)
+        self.assertIsNone(existing.external_id)
+
+        self.write([self.row('Rose', 'Rosa', sunlight='shade')])
+        self.run_import()
+        self.assertEqual(Plant.objects.count(), 1)
+        existing.refresh_from_db()
+        self.assertEqual((existing.external_id, existing.sunlight), ('rosa', 'shade'))
+
+    def test_invalid_rows_are_reported(self):
+        self.write([
+            self.row('Rose', 'Rosa'),
+            self.row('Weed', 'Weedus', category='mineral'),
+            self.row('Long', 'Longus', external_id='x' * 151),
+            'not json',
+            self.row('Tulip', 'Tulipa'),
+        ])
+        stdout, stderr = self.run_import()
+        self.assertIn('row 2: category:', stderr)
+        self.assertIn('row 3: external_id:', stderr)
+        self.assertIn('row 4: invalid JSON', stderr)
+        self.assertIn('Imported 2 plants (3 invalid rows skipped)', stdout)
+        self.assertEqual(sorted(Plant.objects.values_list('external_id', flat=True)), ['rosa', 'tulipa'])
+
+    def test_resume_from_checkpoint(self):
+        self.write([self.row(name, name) for name in ('Aster', 'Begonia', 'Canna', 'Dahlia')])
+        checkpoint = f'{self.path}.checkpoint'
+        write_checkpoint(checkpoint, self.path, 2)
+        self.assertEqual(read_checkpoint(checkpoint, self.path), 2)
+
+        stdout, _ = self.run_import()
+        self.assertIn('Resuming after row 2', stdout)
+        self.assertEqual(sorted(Plant.objects.values_list('name', flat=True)), ['Canna', 'Dahlia'])
+        self.assertFalse(os.path.exists(checkpoint))
+
+    def test_stops_at_max_errors_and_resumes(self):
+        self.write([self.row('Aster', 'Aster'), self.row('Bad', 'Bad', category='mineral'),
+                    self.row('Canna', 'Canna'), self.row('Dahlia', 'Dahlia')])
+        with self.assertRaises(CommandError):
+            self.run_import('--max-errors', '0', '--batch-size', '1')
+        self.assertEqual(read_checkpoint(f'{self.path}.checkpoint', self.path), 1)
+
+        self.write([self.row('Aster', 'Aster'), self.row('Begonia', 'Begonia'),
+                    self.row('Canna', 'Canna'), self.row('Dahlia', 'Dahlia')])
+        # A fixed file has another size, so the checkpoint no longer applies and the run starts over
+        self.run_import()
+        self.assertEqual(Plant.objects.count(), 4)
+
+
+@skipUnless(connection.vendor == 'postgresql', 'COPY needs PostgreSQL')
+class CopyImportPlantsTests(ImportPlantsTests):
+    method = 'copy'
@@ -0,0 +1,20 @@
+import random
+from io import StringIO
+from unittest import skipUnless
+
+from django.db import connection
+from django.test import TestCase
+
+from api.management.commands.explain_hot_paths import Command as ExplainHotPaths
+
+
+@skipUnless(connection.vendor == 'postgresql', 'EXPLAIN plans are checked against PostgreSQL only')
+class HotPathIndexTests(TestCase):
+    """The dashboard and catalogue hot paths stay on index scans over a seeded dataset"""
+
+    def test_hot_paths_use_indexes(self):
+        output = StringIO()
+        command = ExplainHotPaths(stdout=output)
+        command.seed(random.Random(7), {'users': 300, 'plants': 3000, 'reminders': 30_000})
+        failures = command.check_plans()
+        self.assertEqual(failures, [], output.getvalue())
@@ -0,0 +1,120 @@
+import hashlib
+import os
+import tempfile
+
+from django.core.files.base import ContentFile
+from django.test import SimpleTestCase, override_settings
+from django.utils.http import http_date
+
+from api.storage import BLOB_DIR, DeduplicatingFileSystemStorage
+
+DIGEST_NAME = hashlib.sha256(b'plant').hexdigest() + '.txt'
+
+
+class PruningContentFile(ContentFile):
+    """Runs a dedupe_media prune halfway through being written, like an upload during the command"""
+
+    def __init__(self, content, storage):
+        super().__init__(content)
+        self.storage = storage
+
+    def chunks(self, chunk_size=None):
+        data = self.read()
+        yield data[:4]
+        self.pruned = self.storage.prune_blobs()
+        yield data[4:]
+
+
+class DeduplicatingStorageTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.storage = DeduplicatingFileSystemStorage(location=directory.name)
+
+    def blobs(self):
+        return [name for _, _, names in os.walk(os.path.join(self.storage.location, BLOB_DIR)) for name in names]
+
+    def test_identical_saves_link_one_blob(self):
+        first = self.storage.save('a/one.txt', ContentFile(b'same bytes'))
+        second = self.storage.save('b/two.txt', ContentFile(b'same bytes'))
+        self.assertEqual(os.stat(self.storage.path(first)).st_ino, os.stat(self.storage.path(second)).st_ino)
+        self.assertEqual(self.blobs(), [hashlib.sha256(b'same bytes').hexdigest()])
+        with self.storage.open(second) as stored:
+            self.assertEqual(stored.read(), b'same bytes')
+
+    def test_prune_removes_unlinked_blobs_only(self):
+        kept = self.storage.save('kept.txt', ContentFile(b'kept'))
+        self.storage.save('gone.txt', ContentFile(b'gone'))
+        self.storage.delete('gone.txt')
+        self.assertEqual(self.storage.prune_blobs(), (1, 4))
+        self.assertEqual(self.blobs(), [hashlib.sha256(b'kept').hexdigest()])
+        self.assertTrue(self.storage.exists(kept))
+
+    def test_upload_during_prune(self):
+        content = PruningContentFile(b'uploaded while pruning', self.storage)
+        name = self.storage.save('upload.txt', content)
+        self.assertEqual(content.pruned, (0, 0))
+        with self.storage.open(name) as stored:
+            self.assertEqual(stored.read(), b'uploaded while pruning')
+
+    def test_deduplicate_existing_files(self):
+        for name in ('x.txt', 'y.txt'):
+            with open(self.storage.path(name), 'wb') as target:
+                target.write(b'legacy')
+        self.assertEqual(self.storage.deduplicate(self.storage.path('x.txt')), 0)
+        self.assertEqual(self.storage.deduplicate(self.storage.path('y.txt')), 6)
+        self.assertEqual(os.stat(self.storage.path('x.txt')).st_nlink, 3)
+
+
+class ServeMediaTests(SimpleTestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        media_root = override_settings(MEDIA_ROOT=directory.name, MEDIA_OFFLOAD=None)
+        media_root.enable()
+        self.addCleanup(media_root.disable)
+        self.root = directory.name
+        for name in ('notes/plain.txt', f'plant_images/{DIGEST_NAME}', f'{BLOB_DIR}/secret.txt'):
+            os.makedirs(os.path.dirname(os.path.join(self.root, name)), exist_ok=True)
+            with open(os.path.join(self.root, name), 'wb') as target:
+                target.write(b'0123456789')
+
+    def test_full_response(self):
+        response = self.client.get('/media/notes/plain.txt')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(b''.join(response.streaming_content), b'0123456789')
+        self.assertEqual(response['Accept-Ranges'], 'bytes')
+        self.assertIn('no-cache', response['Cache-Control'])
+
+    def test_content_addressed_names_are_immutable(self):
+        response = self.client.get(f'/media/plant_images/{DIGEST_NAME}')
+        self.assertEqual(response['ETag'], f'"{DIGEST_NAME[:64]}"')
+        self.assertIn('immutable', response['Cache-Control'])
+
+    def test_not_modified(self):
+        etag = self.client.get('/media/notes/plain.txt')['ETag']
+        self.assertEqual(self.client.get('/media/notes/plain.txt', HTTP_IF_NONE_MATCH=etag).status_code, 304)
+        since = http_date(os.stat(os.path.join(self.root, 'notes/plain.txt')).st_mtime + 60)
+        self.assertEqual(self.client.get('/media/notes/plain.txt', HTTP_IF_MODIFIED_SINCE=since).status_code, 304)
+
+    def test_ranges(self):
+        response = self.client.get('/media/notes/plain.txt', HTTP_RANGE='bytes=2-5')
+        self.assertEqual(response.status_code, 206)
+        self.assertEqual(b''.join(response.streaming_content), b'2345')
+        self.assertEqual(response['Content-Range'], 'bytes 2-5/10')
+
+        suffix = self.client.get('/media/notes/plain.txt', HTTP_RANGE='bytes=-3')
+        self.assertEqual(b''.join(suffix.streaming_content), b'789')
+
+        stale = self.client.get('/media/notes/plain.txt', HTTP_RANGE='bytes=2-5', HTTP_IF_RANGE='"stale"')
+        self.assertEqual(stale.status_code, 200)
+
+    def test_unsatisfiable_range(self):
+        response = self.client.get('/media/notes/plain.txt', HTTP_RANGE='bytes=10-')
+        self.assertEqual(response.status_code, 416)
+        self.assertEqual(response['Content-Range'], 'bytes */10')
+
+    def test_hidden_and_outside_paths_are_not_found(self):
+        for path in (f'/media/{BLOB_DIR}/secret.txt', '/media/notes/../../etc/passwd', '/media/%2e%2e/etc/passwd',
+                     '/media/notes/', '/media/missing.txt'):
+            self.assertEqual(self.client.get(path).status_code, 404, path)
@@ -0,0 +1,114 @@
+import random
+from datetime import timedelta
+
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+
+from api.authentication import RefreshToken, cached_user_values
+from api.demo_data import PLANT_TYPES, demo_plant_fields
+from api.models import GrowthLog, Plant, PlantReminder, TrackedPlant, User, UserProfile
+from api.query_budget import assert_max_queries
+
+
+@override_settings(QUERY_BUDGET_ENFORCE=True)
+class QueryBudgetTests(TestCase):
+    """Every @query_budget endpoint stays within its budget for a user with a small garden"""
+
+    @classmethod
+    def setUpTestData(cls):
+        rng = random.Random(3)
+        for name, scientific_name, category in PLANT_TYPES[:6]:
+            plant = Plant(**demo_plant_fields(rng, name, scientific_name, category))
+            plant.parse_climate()
+            plant.save()
+        cls.user = User.objects.create_user('budget', 'budget@example.com', 'password', role='Gardener')
+        profile, _ = UserProfile.objects.get_or_create(user=cls.user)
+        profile.average_temperature, profile.average_humidity = '18-26°C', '40-70%'
+        profile.soil_type, profile.preferred_plant_types = 'Loamy', ['Vegetables']
+        profile.save()
+        today = timezone.localdate()
+        cls.plants = [
+            TrackedPlant.objects.create(user=cls.user, name=name, type=name, planted_date=today - timedelta(days=60),
+                                        last_watered=today, last_fertilized=today)
+            for name, _, _ in PLANT_TYPES[:3]
+        ]
+        cls.reminders = [
+            PlantReminder.objects.create(user=cls.user, tracked_plant=plant, type='Watering',
+                                         due_date=today + timedelta(days=offset))
+            for offset, plant in enumerate(cls.plants)
+        ]
+        GrowthLog.objects.bulk_create(
+            GrowthLog(user=cls.user, tracked_plant=cls.plants[0], height_cm=10 + day,
+                      recorded_at=timezone.now() - timedelta(days=day))
+            for day in range(5)
+        )
+
+    def setUp(self):
+        cache.clear()
+        # Budgets are for the steady state, with the requesting user's row cached
+        cached_user_values(self.user.id)
+        self.client = APIClient(HTTP_HOST='localhost')
+        self.client.credentials(HTTP_AUTHORIZATION=f'Bearer {RefreshToken.for_user(self.user).access_token}')
+
+    def assertWithinBudget(self, budget, method, path, data=None):
+        with assert_max_queries(budget, f'{method.upper()} {path}'):
+            response = getattr(self.client, method)(path, data, format='json' if method == 'post' else None)
+        self.assertLess(response.status_code, 400, response.content)
+        return response
+
+    def test_profile(self):
+        self.assertWithinBudget(3, 'get', '/api/profile/')
+
+    def test_dashboard(self):
+        self.assertWithinBudget(1, 'get', '/api/dashboard/')
+
+    def test_plants(self):
+        plant = Plant.objects.first()
+        self.assertWithinBudget(2, 'get', '/api/plants/')
+        self.assertWithinBudget(2, 'get', '/api/plants/', {'view': 'summary', 'category': 'vegetable'})
+        Plant.objects.update(image='plant_images/ab/ab.jpg', image_variants={
+            'source': 'plant_images/ab/ab.jpg', 'width': 160, 'height': 120,
+            'variants': [{'width': 160, 'height': 120, 'format': 'webp', 'name': 'plant_images/derived/ab/ab-160.webp'}],
+        })
+        response = self.assertWithinBudget(2, 'get', '/api/plants/', {'fields': 'id,image_variants'})
+        self.assertIsNotNone(response.data['results'][0]['image_variants'])
+        self.assertWithinBudget(1, 'get', f'/api/plants/{plant.id}/')
+        self.assertWithinBudget(1, 'get', '/api/plants/search/', {'q': 'tom'})
+        self.assertWithinBudget(2, 'get', '/api/plants/suitable/')
+
+    def test_tracked_plants(self):
+        self.assertWithinBudget(1, 'get', '/api/tracked-plants/')
+        self.assertWithinBudget(1, 'get', f'/api/tracked-plants/{self.plants[0].id}/')
+
+    def test_reminders(self):
+        self.assertWithinBudget(1, 'get', '/api/plant-reminders/')
+        self.assertWithinBudget(1, 'get', f'/api/plant-reminders/{self.reminders[0].id}/')
+        self.assertWithinBudget(1, 'get', '/api/upcoming-reminders/')
+
+    def test_bulk_reminder_actions(self):
+        first, second, third = self.reminders
+        self.assertWithinBudget(18, 'post', '/api/plant-reminders/bulk/', {'actions': [
+            {'id': first.id, 'action': 'complete'},
+            {'id': second.id, 'action': 'snooze', 'days': 2},
+            {'id': third.id, 'action': 'reschedule', 'due_date': str(third.due_date + timedelta(days=5))},
+        ]})
+
+    def test_sync(self):
+        response = self.assertWithinBudget(3, 'get', '/api/sync/')
+        self.assertWithinBudget(3, 'get', '/api/sync/', {'since': response.data['next']})
+
+    def test_recommendations_and_companions(self):
+        self.assertWithinBudget(4, 'get', '/api/recommendations/')
+        self.assertWithinBudget(4, 'get', '/api/companions/')
+        self.assertWithinBudget(2, 'get', '/api/pests/susceptibility/')
+
+    def test_growth_logs(self):
+        plant = self.plants[0]
+        self.assertWithinBudget(1, 'get', '/api/growth-logs/', {'tracked_plant': plant.id})
+        self.assertWithinBudget(1, 'get', '/api/growth-logs/rollup/', {'tracked_plant': plant.id})
+        self.assertWithinBudget(4, 'post', '/api/growth-logs/', {'tracked_plant': plant.id, 'height_cm': 20})
+        self.assertWithinBudget(4, 'post', '/api/growth-logs/bulk/', {'logs': [
+            {'tracked_plant': plant.id, 'height_cm': 21}, {'tracked_plant': self.plants[1].id, 'height_cm': 5},
+        ]})
@@ -0,0 +1,63 @@
+from types import SimpleNamespace
+
+import numpy as np
+from django.test import SimpleTestCase
+
+from api.recommendations import WEIGHTS, CatalogueMatrix, overlap_fraction
+
+
+def plant_row(plant_id, **fields):
+    row = {
+        'id': plant_id, 'category': 'herb', 'soil_type': 'loamy', 'watering_schedule': 'daily',
+        'fertilization_needs': True, 'disease_resistance': '', 'climate_suitability': '',
+        'temperature_min': None, 'temperature_max': None, 'humidity_min': None, 'humidity_max': None,
+    }
+    row.update(fields)
+    return row
+
+
+def profile(**fields):
+    values = dict(preferred_plant_types=[], soil_type='', watering_frequency='', skill_level='', climate_zone='',
+                  temperature_min=None, temperature_max=None, humidity_min=None, humidity_max=None)
+    values.update(fields)
+    return SimpleNamespace(**values)
+
+
+class OverlapFractionTests(SimpleTestCase):
+    bounds = (np.array([20.0, 10.0, np.nan]), np.array([30.0, 15.0, np.nan]))
+
+    def test_single_value_scores_by_containment(self):
+        np.testing.assert_array_equal(overlap_fraction(self.bounds, 25.0, 25.0), [1.0, 0.0, 0.0])
+        np.testing.assert_array_equal(overlap_fraction(self.bounds, 30.0, 30.0), [1.0, 0.0, 0.0])
+
+    def test_range_scores_by_covered_share(self):
+        np.testing.assert_allclose(overlap_fraction(self.bounds, 25.0, 35.0), [0.5, 0.0, 0.0])
+        np.testing.assert_allclose(overlap_fraction(self.bounds, 10.0, 30.0), [0.5, 0.25, 0.0])
+
+    def test_unknown_profile_scores_nothing(self):
+        self.assertEqual(overlap_fraction(self.bounds, None, 25.0), 0.0)
+
+
+class CatalogueMatrixTests(SimpleTestCase):
+    def setUp(self):
+        self.matrix = CatalogueMatrix([
+            plant_row(1, category='vegetable', temperature_min=18, temperature_max=28, humidity_min=40, humidity_max=70),
+            plant_row(2, category='flower', soil_type='sandy', temperature_min=0, temperature_max=10),
+            plant_row(3, category='vegetable', watering_schedule='weekly', fertilization_needs=False,
+                      disease_resistance='High', climate_suitability='Temperate'),
+        ])
+
+    def test_score_adds_the_weighted_matches(self):
+        scores = self.matrix.score(profile(preferred_plant_types=['Vegetables'], temperature_min=25,
+                                           temperature_max=25, humidity_min=65, humidity_max=65))
+        np.testing.assert_allclose(scores, [
+            WEIGHTS['category'] + WEIGHTS['temperature'] + WEIGHTS['humidity'], 0.0, WEIGHTS['category'],
+        ])
+
+    def test_easy_care_and_climate_zone(self):
+        scores = self.matrix.score(profile(skill_level='Beginner', climate_zone='temperate', soil_type='Sandy'))
+        np.testing.assert_allclose(scores, [0.0, WEIGHTS['soil'], WEIGHTS['easy_care'] + WEIGHTS['climate_zone']])
+
+    def test_top_k_orders_by_score_then_id(self):
+        self.assertEqual(self.matrix.top_k(profile(preferred_plant_types=['Vegetables']), k=2),
+                         [(1, WEIGHTS['category']), (3, WEIGHTS['category'])])
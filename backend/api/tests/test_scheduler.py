@@ -0,0 +1,69 @@
+from datetime import date, timedelta
+
+from django.test import SimpleTestCase, TestCase
+
+from api.models import PlantReminder, TrackedPlant, User
+from api.reminders import apply_reminder_actions
+from api.scheduler import DEFAULT_WATERING_INTERVAL, occurrences, schedule_care, schedule_recurring
+
+TODAY = date(2026, 10, 20)
+
+
+class OccurrencesTests(SimpleTestCase):
+    def test_keeps_one_missed_date(self):
+        self.assertEqual(list(occurrences(date(2026, 10, 1), 7, TODAY, TODAY + timedelta(days=7))),
+                         [date(2026, 10, 8), date(2026, 10, 22)])
+
+    def test_future_grid(self):
+        self.assertEqual(list(occurrences(TODAY, 3, TODAY, TODAY + timedelta(days=7))),
+                         [TODAY + timedelta(days=3), TODAY + timedelta(days=6)])
+
+
+class ScheduleCareTests(TestCase):
+    """Generated care reminders follow the plant's care dates and leave the user's moves alone"""
+
+    def setUp(self):
+        self.user = User.objects.create_user('care', 'care@example.com', 'password')
+        # Not in the catalogue: weekly watering, monthly fertilizing
+        self.plant = TrackedPlant.objects.create(user=self.user, name='Mystery', planted_date=TODAY,
+                                                 last_watered=TODAY - timedelta(days=4), last_fertilized=TODAY)
+
+    def watering(self):
+        return list(PlantReminder.objects.filter(tracked_plant=self.plant, type='Watering', completed=False)
+                    .order_by('due_date').values_list('due_date', 'generated'))
+
+    def test_rerun_is_idempotent(self):
+        schedule_care(TODAY)
+        first = self.watering()
+        self.assertEqual(first, [(TODAY + timedelta(days=3), True), (TODAY + timedelta(days=10), True)])
+        self.assertEqual(schedule_care(TODAY)[1], 0)
+        self.assertEqual(self.watering(), first)
+
+    def test_recorded_care_retires_superseded_reminders(self):
+        schedule_care(TODAY)
+        TrackedPlant.objects.filter(pk=self.plant.pk).update(last_watered=TODAY)
+        _, retired = schedule_care(TODAY)
+        self.assertEqual(retired, 2)
+        self.assertEqual(self.watering(), [(TODAY + timedelta(days=DEFAULT_WATERING_INTERVAL), True),
+                                           (TODAY + timedelta(days=2 * DEFAULT_WATERING_INTERVAL), True)])
+
+    def test_snooze_survives_a_rerun(self):
+        schedule_care(TODAY)
+        reminder = PlantReminder.objects.get(tracked_plant=self.plant, type='Watering', due_date=TODAY + timedelta(days=3))
+        results = apply_reminder_actions(self.user, [{'id': reminder.id, 'action': 'snooze', 'days': 2}], TODAY)
+        self.assertEqual(results[0]['status'], 'ok')
+
+        self.assertEqual(schedule_care(TODAY)[1], 0)
+        self.assertEqual(self.watering(), [(TODAY + timedelta(days=5), False), (TODAY + timedelta(days=10), True)])
+
+    def test_snoozed_recurring_copy_is_not_recreated(self):
+        PlantReminder.objects.create(user=self.user, tracked_plant=self.plant, type='Pruning', due_date=TODAY,
+                                     repeat_every_days=4)
+        schedule_recurring(TODAY, horizon_days=8)
+        copy = PlantReminder.objects.get(tracked_plant=self.plant, type='Pruning', due_date=TODAY + timedelta(days=4))
+        apply_reminder_actions(self.user, [{'id': copy.id, 'action': 'snooze', 'days': 1}], TODAY)
+
+        schedule_recurring(TODAY, horizon_days=8)
+        dates = PlantReminder.objects.filter(type='Pruning', repeat_every_days__isnull=True).order_by('due_date')
+        self.assertEqual(list(dates.values_list('due_date', flat=True)),
+                         [TODAY + timedelta(days=5), TODAY + timedelta(days=8)])
@@ -3,8 +3,10 @@ from .views import (
     RegisterView, ProfileView, get_users, DashboardView, UserInfoView,
     login_view, LogoutView, get_user_profile, update_user_profile,
     PlantViewSet, get_plant_categories, get_soil_types,
-    get_sunlight_options, get_watering_options, TrackedPlantViewSet,
-    PlantReminderViewSet, get_upcoming_reminders
+    get_sunlight_options, get_watering_options, get_plant_meta, TrackedPlantViewSet,
+    PlantReminderViewSet, get_upcoming_reminders, sync_garden, get_recommendations,
+    get_companion_report, get_pest_susceptibility, report_pest_outbreak, PestAlertViewSet,
+    GrowthLogViewSet
 )
 from rest_framework.routers import DefaultRouter
 from .views import UserViewSet
@@ -15,6 +17,8 @@ router.register(r'users', UserViewSet, basename='user')
 router.register(r'plants', PlantViewSet, basename='plant')
 router.register(r'tracked-plants', TrackedPlantViewSet, basename='tracked-plant')
 router.register(r'plant-reminders', PlantReminderViewSet, basename='plant-reminder')
+router.register(r'pest-alerts', PestAlertViewSet, basename='pest-alert')
+router.register(r'growth-logs', GrowthLogViewSet, basename='growth-log')
 
 urlpatterns = [
     path('register/', RegisterView.as_view(), name='register'),
@@ -31,8 +35,14 @@ urlpatterns = [
     path('plants/soil-types/', get_soil_types, name='soil-types'),
     path('plants/sunlight-options/', get_sunlight_options, name='sunlight-options'),
     path('plants/watering-options/', get_watering_options, name='watering-options'),
+    path('plants/meta/', get_plant_meta, name='plant-meta'),
     # Plant tracking URLs
     path('upcoming-reminders/', get_upcoming_reminders, name='upcoming-reminders'),
+    path('sync/', sync_garden, name='sync'),
+    path('recommendations/', get_recommendations, name='recommendations'),
+    path('companions/', get_companion_report, name='companions'),
+    path('pests/susceptibility/', get_pest_susceptibility, name='pest-susceptibility'),
+    path('pests/outbreaks/', report_pest_outbreak, name='pest-outbreaks'),
 ]
 
 urlpatterns += router.urls
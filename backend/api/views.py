@@ -1,17 +1,36 @@
+import logging
+
 from rest_framework.views import APIView
 from rest_framework.response import Response
 from rest_framework.permissions import AllowAny, IsAuthenticated
 from django.contrib.auth import get_user_model, authenticate
-from rest_framework_simplejwt.tokens import RefreshToken
 from django.db.utils import IntegrityError
 from rest_framework import status, serializers
-from rest_framework.viewsets import ReadOnlyModelViewSet, ModelViewSet
+from rest_framework.viewsets import GenericViewSet, ReadOnlyModelViewSet, ModelViewSet
 from django.db.models import Q
-from .models import User, UserProfile, Plant, TrackedPlant, PlantReminder
-from .serializers import UserSerializer, UserProfileSerializer, PlantSerializer, TrackedPlantSerializer, PlantReminderSerializer
-from rest_framework.decorators import api_view, permission_classes
+from django.utils import timezone
+from .models import User, UserProfile, Plant, TrackedPlant, PlantReminder, PestAlert, GrowthLog
+from .serializers import UserSerializer, UserProfileSerializer, PlantSerializer, TrackedPlantSerializer, PlantReminderSerializer, PestAlertSerializer, GrowthLogSerializer
+from .pagination import KeysetPagination
+from .search import filter_plants, rank_plants
+from .query_budget import query_budget
+from .catalogue import META_MAX_AGE, META_STALE_WHILE_REVALIDATE, get_catalogue_version, get_catalogue_meta
+from .climate import suitable_for_profile
+from .companions import get_companion_graph
+from .dashboard import get_summary, present_summary
+from .growth import BUCKETS, DEFAULT_RANGE, MAX_INGEST, MAX_POINTS, RAW_LIMIT, parse_moment, pick_bucket, rollup
+from .pests import fan_out_outbreak, susceptibility
+from .authentication import RefreshToken
+from .permissions import IsSystemAdmin
+from .profiles import get_profile_data, load_profile
+from .recommendations import PROFILE_FIELDS, TOP_K, get_recommendations as recommend_plants, invalidate_recommendations
+from .reminders import MAX_BULK_ACTIONS, apply_reminder_actions
+from .sync import InvalidToken, changes_since, decode_token
+from .facets import apply_facet_filters, apply_range_filters, facet_counts, parse_facet_filters
+from rest_framework.decorators import action, api_view, authentication_classes, permission_classes
 
 User = get_user_model()
+logger = logging.getLogger(__name__)
 
 @api_view(["GET"])
 @permission_classes([IsAuthenticated])
@@ -26,22 +45,12 @@ def get_users(request):
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@query_budget(3)  # 0 when cached, 1 to load, 3 if the profile has to be created
 def get_user_profile(request):
     try:
-        # Get or create the profile
-        profile, created = UserProfile.objects.get_or_create(
-            user=request.user,
-            defaults={
-                'full_name': request.user.username,
-                'address': '',
-                'phone_number': ''
-            }
-        )
-        serializer = UserProfileSerializer(profile, context={'request': request})
-        print("Profile data being sent:", serializer.data)  # Debug print
-        return Response(serializer.data)
-    except Exception as e:
-        print("Error in get_user_profile:", str(e))  # Debug print
+        return Response(get_profile_data(request.user))
+    except Exception:
+        logger.exception('Failed to load profile user=%s', request.user.id)
         return Response({
             'error': 'Failed to get profile data'
         }, status=status.HTTP_500_INTERNAL_SERVER_ERROR)
@@ -50,46 +59,62 @@ def get_user_profile(request):
 @permission_classes([IsAuthenticated])
 def update_user_profile(request):
     try:
-        profile, created = UserProfile.objects.get_or_create(user=request.user)
-        
+        profile = load_profile(request.user)
+        # Only the core row and the extension table of the user's role are read or written
+        role_profile = profile.role_profile()
+        role_fields = role_profile.field_names() if role_profile is not None else []
+        role_booleans = [field for field in role_fields
+                         if role_profile._meta.get_field(field).get_internal_type() == 'BooleanField']
+
         # Update text fields
         fields_to_update = [
             'full_name', 'phone_number', 'address', 'gardening_preferences',
-            'experience_level', 'specialization', 'availability', 'service_area',
-            'certifications', 'work_experience', 'managed_projects', 'responsibilities',
-            'property_type', 'garden_size', 'preferred_plants', 'admin_level',
-            'assigned_responsibilities', 'location', 'zip_code', 'soil_type',
-            'skill_level', 'watering_frequency', 'plant_tracking',
+            'location', 'zip_code', 'soil_type',
+            'skill_level', 'watering_frequency',
             'average_temperature', 'average_humidity', 'annual_rainfall', 'climate_zone'
-        ]
-
-        print("Received data:", request.data)  # Debug print
-
+        ] + [field for field in role_fields if field not in role_booleans]
+        changes = {}
         for field in fields_to_update:
             if field in request.data:
                 value = request.data[field]
                 if value not in [None, 'null', '']:  # Only update if value is not empty
-                    setattr(profile, field, value)
+                    changes[field] = value
 
         # Handle JSON fields
         if 'preferred_plant_types' in request.data:
-            profile.preferred_plant_types = request.data['preferred_plant_types']
+            changes['preferred_plant_types'] = request.data['preferred_plant_types']
 
         # Handle boolean fields
         boolean_fields = [
             'maintenance_reminders', 'pest_alerts', 'disease_alerts',
-            'community_notifications', 'organic_fertilizer'
-        ]
+            'community_notifications'
+        ] + role_booleans
         for field in boolean_fields:
             if field in request.data:
-                setattr(profile, field, request.data[field])
-
-        profile.save()
-        serializer = UserProfileSerializer(profile, context={'request': request})
-        print("Updated profile data:", serializer.data)  # Debug print
-        return Response(serializer.data)
+                changes[field] = request.data[field]
+
+        changed = []
+        role_changed = []
+        for field, value in changes.items():
+            target = role_profile if field in role_fields else profile
+            if getattr(target, field) != value:
+                setattr(target, field, value)
+                (role_changed if target is role_profile else changed).append(field)
+        logger.debug('Profile update user=%s changed=%s role_changed=%s', request.user.id, changed, role_changed)
+
+        # The post_save signals drop the cached profile
+        if changed:
+            profile.save(update_fields=changed)
+            if set(changed) & set(PROFILE_FIELDS):
+                invalidate_recommendations(request.user.id)
+        if role_changed:
+            if role_profile._state.adding:
+                role_profile.save(force_insert=True)
+            else:
+                role_profile.save(update_fields=role_changed)
+        return Response(UserProfileSerializer(profile).data)
     except Exception as e:
-        print("Error in update_user_profile:", str(e))  # Debug print
+        logger.warning('Profile update failed user=%s error=%s', request.user.id, e)
         return Response({
             'error': str(e)
         }, status=status.HTTP_400_BAD_REQUEST)
@@ -112,7 +137,7 @@ class RegisterView(APIView):
         if User.objects.filter(username=username).exists():
             return Response({'error': 'Username already exists'}, status=status.HTTP_400_BAD_REQUEST)
 
-        if User.objects.filter(email=email).exists():
+        if User.with_email(email).exists():
             return Response({'error': 'Email already exists'}, status=status.HTTP_400_BAD_REQUEST)
 
         try:
@@ -133,7 +158,8 @@ def login_view(request):
         }, status=status.HTTP_400_BAD_REQUEST)
     
     try:
-        user = User.objects.get(email=email)
+        user = User.with_email(email).get()
+        # Upgrades the stored hash if PASSWORD_HASHERS or its cost settings changed
         if user.check_password(password):
             refresh = RefreshToken.for_user(user)
             return Response({
@@ -148,6 +174,8 @@ def login_view(request):
                 'error': 'Invalid credentials'
             }, status=status.HTTP_401_UNAUTHORIZED)
     except User.DoesNotExist:
+        # Hash anyway so unknown emails take as long as wrong passwords
+        User().set_password(password)
         return Response({
             'error': 'Invalid credentials'
         }, status=status.HTTP_401_UNAUTHORIZED)
@@ -162,6 +190,7 @@ def register_view(request):
         return Response(serializer.data, status=status.HTTP_201_CREATED)
     return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
 
+@query_budget(get=1)
 class DashboardView(APIView):
     permission_classes = [IsAuthenticated]
 
@@ -172,7 +201,8 @@ class DashboardView(APIView):
             "username": user.username,
             "email": user.email,
             "role": user.role,
-            "message": f"Welcome to your {user.role} dashboard!"
+            "message": f"Welcome to your {user.role} dashboard!",
+            "summary": present_summary(get_summary(user.id), timezone.localdate()),
         })
 
 class ProfileView(APIView):
@@ -209,34 +239,86 @@ class LogoutView(APIView):
         except Exception as e:
             return Response({"error": "Invalid token"}, status=400)
 
+@query_budget(list=2, retrieve=1, search=1, suitable=2)
 class PlantViewSet(ModelViewSet):
     queryset = Plant.objects.all()
     serializer_class = PlantSerializer
     permission_classes = [IsAuthenticated]
+    pagination_class = KeysetPagination
+
+    def get_sparse_fields(self):
+        """Fields requested via ?fields=a,b or ?view=summary, or None for the full record"""
+        if self.action not in ('list', 'retrieve', 'suitable', 'search'):
+            return None
+        fields = self.request.query_params.get('fields')
+        if fields:
+            valid = {f.name for f in Plant._meta.concrete_fields}
+            requested = [f.strip() for f in fields.split(',') if f.strip() in valid]
+            if requested:
+                return ['id'] + [f for f in requested if f != 'id']
+        if self.request.query_params.get('view') == 'summary':
+            return list(PlantSerializer.SUMMARY_FIELDS)
+        return None
+
+    def get_serializer(self, *args, **kwargs):
+        fields = self.get_sparse_fields()
+        if fields is not None:
+            kwargs['fields'] = fields
+        return super().get_serializer(*args, **kwargs)
 
     def get_queryset(self):
         queryset = Plant.objects.all()
+        fields = self.get_sparse_fields()
+        if fields is not None:
+            # name is always loaded since the cursor is keyed on it, and image_variants is only
+            # served while its source is still the plant's image
+            loaded = set(fields) | {'name'}
+            if 'image_variants' in loaded:
+                loaded.add('image')
+            queryset = queryset.only(*loaded)
+        queryset = self.filter_without_facets(queryset)
+        return apply_facet_filters(queryset, parse_facet_filters(self.request.query_params))
+
+    def filter_without_facets(self, queryset):
         query = self.request.query_params.get('q', None)
-        category = self.request.query_params.get('category', None)
-        soil_type = self.request.query_params.get('soil_type', None)
-        sunlight = self.request.query_params.get('sunlight', None)
-        watering_schedule = self.request.query_params.get('watering_schedule', None)
-
         if query:
-            queryset = queryset.filter(
-                Q(name__icontains=query) |
-                Q(scientific_name__icontains=query)
-            )
-        if category:
-            queryset = queryset.filter(category=category)
-        if soil_type:
-            queryset = queryset.filter(soil_type=soil_type)
-        if sunlight:
-            queryset = queryset.filter(sunlight=sunlight)
-        if watering_schedule:
-            queryset = queryset.filter(watering_schedule=watering_schedule)
-
-        return queryset
+            queryset = filter_plants(queryset, query)
+        return apply_range_filters(queryset, self.request.query_params)
+
+    def list(self, request, *args, **kwargs):
+        response = super().list(request, *args, **kwargs)
+        if request.query_params.get('facets') in ('1', 'true'):
+            # Facet counts ignore the facet filters themselves, see api.facets.facet_counts
+            base = self.filter_without_facets(Plant.objects.all())
+            response.data['facets'] = facet_counts(base, parse_facet_filters(request.query_params))
+        return response
+
+    @action(detail=False, methods=['get'])
+    def suitable(self, request):
+        """Plants whose ideal temperature/humidity overlap the user's climate, as an indexed range query"""
+        profile = UserProfile.objects.filter(user=request.user).only(
+            'id', 'temperature_min', 'temperature_max', 'humidity_min', 'humidity_max').first()
+        if profile is None or (profile.temperature_min is None and profile.humidity_min is None):
+            return Response({
+                'error': 'Add your average temperature or humidity to your profile first'
+            }, status=status.HTTP_400_BAD_REQUEST)
+        queryset = suitable_for_profile(self.get_queryset(), profile)
+        page = self.paginate_queryset(queryset)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    @action(detail=False, methods=['get'])
+    def search(self, request):
+        """Typeahead search: top matches ranked by relevance, ?q=<text>&limit=<n>"""
+        try:
+            limit = min(max(int(request.query_params.get('limit', 10)), 1), 50)
+        except ValueError:
+            limit = 10
+        fields = self.get_sparse_fields() or list(PlantSerializer.SUMMARY_FIELDS)
+        queryset = Plant.objects.only(*fields)
+        plants = rank_plants(queryset, request.query_params.get('q', ''))[:limit]
+        serializer = PlantSerializer(plants, many=True, fields=fields, context={'request': request})
+        return Response(serializer.data)
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
@@ -258,6 +340,29 @@ def get_sunlight_options(request):
 def get_watering_options(request):
     return Response(dict(Plant.WATERING_CHOICES))
 
+@api_view(['GET'])
+@permission_classes([AllowAny])
+@authentication_classes([])
+def get_plant_meta(request):
+    """All plant choice sets plus per-facet counts, cached by catalogue version"""
+    version = get_catalogue_version()
+    etag = f'"{version}"'
+    if request.query_params.get('v') == version:
+        # Versioned URL: the content behind it never changes
+        cache_control = 'public, max-age=31536000, immutable'
+    else:
+        # Unversioned URL (what the plant search page fetches): briefly fresh, then revalidated
+        # with the ETag in the background, so a catalogue edit shows up within about a minute
+        cache_control = f'public, max-age={META_MAX_AGE}, stale-while-revalidate={META_STALE_WHILE_REVALIDATE}'
+    headers = {'ETag': etag, 'Cache-Control': cache_control}
+
+    if_none_match = request.headers.get('If-None-Match', '')
+    if etag in [tag.strip() for tag in if_none_match.split(',')] or if_none_match.strip() == '*':
+        return Response(status=status.HTTP_304_NOT_MODIFIED, headers=headers)
+
+    return Response(get_catalogue_meta(version), headers=headers)
+
+@query_budget(list=1, retrieve=1)
 class TrackedPlantViewSet(ModelViewSet):
     serializer_class = TrackedPlantSerializer
     permission_classes = [IsAuthenticated]
@@ -268,12 +373,14 @@ class TrackedPlantViewSet(ModelViewSet):
     def perform_create(self, serializer):
         serializer.save(user=self.request.user)
 
+@query_budget(list=1, retrieve=1, bulk=18)  # bulk: 7 more when completed care reminders get re-planned
 class PlantReminderViewSet(ModelViewSet):
     serializer_class = PlantReminderSerializer
     permission_classes = [IsAuthenticated]
     
     def get_queryset(self):
-        return PlantReminder.objects.filter(user=self.request.user)
+        # plant_name is read from tracked_plant, join it instead of one query per row
+        return PlantReminder.objects.filter(user=self.request.user).select_related('tracked_plant')
     
     def perform_create(self, serializer):
         # Ensure the tracked plant belongs to the current user
@@ -284,8 +391,23 @@ class PlantReminderViewSet(ModelViewSet):
         except TrackedPlant.DoesNotExist:
             raise serializers.ValidationError("The specified plant does not exist or does not belong to you.")
 
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """Complete, snooze or reschedule many reminders in one request: {"actions": [{"id", "action", ...}]}"""
+        items = request.data.get('actions') if isinstance(request.data, dict) else None
+        if not isinstance(items, list) or not items:
+            return Response({'error': 'actions must be a non-empty list'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(items) > MAX_BULK_ACTIONS:
+            return Response({'error': f'At most {MAX_BULK_ACTIONS} actions per request'},
+                            status=status.HTTP_400_BAD_REQUEST)
+
+        results = apply_reminder_actions(request.user, items, timezone.localdate())
+        failed = sum(result['status'] == 'error' for result in results)
+        return Response({'succeeded': len(results) - failed, 'failed': failed, 'results': results})
+
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
+@query_budget(1)
 def get_upcoming_reminders(request):
     """Get reminders due in the next 7 days"""
     from datetime import datetime, timedelta
@@ -298,7 +420,157 @@ def get_upcoming_reminders(request):
         completed=False,
         due_date__gte=today,
         due_date__lte=seven_days_later
-    ).order_by('due_date')
+    ).select_related('tracked_plant').order_by('due_date')
     
     serializer = PlantReminderSerializer(reminders, many=True)
-    return Response(serializer.data)
\ No newline at end of file
+    return Response(serializer.data)
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@query_budget(3)
+def sync_garden(request):
+    """Tracked plants and reminders changed or deleted since the ?since= token from the previous sync"""
+    since = request.query_params.get('since')
+    if since:
+        try:
+            since = decode_token(since)
+        except InvalidToken:
+            return Response({'error': 'Invalid sync token'}, status=status.HTTP_400_BAD_REQUEST)
+    return Response(changes_since(request.user, since or None))
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@query_budget(4)
+def get_recommendations(request):
+    """Catalogue plants ranked for the user's profile (climate, soil, plant types, skill)"""
+    try:
+        limit = min(max(int(request.query_params.get('limit', 20)), 1), TOP_K)
+    except ValueError:
+        limit = 20
+
+    def load_profile():
+        profile = UserProfile.objects.filter(user=request.user).only(
+            'user_id', *PROFILE_FIELDS, 'temperature_min', 'temperature_max', 'humidity_min', 'humidity_max'
+        ).first()
+        return profile or UserProfile(user=request.user)
+
+    ranked = recommend_plants(request.user.id, load_profile)[:limit]
+    fields = list(PlantSerializer.SUMMARY_FIELDS)
+    plants = Plant.objects.only(*fields).order_by().in_bulk([plant_id for plant_id, _ in ranked])
+    results = []
+    for plant_id, score in ranked:
+        if plant_id in plants:
+            data = PlantSerializer(plants[plant_id], fields=fields, context={'request': request}).data
+            data['score'] = score
+            results.append(data)
+    return Response(results)
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@query_budget(4)
+def get_companion_report(request):
+    """Companion compatibility of the user's tracked plants, plus catalogue plants that pair with them"""
+    tracked_plants = list(TrackedPlant.objects.filter(user=request.user).values('id', 'name', 'type'))
+    return Response(get_companion_graph().score_garden(tracked_plants))
+
+@api_view(['GET'])
+@permission_classes([IsAuthenticated])
+@query_budget(2)
+def get_pest_susceptibility(request):
+    """Which of the user's tracked plants are susceptible to which pests, optionally ?pest=aphids"""
+    return Response(susceptibility(request.user, request.query_params.get('pest')))
+
+@api_view(['POST'])
+@permission_classes([IsSystemAdmin])
+def report_pest_outbreak(request):
+    """Alert every opted-in user growing a plant susceptible to the reported pest"""
+    pest = request.data.get('pest')
+    if not pest:
+        return Response({'error': 'pest is required'}, status=status.HTTP_400_BAD_REQUEST)
+    alerted = fan_out_outbreak(pest, request.data.get('message', ''))
+    return Response({'pest': pest, 'alerted_users': alerted}, status=status.HTTP_201_CREATED)
+
+class PestAlertViewSet(ModelViewSet):
+    serializer_class = PestAlertSerializer
+    permission_classes = [IsAuthenticated]
+    http_method_names = ['get', 'patch', 'delete', 'head', 'options']
+
+    def get_queryset(self):
+        return PestAlert.objects.filter(user=self.request.user)
+
+@query_budget(list=1, rollup=1, create=4, bulk=4)
+class GrowthLogViewSet(GenericViewSet):
+    """Append-only growth/health history: raw logs, daily/weekly/monthly rollups and bulk ingestion"""
+    serializer_class = GrowthLogSerializer
+    permission_classes = [IsAuthenticated]
+
+    def get_queryset(self):
+        return GrowthLog.objects.filter(user=self.request.user)
+
+    def filter_range(self, request):
+        """(logs of ?tracked_plant= between ?start= and ?end=, start, end), or an error Response"""
+        try:
+            tracked_plant = int(request.query_params['tracked_plant'])
+        except (KeyError, ValueError):
+            return Response({'error': 'tracked_plant is required'}, status=status.HTTP_400_BAD_REQUEST)
+        end = request.query_params.get('end')
+        end = parse_moment(end, end_of_day=True) if end else timezone.now()
+        start = request.query_params.get('start')
+        start = parse_moment(start) if start else (end and end - DEFAULT_RANGE)
+        if start is None or end is None or start > end:
+            return Response({'error': 'start and end must be ISO dates with start before end'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        logs = self.get_queryset().filter(tracked_plant_id=tracked_plant, recorded_at__range=(start, end))
+        return logs, start, end
+
+    def list(self, request):
+        result = self.filter_range(request)
+        if isinstance(result, Response):
+            return result
+        logs, start, end = result
+        logs = list(logs.order_by('-recorded_at', '-id')[:RAW_LIMIT + 1])
+        return Response({
+            'truncated': len(logs) > RAW_LIMIT,
+            'results': self.get_serializer(logs[:RAW_LIMIT], many=True).data,
+        })
+
+    @action(detail=False)
+    def rollup(self, request):
+        """?bucket=day|week|month, picked automatically to stay under MAX_POINTS when omitted"""
+        result = self.filter_range(request)
+        if isinstance(result, Response):
+            return result
+        logs, start, end = result
+        bucket = request.query_params.get('bucket') or pick_bucket(start, end)
+        if bucket not in BUCKETS:
+            return Response({'error': f'bucket must be one of {", ".join(BUCKETS)}'}, status=status.HTTP_400_BAD_REQUEST)
+        if (end - start) / BUCKETS[bucket][1] > MAX_POINTS:
+            return Response({'error': f'Range is too long for {bucket} buckets (max {MAX_POINTS} points)'},
+                            status=status.HTTP_400_BAD_REQUEST)
+        return Response({'bucket': bucket, 'start': start, 'end': end, 'points': rollup(logs, bucket)})
+
+    def create(self, request):
+        return self.ingest(request, [request.data])
+
+    @action(detail=False, methods=['post'])
+    def bulk(self, request):
+        """Ingest up to MAX_INGEST logs at once: {"logs": [...]}; all or nothing"""
+        logs = request.data.get('logs') if isinstance(request.data, dict) else None
+        if not isinstance(logs, list) or not logs:
+            return Response({'error': 'logs must be a non-empty list'}, status=status.HTTP_400_BAD_REQUEST)
+        if len(logs) > MAX_INGEST:
+            return Response({'error': f'At most {MAX_INGEST} logs per request'}, status=status.HTTP_400_BAD_REQUEST)
+        return self.ingest(request, logs)
+
+    def ingest(self, request, logs):
+        serializer = self.get_serializer(data=logs, many=True)
+        if not serializer.is_valid():
+            return Response(serializer.errors, status=status.HTTP_400_BAD_REQUEST)
+        plant_ids = {row['tracked_plant_id'] for row in serializer.validated_data}
+        owned = set(TrackedPlant.objects.filter(user=request.user, id__in=plant_ids).values_list('id', flat=True))
+        if plant_ids - owned:
+            return Response({'error': 'Unknown tracked plants', 'tracked_plants': sorted(plant_ids - owned)},
+                            status=status.HTTP_400_BAD_REQUEST)
+        created = GrowthLog.objects.bulk_create(
+            [GrowthLog(user=request.user, **row) for row in serializer.validated_data])
+        return Response({'created': len(created)}, status=status.HTTP_201_CREATED)
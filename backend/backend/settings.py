@@ -100,7 +100,7 @@ TEMPLATES = [
 
 REST_FRAMEWORK = {
     "DEFAULT_AUTHENTICATION_CLASSES": (
-        "rest_framework_simplejwt.authentication.JWTAuthentication",
+        "api.authentication.ClaimsJWTAuthentication",
     ),
     "DEFAULT_PERMISSION_CLASSES": [
         "rest_framework.permissions.IsAuthenticated",
@@ -114,13 +114,90 @@ SIMPLE_JWT = {
     'ROTATE_REFRESH_TOKENS': False,  # Prevent refresh token from expiring unless user logs out
     'BLACKLIST_AFTER_ROTATION': True,  # Blacklist token on logout
     'AUTH_HEADER_TYPES': ('Bearer',),
+    # New access tokens carry the user's current role, not the one the refresh token was issued with
+    'TOKEN_REFRESH_SERIALIZER': 'api.authentication.TokenRefreshSerializer',
 }
+# Seconds a full user row stays in the per-process cache behind ClaimsJWTAuthentication: the
+# longest a deactivated user or a role change goes unnoticed by another process
+AUTH_USER_CACHE_TTL = 30
 
 APPEND_SLASH = False
 
+# Password hashing: PASSWORD_HASHER picks the algorithm new hashes use (argon2 needs argon2-cffi,
+# bcrypt needs bcrypt). Hashes made with another algorithm or cost are upgraded on the next login.
+PASSWORD_HASHER = os.environ.get('PASSWORD_HASHER', 'pbkdf2')
+PASSWORD_PBKDF2_ITERATIONS = int(os.environ.get('PASSWORD_PBKDF2_ITERATIONS', 870000))
+PASSWORD_ARGON2_TIME_COST = int(os.environ.get('PASSWORD_ARGON2_TIME_COST', 2))
+PASSWORD_ARGON2_MEMORY_COST = int(os.environ.get('PASSWORD_ARGON2_MEMORY_COST', 102400))  # KiB
+PASSWORD_ARGON2_PARALLELISM = int(os.environ.get('PASSWORD_ARGON2_PARALLELISM', 8))
+PASSWORD_BCRYPT_ROUNDS = int(os.environ.get('PASSWORD_BCRYPT_ROUNDS', 12))
+_PASSWORD_HASHERS = {
+    'pbkdf2': 'api.hashers.PBKDF2PasswordHasher',
+    'argon2': 'api.hashers.Argon2PasswordHasher',
+    'bcrypt': 'api.hashers.BCryptSHA256PasswordHasher',
+}
+PASSWORD_HASHERS = [_PASSWORD_HASHERS[PASSWORD_HASHER]] + [
+    path for name, path in _PASSWORD_HASHERS.items() if name != PASSWORD_HASHER
+] + ['django.contrib.auth.hashers.PBKDF2SHA1PasswordHasher']
+
+# Per-process by default. Set CACHE_REDIS_URL (e.g. redis://localhost:6379/1, needs the redis
+# package) to share cached data such as the catalogue version between workers
+CACHE_REDIS_URL = os.environ.get('CACHE_REDIS_URL')
+CACHES = {
+    'default': {'BACKEND': 'django.core.cache.backends.redis.RedisCache', 'LOCATION': CACHE_REDIS_URL}
+    if CACHE_REDIS_URL else {'BACKEND': 'django.core.cache.backends.locmem.LocMemCache'},
+}
+# Whether all workers see one cache. If not, a delete only reaches the worker that made it, so
+# data invalidated on writes (profiles, recommendations) is only kept briefly
+CACHE_SHARED = bool(CACHE_REDIS_URL)
+
+# Fail requests whose views run more queries than their declared @query_budget. Off by default:
+# api.tests.test_query_budgets turns it on, set QUERY_BUDGET_ENFORCE=1 to try it on a dev server
+QUERY_BUDGET_ENFORCE = os.environ.get('QUERY_BUDGET_ENFORCE') == '1'
+
 # Custom User Model
 AUTH_USER_MODEL = "api.User"
 
 # Media files (Uploaded files)
 MEDIA_URL = '/media/'
-MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
\ No newline at end of file
+MEDIA_ROOT = os.path.join(BASE_DIR, 'media')
+# Uploads are stored once per distinct content (see api/storage.py)
+STORAGES = {
+    'default': {'BACKEND': 'api.storage.DeduplicatingFileSystemStorage'},
+    'staticfiles': {'BACKEND': 'django.contrib.staticfiles.storage.StaticFilesStorage'},
+}
+# Media files are served by api.media.serve_media. Set to 'x-accel-redirect' (nginx, with an internal
+# location aliasing MEDIA_ROOT at MEDIA_ACCEL_REDIRECT_PREFIX) or 'x-sendfile' (Apache/lighttpd) to
+# have the front-end server send the bytes
+MEDIA_OFFLOAD = os.environ.get('MEDIA_OFFLOAD') or None
+MEDIA_ACCEL_REDIRECT_PREFIX = '/protected-media/'
+# Background threads building plant image variants (see api/images.py)
+IMAGE_WORKERS = 2
+# Notification outbox (see api/notifications.py and the dispatch_notifications command)
+NOTIFICATION_TRANSPORT = 'console'  # console, file, smtp or a dotted path to a transport class
+NOTIFICATION_FILE_PATH = os.path.join(BASE_DIR, 'notifications.log')
+NOTIFICATION_SMTP_HOST = 'localhost'
+NOTIFICATION_SMTP_PORT = 1025
+NOTIFICATION_RATE_LIMIT = (5, 3600)  # At most 5 notifications per user per hour
+
+# Logging: api.* loggers at DJANGO_LOG_LEVEL (DEBUG shows profile update details)
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'formatters': {
+        # Messages carry key=value pairs, e.g. "Profile update user=3 changed=['full_name']"
+        'structured': {
+            'format': '%(asctime)s %(levelname)s %(name)s %(message)s',
+        },
+    },
+    'handlers': {
+        'console': {'class': 'logging.StreamHandler', 'formatter': 'structured'},
+    },
+    'loggers': {
+        'api': {
+            'handlers': ['console'],
+            'level': os.environ.get('DJANGO_LOG_LEVEL', 'DEBUG' if DEBUG else 'INFO'),
+            'propagate': False,
+        },
+    },
+}
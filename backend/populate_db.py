@@ -3,7 +3,7 @@ import django
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'backend.settings')
 django.setup()
 
-from api.models import Plant, User, UserProfile
+from api.models import GardenerProfile, Plant, User, UserProfile
 from django.contrib.auth.models import Group
 
 def create_sample_plants():
@@ -123,8 +123,8 @@ def create_sample_users():
         user.role = role
         user.save()
 
-        # Create user profile
-        UserProfile.objects.get_or_create(
+        # Fill in the profile created with the user
+        profile, _ = UserProfile.objects.update_or_create(
             user=user,
             defaults={
                 'full_name': f"{user.first_name} {user.last_name}",
@@ -135,10 +135,11 @@ def create_sample_users():
                 'zip_code': '10001',
                 'soil_type': 'Loamy',
                 'skill_level': 'Intermediate',
-                'gardening_preferences': 'Organic gardening',
-                'experience_level': '5 years'
+                'gardening_preferences': 'Organic gardening'
             }
         )
+        if role == 'Gardener':
+            GardenerProfile.objects.update_or_create(profile=profile, defaults={'experience_level': '5 years'})
     print("Sample users and profiles created successfully!")
 
 if __name__ == '__main__':
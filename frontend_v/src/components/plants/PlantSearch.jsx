@@ -10,6 +10,7 @@ const API_BASE_URL = 'http://localhost:8000/api';
 const PlantSearch = () => {
   const navigate = useNavigate();
   const [plants, setPlants] = useState([]);
+  const [nextPage, setNextPage] = useState(null);
   const [loading, setLoading] = useState(false);
   const [error, setError] = useState(null);
   const [searchQuery, setSearchQuery] = useState('');
@@ -35,20 +36,15 @@ const PlantSearch = () => {
         return;
       }
       
-      const headers = { Authorization: `Bearer ${token}` };
       console.log('Fetching filter options with token:', token);
       
-      const [categoriesRes, soilTypesRes, sunlightRes, wateringRes] = await Promise.all([
-        axios.get(`${API_BASE_URL}/plants/categories/`, { headers }),
-        axios.get(`${API_BASE_URL}/plants/soil-types/`, { headers }),
-        axios.get(`${API_BASE_URL}/plants/sunlight-options/`, { headers }),
-        axios.get(`${API_BASE_URL}/plants/watering-options/`, { headers })
-      ]);
+      // One cached request for every choice set (revalidated with its ETag)
+      const metaRes = await axios.get(`${API_BASE_URL}/plants/meta/`);
 
-      setCategories(categoriesRes.data);
-      setSoilTypes(soilTypesRes.data);
-      setSunlightOptions(sunlightRes.data);
-      setWateringOptions(wateringRes.data);
+      setCategories(metaRes.data.categories);
+      setSoilTypes(metaRes.data.soil_types);
+      setSunlightOptions(metaRes.data.sunlight_options);
+      setWateringOptions(metaRes.data.watering_options);
       
       await fetchPlants();
       setInitialLoad(false);
@@ -77,6 +73,7 @@ const PlantSearch = () => {
       const headers = { Authorization: `Bearer ${token}` };
       
       const params = new URLSearchParams();
+      params.append('view', 'summary');
       if (searchQuery) params.append('q', searchQuery);
       if (filters.category) params.append('category', filters.category);
       if (filters.soil_type) params.append('soil_type', filters.soil_type);
@@ -84,7 +81,8 @@ const PlantSearch = () => {
       if (filters.watering_schedule) params.append('watering_schedule', filters.watering_schedule);
 
       const response = await axios.get(`${API_BASE_URL}/plants/?${params}`, { headers });
-      setPlants(response.data);
+      setPlants(response.data.results);
+      setNextPage(response.data.next);
       setError(null);
     } catch (err) {
       console.error('Error fetching plants:', err);
@@ -127,6 +125,19 @@ const PlantSearch = () => {
     fetchPlants();
   };
 
+  const handleLoadMore = async () => {
+    if (!nextPage) return;
+    try {
+      const headers = { Authorization: `Bearer ${getAccessToken()}` };
+      const response = await axios.get(nextPage, { headers });
+      setPlants(prev => [...prev, ...response.data.results]);
+      setNextPage(response.data.next);
+    } catch (err) {
+      console.error('Error fetching more plants:', err);
+      setError('Failed to fetch more plants');
+    }
+  };
+
   const handlePlantClick = (plantId) => {
     navigate(`/plants/${plantId}`);
   };
@@ -285,6 +296,11 @@ const PlantSearch = () => {
           ))
         )}
       </div>
+      {!loading && nextPage && (
+        <button className="search-button" onClick={handleLoadMore}>
+          Load More
+        </button>
+      )}
     </div>
   );
 };